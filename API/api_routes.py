@@ -0,0 +1,262 @@
+# api_routes.py
+# 자동화용 조회 API (HTML 대신 정규화된 레코드).
+#
+#   GET|POST /api/traffic   device=장비명(여러 개 가능) 또는 src_ip/dst_ip 만 주면 자동 탐색
+#                           start/end(선택, "YYYY-MM-DD HH:MM[:SS]" 또는 epoch)를 주면 로컬 저장소(log_store)를
+#                           거쳐 그 기간만 조회(이미 받은 시간대는 방화벽에 다시 묻지 않음), dport 로 추가 필터
+#   GET|POST /api/system    device=장비명(여러 개 가능), level=CRITICAL|MAJOR|INFO
+#   GET      /api/collected/system   수집기(collector)가 모아 둔 최근 시스템 로그(방화벽에 묻지 않음)
+#                           device(여러 개 가능, 생략 시 전체), level, since(이 시각 이후만), limit
+#
+# 공통 파라미터(쿼리스트링/폼/JSON 본문): format=json(기본)|ndjson|csv|parquet, refresh=1(캐시 무시),
+# limit=장비당 최대 건수(생략 시 어댑터 기본값, 최대 export_max_rows),
+# 벤더 전용 옵션(vendors.option_bounds(), 예: Secui total_rows/page_rows — 해당 벤더 장비에만 적용),
+# 계정은 username/password 필드 또는 HTTP Basic 인증.
+#
+# format=json   {"log_type", "count", "devices": [{"device", "vendor", "cached", "count", "records"} 또는 {..., "error"}]}
+# format=ndjson 레코드마다 한 줄 {"device", "vendor", 컬럼...}, 장비 오류는 {"device", "vendor", "error"},
+#               마지막 줄 {"summary": {"devices", "records", "errors"}}.
+#               벤더 응답을 파싱하는 대로 내보내며 전체 결과를 메모리에 모으지 않는다(캐시도 거치지 않음).
+# format=csv|parquet  같은 스트림을 파일로 내려받기(컬럼: device, vendor, 표 컬럼..., error).
+#               CSV 는 청크 단위로 바로 전송, Parquet 은 임시 파일에 row group 단위로 쓴 뒤 전송(pyarrow 필요).
+
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+import collector
+import export
+import inventory
+import log_store
+import metrics
+from fanout import fan_out
+from firewall_ip_check_modi import find_target_firewall
+from pretty import SYSTEM_HEADERS, TRAFFIC_HEADERS, iter_system_rows, iter_traffic_rows
+from result_cache import make_key, result_cache
+from vendors import device_timeout, dispatch, dispatch_iter, get_adapter, option_bounds
+
+api = Blueprint("api", __name__, url_prefix="/api")
+
+Target = Tuple[str, Optional[Dict[str, Any]]]
+
+_ROWS = {"traffic": iter_traffic_rows, "system": iter_system_rows}
+_HEADERS = {"traffic": TRAFFIC_HEADERS, "system": SYSTEM_HEADERS}
+_FORMATS = ("json", "ndjson", "csv", "parquet")
+
+class _BadRequest(Exception):
+    pass
+
+def _params() -> Dict[str, Any]:
+    """쿼리스트링 + 폼 + JSON 본문을 하나로 (뒤에 오는 쪽 우선). device 는 항상 list."""
+    out: Dict[str, Any] = {}
+    devices: List[str] = []
+    for src in (request.args, request.form):
+        for k in src:
+            if k == "device":
+                devices.extend(src.getlist(k))
+            else:
+                out[k] = src.get(k)
+    body = request.get_json(silent=True) if request.is_json else None
+    if isinstance(body, dict):
+        for k, v in body.items():
+            if k == "device":
+                devices.extend(v if isinstance(v, list) else [v])
+            else:
+                out[k] = v
+    # index.html 폼(수동 모드)은 selected_device 로 보냄
+    if not devices and out.get("selected_device") and out.get("mode") != "auto":
+        devices.append(out["selected_device"])
+    out["device"] = [str(d).strip() for d in devices if str(d or "").strip()]
+    return out
+
+def _str(p: Dict[str, Any], key: str, default: str = "") -> str:
+    return str(p.get(key) or default).strip()
+
+def _flag(p: Dict[str, Any], key: str) -> bool:
+    return _str(p, key).lower() in ("1", "on", "true", "yes")
+
+def _credentials(p: Dict[str, Any]) -> Tuple[str, str]:
+    auth = request.authorization
+    if auth and auth.username:
+        return auth.username, auth.password or ""
+    return _str(p, "username"), _str(p, "password")
+
+def _targets(p: Dict[str, Any], log_type: str) -> List[Target]:
+    names = p["device"]
+    if names:
+        return [(n, inventory.firewall_info_dict().get(n)) for n in names]
+    if log_type == "system":
+        raise _BadRequest("device 를 지정하세요.")
+    src_ip, dst_ip = _str(p, "src_ip"), _str(p, "dst_ip")
+    if not src_ip or not dst_ip:
+        raise _BadRequest("device 또는 src_ip/dst_ip 를 지정하세요.")
+    try:
+        matched = find_target_firewall(src_ip, dst_ip) or []
+    except ValueError as e:
+        raise _BadRequest(f"IP 형식 오류: {e}")
+    targets = []
+    for m in matched:
+        name, info = inventory.resolve_device(m)
+        if name:
+            targets.append((name, info))
+    return targets
+
+def _query(p: Dict[str, Any], log_type: str) -> Dict[str, Any]:
+    account, password = _credentials(p)
+    q: Dict[str, Any] = {"account": account, "password": password}
+    limit = _str(p, "limit")
+    if limit:
+        if not limit.isdigit() or int(limit) <= 0:
+            raise _BadRequest(f"limit 은 양의 정수여야 합니다: {limit}")
+        q["limit"] = int(limit)
+    for name, (lo, hi) in option_bounds().items():
+        value = _str(p, name)
+        if value:
+            if not value.isdigit() or not lo <= int(value) <= hi:
+                raise _BadRequest(f"{name} 은 {lo}~{hi} 사이 정수여야 합니다: {value}")
+            q[name] = int(value)
+    if log_type == "traffic":
+        q.update(src_ip=_str(p, "src_ip"), dst_ip=_str(p, "dst_ip"))
+        start_s, end_s = _str(p, "start"), _str(p, "end")
+        if start_s or end_s:
+            start = log_store.parse_time(start_s)
+            end = log_store.parse_time(end_s) if end_s else int(time.time())
+            if start is None or end is None or start > end:
+                raise _BadRequest(f"start/end 가 올바르지 않습니다: {start_s!r} ~ {end_s!r}")
+            q.update(start=start, end=end, dport=_str(p, "dport"))
+        elif _str(p, "dport"):
+            raise _BadRequest("dport 필터는 start/end 기간 조회에서만 쓸 수 있습니다.")
+    else:
+        q.update(level=_str(p, "level", "CRITICAL").upper())
+    return q
+
+def _window_rows(name: str, info: Dict[str, Any], q: Dict[str, Any],
+                 cancel: Optional[threading.Event] = None):
+    """기간 조회: (행 이터레이터, 저장소 채우기 결과)"""
+    return log_store.traffic_window(name, info, q["src_ip"], q["dst_ip"], q["start"], q["end"],
+                                    account=q["account"], password=q["password"],
+                                    dport=q["dport"], limit=q.get("limit"), cancel=cancel)
+
+def _cache_key(name: str, info: Dict[str, Any], log_type: str, q: Dict[str, Any]):
+    filters = {k: v for k, v in q.items() if k not in ("account", "password")}
+    creds = (q["account"], q["password"]) if get_adapter(info.get("vendor", "")).uses_account else None
+    return make_key(name, log_type, filters, credentials=creds)
+
+# ─────────────────────────────────────────────────────────────
+# JSON: 장비별 결과(캐시 사용, 여러 장비는 동시에)
+# ─────────────────────────────────────────────────────────────
+def _json_response(targets: List[Target], log_type: str, q: Dict[str, Any], refresh: bool):
+    to_rows = _ROWS[log_type]
+
+    def _one(target: Target, cancel: threading.Event) -> Dict[str, Any]:
+        name, info = target
+        if not info:
+            return {"device": name, "vendor": "", "error": "장비 정보 없음."}
+        vendor = info.get("vendor", "")
+        with metrics.tags(device=name, vendor=vendor, log_type=log_type), metrics.span("device"):
+            return _one_device(name, info, vendor, cancel)
+
+    def _one_device(name: str, info: Dict[str, Any], vendor: str, cancel: threading.Event) -> Dict[str, Any]:
+        if "start" in q:
+            rows, fill = _window_rows(name, info, q, cancel)
+            rows = list(rows)
+            return {"device": name, "vendor": vendor, "cached": fill["local"], "store": fill,
+                    "count": len(rows), "records": rows}
+        recs, cached = result_cache.get_or_fetch(
+            _cache_key(name, info, log_type, q), vendor,
+            lambda: dispatch(info, log_type, cancel=cancel, **q), refresh=refresh)
+        rows = list(to_rows(recs))
+        return {"device": name, "vendor": vendor, "cached": cached, "count": len(rows), "records": rows}
+
+    def _on_error(target: Target, e: BaseException) -> Dict[str, Any]:
+        name, info = target
+        return {"device": name, "vendor": (info or {}).get("vendor", ""), "error": str(e) or type(e).__name__}
+
+    results = [res for _, res in fan_out(targets, _one, on_error=_on_error,
+                                          timeout=device_timeout([i for _, i in targets if i]))]
+    return jsonify({"log_type": log_type,
+                    "count": sum(r.get("count", 0) for r in results),
+                    "devices": results})
+
+# ─────────────────────────────────────────────────────────────
+# 스트리밍(NDJSON / CSV / Parquet): 장비 순서대로 레코드를 파싱되는 대로 하나씩
+# ─────────────────────────────────────────────────────────────
+def _stream_rows(targets: List[Target], log_type: str, q: Dict[str, Any],
+                 totals: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    """{"device", "vendor", 컬럼...} 을 하나씩. 장비 오류는 {"device", "vendor", "error"} 한 줄로."""
+    to_rows = _ROWS[log_type]
+    for name, info in targets:
+        head = {"device": name, "vendor": (info or {}).get("vendor", "")}
+        try:
+            if not info:
+                raise LookupError("장비 정보 없음.")
+            rows = _window_rows(name, info, q)[0] if "start" in q else to_rows(dispatch_iter(info, log_type, **q))
+            rows = metrics.tagged(rows, device=name, vendor=head["vendor"], log_type=log_type)
+            for row in rows:
+                totals["records"] += 1
+                yield dict(head, **row)
+        except Exception as e:
+            totals["errors"] += 1
+            yield dict(head, error=str(e) or type(e).__name__)
+
+def _ndjson_lines(targets: List[Target], log_type: str, q: Dict[str, Any]) -> Iterator[str]:
+    totals = {"records": 0, "errors": 0}
+    for row in _stream_rows(targets, log_type, q, totals):
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+    yield json.dumps({"summary": dict(totals, devices=len(targets))}) + "\n"
+
+def _export_response(targets: List[Target], log_type: str, q: Dict[str, Any], fmt: str) -> Response:
+    columns = ["device", "vendor", *_HEADERS[log_type], "error"]
+    rows = _stream_rows(targets, log_type, q, {"records": 0, "errors": 0})
+    body = export.iter_csv(rows, columns) if fmt == "csv" else export.iter_parquet(rows, columns)
+    filename = f"{log_type}_{time.strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(stream_with_context(body), mimetype=export.MIMETYPES[fmt],
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+def _handle(log_type: str):
+    p = _params()
+    fmt = _str(p, "format", "json").lower()
+    if fmt not in _FORMATS:
+        return jsonify({"error": f"지원하지 않는 format: {fmt} ({'|'.join(_FORMATS)})"}), 400
+    if fmt == "parquet" and not export.parquet_available():
+        return jsonify({"error": "Parquet 내보내기에는 pyarrow 가 필요합니다 (pip install pyarrow)"}), 501
+    try:
+        q = _query(p, log_type)
+        targets = _targets(p, log_type)
+    except _BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:   # 인벤토리/탐색 파일 오류 등
+        return jsonify({"error": f"대상 장비 조회 실패: {e}"}), 500
+    if fmt == "ndjson":
+        return Response(stream_with_context(_ndjson_lines(targets, log_type, q)),
+                        mimetype="application/x-ndjson")
+    if fmt in ("csv", "parquet"):
+        return _export_response(targets, log_type, q, fmt)
+    return _json_response(targets, log_type, q, _flag(p, "refresh"))
+
+@api.route("/traffic", methods=["GET", "POST"])
+def api_traffic():
+    return _handle("traffic")
+
+@api.route("/system", methods=["GET", "POST"])
+def api_system():
+    return _handle("system")
+
+@api.route("/collected/system", methods=["GET"])
+def api_collected_system():
+    c = collector.collector
+    if c is None:
+        return jsonify({"error": "수집기가 꺼져 있습니다 (COLLECTOR_DEVICES 설정 필요)"}), 404
+    p = _params()
+    since_s, limit_s = _str(p, "since"), _str(p, "limit")
+    since = log_store.parse_time(since_s) if since_s else None
+    if since_s and since is None:
+        return jsonify({"error": f"since 가 올바르지 않습니다: {since_s!r}"}), 400
+    if limit_s and (not limit_s.isdigit() or int(limit_s) <= 0):
+        return jsonify({"error": f"limit 은 양의 정수여야 합니다: {limit_s}"}), 400
+    rows = c.rows(p["device"], _str(p, "level"), since, int(limit_s) if limit_s else None)
+    return jsonify({"log_type": "system", "count": len(rows), "records": rows,
+                    "last_cycle": c.last_cycle, "interval_sec": c.interval_sec})
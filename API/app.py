@@ -1,29 +1,51 @@
 # API/app.py
-from flask import Flask, render_template, request
-import pandas as pd
+from flask import Flask, Response, g, render_template, stream_template, request, jsonify
 import logging
+import os
+import time
 
 # ── 외부 모듈(현재 레포 기준) ─────────────────────────────────
 from firewall_ip_check_modi import find_target_firewall
 
-# Secui는 raw를 pretty에 바로 넘겨 렌더
-from secui_log_api import (
-    fetch_secui_traffic_logs,
-    fetch_secui_system_logs,
-)
-
-# Palo는 unified 레이어로 records(list[dict])를 만든 뒤 pretty 렌더
-from palo_unified import (
-    palo_traffic_records,
-    palo_system_records,
-)
+# 벤더 어댑터: 벤더 무관 records(list[TrafficRecord] / list[SystemRecord]) 반환 + 벤더/장비별 동시 job 상한
+from vendors import dispatch, get_adapter, device_timeout, UnsupportedVendor
+import vendors
 
 # 공용 렌더러
 from pretty import (
-    render_traffic_table,
-    render_system_table,
+    TRAFFIC_HEADERS,
+    SYSTEM_HEADERS,
+    traffic_table_rows,
+    system_table_rows,
+    render_paged_table,
 )
 
+# 결과 표는 서버에 보관하고 첫 페이지만 그림(정렬/필터/다음 페이지는 /results/<handle>)
+from result_pages import result_pages, RESULT_PAGE_SIZE
+
+# 자동 모드 다중 장비 동시 조회
+from fanout import fan_out
+
+# 벤더 API 공용 keep-alive 세션 풀
+import http_pool
+
+# 같은 조건 재조회 시 결과 재사용(TTL + LRU)
+from result_cache import result_cache, make_key
+
+# 기간 지정 트래픽 조회: 로컬 저장소(SQLite)에 있는 시간대는 방화벽에 다시 묻지 않음
+import log_store
+STORE_VIEW_ROWS = 1000   # 기간 조회 시 장비당 화면에 보여줄 최대 행 수(최신순)
+
+# 백그라운드 조회 job(제출 → 폴링 → 결과)
+from jobs import job_manager, JobLimit
+from polling import PollCancelled
+
+# 시스템 로그 주기 수집(COLLECTOR_DEVICES 설정 시): 장비별 cursor 이후의 새 로그만 받아 버퍼에
+import collector
+
+# 단계별 소요 시간/폴링 횟수/수신 바이트/파싱 행 수 → /metrics (Prometheus 텍스트 형식)
+import metrics
+
 # ── Flask & 로깅 ─────────────────────────────────────────────
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -36,191 +58,394 @@ def _peek(obj, n=400):
         s = pprint.pformat(obj)
     return s[:n]
 
-def _is_html(s):
-    return isinstance(s, str) and ("<table" in s or s.lstrip().startswith("<"))
-
 # ── 데이터 로드(엑셀) ────────────────────────────────────────
-# 1) 방화벽 상세(이름→IP/vendor/자격 등)
-firewall_info_df = pd.read_excel("firewall_info_new.xlsx")
-
-# 2) UI 표시용 장비 리스트(이름/IP/vendor)
-device_list_df = pd.read_excel("firewall_list.xlsx")
-
-# dict: 장비명 → {management_ip, vendor, ...}
-firewall_info_dict = {
-    row["name"]: {
-        "management_ip": row["management_ip"],
-        "vendor": row["vendor"],
-        "client_id": row.get("client_id"),
-        "client_secret": row.get("client_secret"),
-        "base_url": row.get("base_url"),
-    }
-    for _, row in firewall_info_df.iterrows()
-}
+# inventory: 처음 한 번만 엑셀을 파싱해 캐시 파일로 저장, 이후엔 캐시에서 로드.
+# 원본 엑셀이 바뀌면(mtime/size) 다음 요청에서 자동으로 다시 읽는다.
+# 1) 방화벽 상세(이름→IP/vendor/자격 등) : inventory.firewall_info_dict()
+# 2) UI 표시용 장비 리스트(이름/IP/vendor) : inventory.device_list()
+import inventory
+
+# 시작 시 한 번 읽어 두기(파일이 없으면 여기서 바로 실패)
+inventory.firewall_info_dict()
+inventory.device_list()
+
+# 자동화용 JSON / NDJSON 조회 API (/api/traffic, /api/system)
+from api_routes import api as api_bp
+app.register_blueprint(api_bp)
+
+# ── 요청 지연 기록(스트리밍 응답은 본문 전송 시작까지) ──────────
+@app.before_request
+def _request_started():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _request_finished(response):
+    started = g.get("request_started")
+    if started is not None:
+        # 매칭된 라우트 규칙으로 묶는다(경로 그대로면 job id 마다 레이블이 생김)
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, route=route,
+                                        method=request.method, status=response.status_code)
+    return response
 
 # ── 라우트 ───────────────────────────────────────────────────
 @app.route("/")
 def index():
-    devices = device_list_df.to_dict(orient="records")
+    devices = inventory.device_list()
     return render_template("index.html", devices=devices, result="")
 
-@app.route("/run_traffic", methods=["POST"])
-def run_traffic():
-    # 필수 입력들
-    mode     = (request.form.get("mode") or "manual").strip()
-    username = (request.form.get("username") or "").strip()
-    password = (request.form.get("password") or "").strip()
+def _form_flag(name: str) -> bool:
+    return (request.form.get(name) or "").strip() in ("1", "on", "true")
 
-    parts: list[str] = []
+def _form_window():
+    """폼의 start/end(선택) → ((start, end) 또는 None, 오류 문구). end 생략 시 지금까지"""
+    start_s = (request.form.get("start") or "").strip()
+    end_s   = (request.form.get("end") or "").strip()
+    if not start_s and not end_s:
+        return None, ""
+    start, end = log_store.parse_time(start_s), log_store.parse_time(end_s) if end_s else int(time.time())
+    if start is None or end is None:
+        return None, "조회 기간 형식이 올바르지 않습니다(예: 2025-10-20 12:00)."
+    if start > end:
+        return None, "조회 기간의 시작이 끝보다 늦습니다."
+    return (start, end), ""
 
-    # 벤더별 1대 처리 (반드시 문자열 HTML을 리턴)
-    def _render_for_device(name: str, info: dict, src_ip: str, dst_ip: str) -> str:
-        vendor = (info or {}).get("vendor", "")
-        fw_ip  = (info or {}).get("management_ip", "")
-        app.logger.info("[traffic] name=%s vendor=%s ip=%s src=%s dst=%s",
-                        name, vendor, fw_ip, src_ip, dst_ip)
+def _paged_table(name: str, log_type: str, headers, rows) -> str:
+    """결과 행을 result_pages 에 보관하고 첫 페이지만 그린 표 HTML"""
+    if not rows:
+        return "[ok] 표시할 로그가 없습니다."
+    handle = result_pages.put(headers, rows, log_type, name)
+    with metrics.span("render"):
+        return render_paged_table(handle, headers, rows[:RESULT_PAGE_SIZE], len(rows), RESULT_PAGE_SIZE)
+
+# ── 장비 1대 조회 → 결과 HTML (동기 라우트 / 백그라운드 job 공용) ──
+# 벤더별 1대 처리 (문자열 HTML을 리턴). cancel 이 set 되면 벤더 폴링을 멈춘다.
+# window=(start, end) epoch 초를 주면 로컬 저장소(log_store)를 거쳐 그 기간만 조회한다.
+# 조회 실패는 기본적으로 [error] 문구로 그리고, raise_errors=True(백그라운드 job)면 예외를 그대로 올려
+# job 이 그 장비를 error 로 표시하게 한다.
+def _traffic_block(name: str, info: dict, src_ip: str, dst_ip: str,
+                   username: str, password: str, refresh: bool = False, cancel=None,
+                   window=None, raise_errors: bool = False) -> str:
+    vendor = (info or {}).get("vendor", "")
+    fw_ip  = (info or {}).get("management_ip", "")
+    app.logger.info("[traffic] name=%s vendor=%s ip=%s src=%s dst=%s window=%s",
+                    name, vendor, fw_ip, src_ip, dst_ip, window)
+    filters = {"src": src_ip, "dst": dst_ip}
+    badge = ""
+    with metrics.tags(device=name, vendor=vendor, log_type="traffic"), metrics.span("device"):
         try:
-            if vendor == "Paloalto":
-                # unified → records or HTML
-                recs_or_html = palo_traffic_records(fw_ip, src_ip, dst_ip, username, password)
-                if isinstance(recs_or_html, str) and (
-                    "<table" in recs_or_html or recs_or_html.lstrip().startswith("<")
-                ):
-                    html = recs_or_html
-                else:
-                    html = render_traffic_table(recs_or_html)
-            elif vendor == "Secui Bluemax":
-                raw  = fetch_secui_traffic_logs(info, src_ip, dst_ip)
-                html = render_traffic_table(raw)
+            if window:
+                # 저장소에 없는 시간대만 방화벽에서 받아 채운 뒤 저장소에서 읽음
+                rows, fill = log_store.traffic_window(name, info, src_ip, dst_ip, window[0], window[1],
+                                                      account=username, password=password,
+                                                      limit=STORE_VIEW_ROWS, refresh=refresh, cancel=cancel)
+                html = _paged_table(name, "traffic", TRAFFIC_HEADERS, traffic_table_rows(list(rows)))
+                badge = " · 로컬" if fill["local"] else f" · 빠진 구간 {fill['gaps']}개 조회"
             else:
-                html = f"{vendor}는 지원하지 않는 방화벽입니다."
+                adapter = get_adapter(vendor)
+                # 화면 계정으로 인증하는 벤더만 계정 지문을 캐시 키에 포함
+                creds = (username, password) if adapter.uses_account else None
+                recs, cached = result_cache.get_or_fetch(
+                    make_key(name, "traffic", filters, credentials=creds), vendor,
+                    lambda: dispatch(info, "traffic", cancel=cancel, src_ip=src_ip, dst_ip=dst_ip,
+                                     account=username, password=password),
+                    refresh=refresh)
+                html = _paged_table(name, "traffic", TRAFFIC_HEADERS, traffic_table_rows(recs))
+                badge = " · 캐시" if cached else ""
+        except UnsupportedVendor as e:
+            if raise_errors:
+                raise
+            html = str(e)
+        except PollCancelled:
+            raise   # job 취소: 오류로 남기지 않음
         except Exception as e:
             app.logger.exception("[traffic] fetch/render error")
+            if raise_errors:
+                raise
             html = f"[error] {name}({vendor}) 처리 중 오류: {e}"
-        # 항상 문자열(HTML)로 반환
-        return f"<h4>{name} ({vendor})</h4>\n{html}"
-
-    # 자동탐색 결과 원소에서 (name, info) 안정적으로 뽑기
-    def _extract_name_and_info(m):
-        # "장비명" 문자열
-        if isinstance(m, str):
-            return m, firewall_info_dict.get(m)
-        # dict인 경우
-        if isinstance(m, dict):
-            name = m.get("name") or m.get("device") or m.get("hostname") or m.get("fw_name")
-            # 이미 vendor/ip가 들어있다면 그대로 info로 사용
-            if m.get("vendor") and (m.get("management_ip") or m.get("ip") or m.get("mgmt_ip")):
-                info = {
-                    "vendor": m.get("vendor"),
-                    "management_ip": m.get("management_ip") or m.get("ip") or m.get("mgmt_ip"),
-                }
-                return name or "(unknown)", info
-            # 아니면 엑셀 dict에서 조회
-            return (name or "(unknown)"), firewall_info_dict.get(name) if name else None
-        # tuple/list면 첫 원소가 이름일 수 있음
-        if isinstance(m, (list, tuple)) and m and isinstance(m[0], str):
-            return m[0], firewall_info_dict.get(m[0])
-        # 그 밖은 실패
-        return None, None
+    # 항상 문자열(HTML)로 반환
+    return f"<h4>{name} ({vendor}){badge}</h4>\n{html}"
+
+def _traffic_error_block(target, e) -> str:
+    name, info = target
+    vendor = (info or {}).get("vendor", "")
+    app.logger.warning("[traffic] device %s failed: %s", name, e)
+    return f"<h4>{name} ({vendor})</h4>\n[error] {name}({vendor}) 처리 중 오류: {e}"
+
+def _system_block(name: str, info: dict, level: str,
+                  username: str, password: str, refresh: bool = False, cancel=None,
+                  raise_errors: bool = False) -> str:
+    vendor = info.get("vendor", "")
+    fw_ip  = info.get("management_ip", "")
+    app.logger.info("[system] name=%s vendor=%s ip=%s level=%s", name, vendor, fw_ip, level)
+
+    filters = {"level": level}
+    cached = False
+    with metrics.tags(device=name, vendor=vendor, log_type="system"), metrics.span("device"):
+        try:
+            adapter = get_adapter(vendor)
+            creds = (username, password) if adapter.uses_account else None
+            recs, cached = result_cache.get_or_fetch(
+                make_key(name, "system", filters, credentials=creds), vendor,
+                lambda: dispatch(info, "system", cancel=cancel, level=level,
+                                 account=username, password=password),
+                refresh=refresh)
+            if recs:
+                app.logger.info("[system sample keys] %s", list(recs[0].keys()))
+                app.logger.info("[system sample] %s", _peek(recs[0]))
+            html = _paged_table(name, "system", SYSTEM_HEADERS, system_table_rows(recs))
 
+        except UnsupportedVendor as e:
+            if raise_errors:
+                raise
+            html = str(e)
+        except PollCancelled:
+            raise   # job 취소: 오류로 남기지 않음
+        except Exception as e:
+            app.logger.exception("[system] fetch/render error")
+            if raise_errors:
+                raise
+            html = f"[error] {name}({vendor}) 처리 중 오류: {e}"
+
+    if cached:
+        html = "[캐시된 결과] 새로 조회하려면 '새로 조회'를 체크하세요.<br>" + html
+    return html
+
+# ── 조회 대상 장비: (targets, 안내 문구) — 대상이 없으면 targets=[] 와 화면에 보여줄 문구 ──
+def _traffic_targets(mode: str, src_ip: str, dst_ip: str, selected_name: str):
     # ── 수동 모드 ───────────────────────────────────────────
     if mode == "manual":
-        src_ip = (request.form.get("src_ip") or "").strip()
-        dst_ip = (request.form.get("dst_ip") or "").strip()
-        selected_name = request.form.get("selected_device")
         if not selected_name:
-            return render_template("index.html",
-                                   devices=device_list_df.to_dict(orient="records"),
-                                   result="장비를 선택하세요.")
-        info = firewall_info_dict.get(selected_name)
+            return [], "장비를 선택하세요."
+        info = inventory.firewall_info_dict().get(selected_name)
         if not info:
-            return render_template("index.html",
-                                   devices=device_list_df.to_dict(orient="records"),
-                                   result="장비 정보 없음.")
-        parts.append(_render_for_device(selected_name, info, src_ip, dst_ip))
+            return [], "장비 정보 없음."
+        return [(selected_name, info)], ""
 
     # ── 자동 모드 ───────────────────────────────────────────
-    else:
-        src_ip = (request.form.get("src_ip") or "").strip()
-        dst_ip = (request.form.get("dst_ip") or "").strip()
+    matched = find_target_firewall(src_ip, dst_ip) or []
+    app.logger.info("[auto] matched type=%s len=%s",
+                    type(matched).__name__, len(matched) if hasattr(matched, "__len__") else "?")
+    if matched:app.logger.info("[auto] matched sample=%r", matched[0])
 
-        matched = find_target_firewall(src_ip, dst_ip) or []
-        app.logger.info("[auto] matched type=%s len=%s",
-                        type(matched).__name__, len(matched) if hasattr(matched, "__len__") else "?")
-        if matched:app.logger.info("[auto] matched sample=%r", matched[0])
+    if not matched:
+        return [], "[ok] 일치하는 방화벽이 없습니다."
+    targets = []
+    for m in matched:
+        name, info = inventory.resolve_device(m)
+        if not info:
+            app.logger.warning("[auto] info not found for %r; skipping", name or m)
+            continue
+        targets.append((name, info))
+    return targets, ""
 
-        if not matched:
-            parts.append("[ok] 일치하는 방화벽이 없습니다.")
-        else:
-            for m in matched:
-                name, info = _extract_name_and_info(m)
-                if not info:
-                    app.logger.warning("[auto] info not found for %r; skipping", name or m)
-                    continue
-                parts.append(_render_for_device(name, info, src_ip, dst_ip))
+def _system_targets(selected_name: str):
+    if not selected_name:
+        return [], "장비 선택 필수"
+    info = inventory.firewall_info_dict().get(selected_name)
+    if not info:
+        return [], "장비 정보 없음."
+    return [(selected_name, info)], ""
+
+@app.route("/run_traffic", methods=["POST"])
+def run_traffic():
+    # 필수 입력들
+    mode     = (request.form.get("mode") or "manual").strip()
+    username = (request.form.get("username") or "").strip()
+    password = (request.form.get("password") or "").strip()
+    src_ip   = (request.form.get("src_ip") or "").strip()
+    dst_ip   = (request.form.get("dst_ip") or "").strip()
+
+    # 체크 시 캐시를 건너뛰고 새로 조회(결과는 캐시에 덮어씀)
+    refresh  = _form_flag("refresh")
+
+    # 결과를 장비별로 끝나는 대로 흘려보낼지(장비 목록/폼이 먼저 전송됨)
+    stream_mode = _form_flag("stream")
+
+    window, message = _form_window()
+    if not message:
+        targets, message = _traffic_targets(mode, src_ip, dst_ip, request.form.get("selected_device"))
+    if message:
+        return render_template("index.html", devices=inventory.device_list(), result=message)
+
+    def _render(t, cancel):
+        return _traffic_block(t[0], t[1], src_ip, dst_ip, username, password, refresh, cancel, window=window)
+
+    if stream_mode:
+        def _blocks():
+            first = True
+            for _, html in fan_out(targets, _render, on_error=_traffic_error_block,
+                                   timeout=device_timeout([t[1] for t in targets]),
+                                   ordered=False):
+                yield html if first else "<br>" + html
+                first = False
+            if first:
+                yield "[ok] 표시할 로그가 없습니다."
+        return stream_template("index.html",
+                               devices=inventory.device_list(),
+                               result="",
+                               result_stream=_blocks())
+
+    # 대상 장비들을 동시에 조회(결과는 대상 순서 유지, 장비별 타임아웃)
+    parts = [html for _, html in fan_out(targets, _render, on_error=_traffic_error_block,
+                                         timeout=device_timeout([t[1] for t in targets]))]
 
     # ── 모든 분기에서 최종적으로 Response를 리턴 ─────────────
     result_html = "<br>".join(parts) if parts else "[ok] 표시할 로그가 없습니다."
     return render_template("index.html",
-                           devices=device_list_df.to_dict(orient="records"),
+                           devices=inventory.device_list(),
                            result=result_html)
 
 @app.route("/run_system", methods=["POST"])
 def run_system():
-    selected_name = request.form.get("selected_device")
     level = (request.form.get("level") or "CRITICAL").upper()
     username = request.form.get("username") or ""
     password = request.form.get("password") or ""
+    refresh  = _form_flag("refresh")
 
-    if not selected_name:
-        return render_template(
-            "index.html",
-            devices=device_list_df.to_dict(orient="records"),
-            result="장비 선택 필수"
-        )
+    targets, message = _system_targets(request.form.get("selected_device"))
+    if message:
+        return render_template("index.html", devices=inventory.device_list(), result=message)
+    name, info = targets[0]
+    html = _system_block(name, info, level, username, password, refresh)
+    return render_template("index.html", devices=inventory.device_list(), result=html)
 
-    info = firewall_info_dict.get(selected_name)
-    if not info:
-        return render_template(
-            "index.html",
-            devices=device_list_df.to_dict(orient="records"),
-            result="장비 정보 없음."
-        )
+# ── 백그라운드 조회 job ──────────────────────────────────────
+# POST /jobs            폼은 /run_traffic, /run_system 과 같음 + kind=traffic|system → 202 {job_id, ...}
+# GET  /jobs/<id>        진행 상황(장비별 queued/running/done/error/cancelled)
+# GET  /jobs/<id>/result 끝난 장비의 결과 HTML 포함
+# POST /jobs/<id>/cancel 취소
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    kind     = (request.form.get("kind") or "traffic").strip()
+    username = (request.form.get("username") or "").strip()
+    password = (request.form.get("password") or "").strip()
+    refresh  = _form_flag("refresh")
+    selected = request.form.get("selected_device")
 
-    vendor = info.get("vendor", "")
-    fw_ip  = info.get("management_ip", "")
-    app.logger.info("[system] name=%s vendor=%s ip=%s level=%s", selected_name, vendor, fw_ip, level)
+    try:
+        if kind == "traffic":
+            mode   = (request.form.get("mode") or "manual").strip()
+            src_ip = (request.form.get("src_ip") or "").strip()
+            dst_ip = (request.form.get("dst_ip") or "").strip()
+            window, message = _form_window()
+            if message:
+                return jsonify({"error": message}), 400
+            targets, message = _traffic_targets(mode, src_ip, dst_ip, selected)
+            params = {"mode": mode, "src_ip": src_ip, "dst_ip": dst_ip, "window": window}
+            def run_one(name, info, cancel):
+                return _traffic_block(name, info, src_ip, dst_ip, username, password, refresh, cancel, window,
+                                      raise_errors=True)
+        elif kind == "system":
+            level = (request.form.get("level") or "CRITICAL").upper()
+            targets, message = _system_targets(selected)
+            params = {"device": selected, "level": level}
+            def run_one(name, info, cancel):
+                return _system_block(name, info, level, username, password, refresh, cancel,
+                                     raise_errors=True)
+        else:
+            return jsonify({"error": f"unknown kind: {kind}"}), 400
+    except Exception as e:
+        app.logger.exception("[jobs] target resolve error")
+        return jsonify({"error": f"대상 장비 조회 실패: {e}"}), 400
 
+    if not targets:
+        return jsonify({"job_id": None, "message": message or "[ok] 표시할 로그가 없습니다."})
     try:
-        if vendor == "Paloalto":
-            # unified → records → pretty
-            recs_or_html = palo_system_records(fw_ip, level, username, password)
-            if _is_html(recs_or_html):
-                html = recs_or_html
-            else:
-                if isinstance(recs_or_html, list) and recs_or_html:
-                    app.logger.info("[PALO system sample keys] %s", list(recs_or_html[0].keys()))
-                    app.logger.info("[PALO system sample] %s", _peek(recs_or_html[0]))
-                html = render_system_table(recs_or_html)
-
-        elif vendor == "Secui Bluemax":
-            # raw → pretty
-            raw = fetch_secui_system_logs(info, level)
-            # from pretty import _to_records
-            # tmp = _to_records(raw)
-            # if tmp:
-            #     app.logger.info("[SECUI system to_records keys] %s", list(tmp[0].keys()))
-            #     app.logger.info("[SECUI system to_records sample] %s", _peek(tmp[0]))
-            html = render_system_table(raw)
+        job = job_manager.submit(kind, targets, run_one, params,
+                                 timeout=device_timeout([t[1] for t in targets]))
+    except JobLimit as e:
+        return jsonify({"error": str(e)}), 429
+    return jsonify(job.to_dict()), 202
 
-        else:
-            html = f"{vendor}는 지원하지 않는 방화벽입니다."
+def _job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return None, (jsonify({"error": "job 이 없거나 만료되었습니다."}), 404)
+    return job, None
 
-    except Exception as e:
-        app.logger.exception("[system] fetch/render error")
-        html = f"[error] {selected_name}({vendor}) 처리 중 오류: {e}"
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job, err = _job_or_404(job_id)
+    return err or jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/result")
+def job_result(job_id):
+    job, err = _job_or_404(job_id)
+    return err or jsonify(job.to_dict(with_results=True))
+
+@app.route("/jobs/<job_id>/cancel", methods=["POST"])
+def job_cancel(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "job 이 없거나 만료되었습니다."}), 404
+    return jsonify(job.to_dict())
+
+# ── 결과 표 페이지 ───────────────────────────────────────────
+# GET /results/<handle>?page=1&size=100&sort=<컬럼>&desc=1&f.<컬럼>=<검색어>
+#   → {total, matched, page, pages, columns, rows, ...}  (f.* 는 대소문자 무시 부분 일치, 여러 개면 모두 만족)
+@app.route("/results/<handle>")
+def result_page(handle):
+    try:
+        page = int(request.args.get("page") or 1)
+        size = int(request.args.get("size") or RESULT_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "page/size 는 정수여야 합니다."}), 400
+    sort = (request.args.get("sort") or "").strip()
+    desc = (request.args.get("desc") or "").strip() in ("1", "on", "true")
+    filters = {k[2:]: v for k, v in request.args.items() if k.startswith("f.")}
+    try:
+        res = result_pages.page(handle, page, size, sort=sort, desc=desc, filters=filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if res is None:
+        return jsonify({"error": "결과가 만료되었습니다. 다시 조회하세요."}), 404
+    return jsonify(res)
+
+@app.route("/pool_stats")
+def pool_stats():
+    # 벤더 API 연결 풀 상태(호스트별 재사용 비율/열린 연결 수)
+    return jsonify(http_pool.pool_stats())
+
+@app.route("/vendor_stats")
+def vendor_stats():
+    # 벤더 어댑터별 동시 job 수/대기 수와 선언된 한도
+    return jsonify(vendors.stats())
+
+@app.route("/cache_stats")
+def cache_stats():
+    # 결과 캐시 적중/미스/제거 횟수와 현재 크기
+    return jsonify(result_cache.stats())
+
+@app.route("/result_stats")
+def result_stats():
+    # 보관 중인 결과 핸들 수/행 수, 페이지 요청/만료/제거 횟수
+    return jsonify(result_pages.stats())
+
+@app.route("/store_stats")
+def store_stats():
+    # 로컬 로그 저장소 행 수/받은 구간 수, 로컬 응답/빠진 구간 조회 횟수
+    return jsonify(log_store.get_store().stats())
+
+@app.route("/job_stats")
+def job_stats():
+    # 백그라운드 조회 job 수(상태별)와 실행 중인 장비 수, 한도
+    return jsonify(job_manager.stats())
+
+@app.route("/metrics")
+def metrics_endpoint():
+    # 단계별 소요 시간 히스토그램(장비/벤더/로그 종류), 폴링 횟수, 수신 바이트, 파싱 행 수, 라우트별 지연
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route("/collector_stats")
+def collector_stats():
+    # 시스템 로그 수집기: 장비/레벨별 cursor 시각, 버퍼 행 수, 주기별 새 행 수/상한 도달 횟수/오류
+    c = collector.collector
+    return jsonify(c.stats() if c else {"running": False})
 
-    return render_template("index.html", devices=device_list_df.to_dict(orient="records"), result=html)
+# debug 리로더의 감시(부모) 프로세스에서는 켜지 않는다(같은 장비를 두 번 수집하지 않도록)
+if __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    collector.start_from_env()
 
 # ── 엔트리포인트 ─────────────────────────────────────────────
 if __name__ == "__main__":
@@ -0,0 +1,447 @@
+# async_engine.py
+# 벤더 로그 조회용 asyncio 엔진.
+# 백그라운드 스레드 하나에서 이벤트 루프를 돌리고, Palo(keygen → start → poll → get)와
+# Secui(login → start → status → page → end) job을 코루틴으로 실행한다.
+# 대기 중인 job은 스레드를 잡지 않으므로 루프 하나로 수백 개의 job을 동시에 진행할 수 있다.
+#
+# Flask 라우트 등 동기 코드는 아래 동기 래퍼(palo_*_records / fetch_secui_*_logs)를 쓴다.
+# 시그니처와 반환값은 palo_unified / secui_log_api 의 같은 이름 함수와 같다.
+# aiohttp 가 필요하다(선택 의존성, 없으면 엔진 시작 시 RuntimeError).
+# Secui 로그인/재시도/종료 실패는 동기 구현과 같은 secui_log_api 로거(secui.log)로 남긴다.
+# 단계별 시간(keygen/job_start/poll/download_parse, login/search_start/poll/page_download/json_parse/search_end)과
+# 폴링/행/바이트 카운터도 동기 구현과 같은 이름으로 metrics 에 기록한다(VENDOR_IO 와 무관하게 /metrics 가 같음).
+
+import asyncio
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # 선택 의존성
+    aiohttp = None
+
+import http_pool
+import metrics
+import palo_inified as palo
+import secui_log_api as secui
+from palo_key_cache import api_key_cache, raise_for_auth, PaloAuthError
+from polling import apoll_until, PollCancelled
+from records import SystemRecord, TrafficRecord
+
+ENGINE_MAX_CONNECTIONS = 256   # 루프 전체 동시 연결 상한
+ENGINE_PER_HOST = 10           # 호스트당 동시 연결 상한(http_pool.POOL_MAXSIZE 와 같은 기본값)
+READ_CHUNK = 64 * 1024         # action=get 응답을 파서에 넣는 단위
+
+class AsyncEngine:
+    """이벤트 루프 스레드 + aiohttp 세션 하나. submit()/run()으로 코루틴을 실행."""
+
+    def __init__(self, max_connections: int = ENGINE_MAX_CONNECTIONS, per_host: int = ENGINE_PER_HOST):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # 아래는 루프 스레드에서만 접근
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._logins: Dict[Tuple[Any, ...], "asyncio.Task"] = {}   # 진행 중인 keygen/login (single-flight)
+
+    # ── 루프/세션 ───────────────────────────────────────────
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if aiohttp is None:
+            raise RuntimeError("async_engine 을 쓰려면 aiohttp 가 필요합니다 (pip install aiohttp)")
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                t = threading.Thread(target=loop.run_forever, name="vendor-io", daemon=True)
+                t.start()
+                self._loop, self._thread = loop, t
+            return self._loop
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             limit_per_host=self.per_host, ssl=False)
+            timeout = aiohttp.ClientTimeout(sock_connect=http_pool.CONNECT_TIMEOUT,
+                                            sock_read=http_pool.READ_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """코루틴을 루프에 올리고 concurrent.futures.Future 반환. 호출 스레드의 metrics 태그를 루프 쪽 태스크에 물려준다."""
+        return metrics.wrap(asyncio.run_coroutine_threadsafe)(coro, self._ensure_loop())
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None,
+            cancel: Optional[threading.Event] = None) -> Any:
+        """
+        동기 코드에서 코루틴 결과를 기다림.
+        timeout 초과(TimeoutError)나 cancel set(PollCancelled) 시 코루틴도 취소한다.
+        """
+        fut = self.submit(coro)
+        try:
+            if cancel is None:
+                return fut.result(timeout)
+            waited = 0.0
+            while True:
+                try:
+                    return fut.result(0.1)
+                except FutureTimeout:
+                    waited += 0.1
+                    if cancel.is_set():
+                        raise PollCancelled("취소됨")
+                    if timeout is not None and waited >= timeout:
+                        raise
+        except BaseException:
+            fut.cancel()
+            raise
+
+    def run_all(self, coros: Sequence[Awaitable[Any]], timeout: Optional[float] = None) -> List[Any]:
+        """여러 코루틴을 한꺼번에 실행. 결과 순서는 입력 순서, 실패한 항목은 예외 객체."""
+        async def _all():
+            return await asyncio.gather(*coros, return_exceptions=True)
+        return self.run(_all(), timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        async def _close():
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+        asyncio.run_coroutine_threadsafe(_close(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(10)
+
+    async def _single_flight(self, key: Tuple[Any, ...], make: Callable[[], Awaitable[Any]]) -> Any:
+        """같은 key의 로그인이 진행 중이면 그 결과를 같이 기다린다."""
+        task = self._logins.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make())
+            self._logins[key] = task
+            task.add_done_callback(lambda _t: self._logins.pop(key, None))
+        return await asyncio.shield(task)
+
+    # ── Palo ───────────────────────────────────────────────
+    async def _palo_text(self, base: str, params: Dict[str, Any]) -> str:
+        async with self._get_session().get(base, params=params) as r:
+            metrics.BYTES_RECEIVED.inc(len(await r.read()))
+            body = await r.text()   # read() 한 본문을 디코드
+            raise_for_auth(r.status, body)
+            r.raise_for_status()
+            return body
+
+    async def _palo_key(self, firewall_ip: str, account: str, password: str) -> Tuple[str, bool]:
+        """(API 키, 이번에 새로 발급했는지)"""
+        key = api_key_cache.get(firewall_ip, account, password)
+        if key:
+            return key, False
+
+        async def _keygen():
+            params = {"type": "keygen", "user": account, "password": password}
+            with metrics.span("keygen"):
+                key = palo._key_from_keygen(await self._palo_text(palo._api_base(firewall_ip), params))
+            api_key_cache.put(firewall_ip, account, password, key)
+            return key
+        return await self._single_flight(("palo", firewall_ip, account, password), _keygen), True
+
+    async def _palo_get_records(self, base: str, params: Dict[str, Any], fields: Sequence[str],
+                                convert: Callable[[Dict[str, str]], palo.LogRecord],
+                                spent: Optional[List[float]] = None) -> Optional[List[palo.LogRecord]]:
+        """
+        action=get 1회: FIN이면 레코드 리스트, 아직이면 None(본문은 status까지만 읽고 끊음).
+        FIN 응답 1건을 받으며 파싱한 시간은 download_parse 로 기록하고 spent 에 더한다.
+        """
+        t0 = time.perf_counter()
+        async with self._get_session().get(base, params=params) as r:
+            if r.status >= 400:
+                raise_for_auth(r.status, await r.text())
+                r.raise_for_status()
+            parser = ET.XMLPullParser(events=("start", "end"))
+            events = palo._LogEvents(fields)
+            out: List[palo.LogRecord] = []
+            async for chunk in r.content.iter_chunked(READ_CHUNK):
+                metrics.BYTES_RECEIVED.inc(len(chunk))
+                parser.feed(chunk)
+                for ev, el in parser.read_events():
+                    values = events.feed(ev, el)
+                    if values is not None:
+                        out.append(convert(values))
+                if not events.error and events.status is not None and events.status != "FIN":
+                    break
+            else:
+                parser.close()
+                for ev, el in parser.read_events():
+                    values = events.feed(ev, el)
+                    if values is not None:
+                        out.append(convert(values))
+            if events.error:
+                events.raise_error()
+            status = events.status or ""
+            if status == "FAIL":
+                raise RuntimeError(f"job {params.get('jobid')} failed")
+            if status != "FIN":
+                return None
+            dt = time.perf_counter() - t0
+            metrics.STAGE_SECONDS.observe(dt, stage="download_parse")
+            metrics.ROWS_PARSED.inc(len(out), stage="download_parse")
+            if spent is not None:
+                spent.append(dt)
+            return out
+
+    async def _palo_run_job(self, base: str, key: str, start_params: Dict[str, Any],
+                            fields: Sequence[str], convert: Callable[[Dict[str, str]], palo.LogRecord],
+                            poll_interval: float, max_wait_sec: float) -> List[palo.LogRecord]:
+        with metrics.span("job_start"):
+            start_xml = await self._palo_text(base, dict(start_params, key=key))
+        jobid = palo._extract_job_id(start_xml)
+        if not jobid:
+            raise RuntimeError(f"no job id\n{start_xml[:800]}")
+        get_params = {"type": "log", "action": "get", "key": key, "jobid": jobid}
+        polls = [0]
+        spent: List[float] = []   # 마지막(FIN) 응답의 다운로드+파싱 시간 → poll 에서 뺌
+
+        async def _check():
+            polls[0] += 1
+            metrics.POLLS.inc()
+            try:
+                return await self._palo_get_records(base, get_params, fields, convert, spent)
+            except ET.ParseError as e:
+                raise RuntimeError(f"job {jobid} XML parse error: {e}")
+
+        t0 = time.perf_counter()
+        try:
+            out = await apoll_until(_check, max_wait_sec, max_interval=poll_interval, what=f"job {jobid}")
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - t0 - sum(spent), stage="poll")
+        metrics.POLLS_PER_JOB.observe(polls[0])
+        return out
+
+    async def palo_log_job(self, firewall_ip: str, account: str, password: str,
+                           start_params: Dict[str, Any], fields: Sequence[str],
+                           convert: Callable[[Dict[str, str]], palo.LogRecord],
+                           poll_interval: float = 1.0, max_wait_sec: float = 20,
+                           nlogs: Optional[int] = None) -> List[palo.LogRecord]:
+        """
+        캐시 키로 log job 실행. nlogs(기본: start_params 의 nlogs)가 PALO_MAX_NLOGS 를 넘으면
+        palo_inified._run_log_pages 처럼 skip 을 늘려 가며 job 을 이어서 실행한다.
+        인증 오류면 키를 새로 받아 처음부터 1회 재시도.
+        """
+        base = palo._api_base(firewall_ip)
+        if nlogs is None:
+            nlogs = int(start_params.get("nlogs") or palo.PALO_MAX_NLOGS)
+        for attempt in range(2):
+            key, fresh = await self._palo_key(firewall_ip, account, password)
+            out: List[palo.LogRecord] = []
+            try:
+                while len(out) < nlogs:
+                    params, page = palo._page_params(start_params, nlogs, len(out))
+                    got = await self._palo_run_job(base, key, params, fields, convert,
+                                                   poll_interval, max_wait_sec)
+                    metrics.ROWS_PER_QUERY.observe(len(got))
+                    out.extend(got)
+                    if len(got) < page:
+                        break
+                return out
+            except PaloAuthError:
+                api_key_cache.invalidate(firewall_ip, account)
+                if fresh or attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+    async def palo_system_records(self, firewall_ip: str, severity_ui: str, account: str, password: str,
+                                  nlogs: int = 100, poll_interval: float = 1.0,
+                                  max_wait_sec: float = 20,
+                                  start: Optional[float] = None, end: Optional[float] = None) -> List[SystemRecord]:
+        return await self.palo_log_job(firewall_ip, account, password,
+                                       palo._system_job_params(severity_ui, nlogs, start, end),
+                                       palo._SYSTEM_FIELDS, palo._system_record,
+                                       poll_interval, max_wait_sec, nlogs)
+
+    async def palo_traffic_records(self, firewall_ip: str, src_ip: str, dst_ip: str,
+                                   account: str, password: str, nlogs: int = 100,
+                                   poll_interval: float = 1.0, max_wait_sec: float = 20,
+                                   start: Optional[float] = None, end: Optional[float] = None) -> List[TrafficRecord]:
+        return await self.palo_log_job(firewall_ip, account, password,
+                                       palo._traffic_job_params(src_ip, dst_ip, nlogs, start, end),
+                                       palo._TRAFFIC_FIELDS, palo._traffic_record,
+                                       poll_interval, max_wait_sec, nlogs)
+
+    # ── Secui ──────────────────────────────────────────────
+    async def _secui_token(self, info: Dict[str, Any]) -> Optional[str]:
+        base_url, client_id, client_secret = info['base_url'], info['client_id'], info['client_secret']
+        token = secui.token_cache.peek(base_url, client_id)
+        if token:
+            return token
+
+        async def _login():
+            url = f"{base_url}/api/au/external/login"
+            try:
+                with metrics.span("login"):
+                    async with self._get_session().post(url, json=secui._login_payload(client_id, client_secret),
+                                                        headers=secui.SECUI_HEADERS) as r:
+                        body = await r.read()
+                metrics.BYTES_RECEIVED.inc(len(body))
+                r.raise_for_status()
+                token, ttl = secui._token_from_login(json.loads(body))
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                secui.log.warning("Secui 토큰 발급 실패: %s", e)
+                return None
+            if token:
+                secui.token_cache.store(base_url, client_id, token, ttl)
+            return token
+        return await self._single_flight(("secui", base_url, client_id), _login)
+
+    async def _secui_call(self, method: str, info: Dict[str, Any], path: str,
+                          **kwargs: Any) -> Dict[str, Any]:
+        """
+        secui_log_api._secui_call 의 async 버전. 응답 json(dict)을 반환.
+        401이면 토큰을 버리고 1회 재시도, 토큰을 얻지 못하면 SecuiError.
+        """
+        return json.loads(await self._secui_call_raw(method, info, path, **kwargs) or b"null") or {}
+
+    async def _secui_call_raw(self, method: str, info: Dict[str, Any], path: str, **kwargs: Any) -> bytes:
+        """_secui_call 과 같고 응답 본문(bytes)을 그대로 반환(파싱 시간을 따로 재기 위해)."""
+        url = f"{info['base_url']}{path}"
+        for attempt in range(2):
+            token = await self._secui_token(info)
+            if not token:
+                raise secui.SecuiError("토큰 발급 실패")
+            headers = dict(secui.SECUI_HEADERS, Authorization=token)
+            async with self._get_session().request(method, url, headers=headers, **kwargs) as r:
+                if r.status == 401 and not attempt:
+                    secui.log.warning("Secui 401 → 토큰 재발급 후 재시도: %s", path)
+                    secui.token_cache.invalidate(info['base_url'], info['client_id'], token)
+                    await r.read()   # 연결 재사용을 위해 본문을 비움
+                    continue
+                r.raise_for_status()
+                body = await r.read()
+                metrics.BYTES_RECEIVED.inc(len(body))
+                return body
+        raise AssertionError("unreachable")
+
+    async def _secui_page(self, info: Dict[str, Any], request_id: str, start: int, end: int) -> Dict[str, Any]:
+        with metrics.span("page_download"):
+            body = await self._secui_call_raw("GET", info, f"/api/lr/log/{request_id}/page/{start}/to/{end}")
+        with metrics.span("json_parse"):
+            return (json.loads(body or b"null") or {}).get("result", {})
+
+    async def _secui_pages(self, info: Dict[str, Any], request_id: str, limit: int,
+                           page_rows: int, window: int) -> List[Dict[str, Any]]:
+        """[0, limit) 를 page_rows 단위로, 최대 window개씩 동시에 받아 순서대로 반환."""
+        ranges = deque((a, min(a + page_rows, limit)) for a in range(0, limit, page_rows))
+        pending: "deque[asyncio.Task]" = deque()
+        out = []
+        try:
+            while ranges and len(pending) < max(1, window):
+                pending.append(asyncio.ensure_future(self._secui_page(info, request_id, *ranges.popleft())))
+            while pending:
+                out.append(await pending.popleft())
+                if ranges:
+                    pending.append(asyncio.ensure_future(self._secui_page(info, request_id, *ranges.popleft())))
+        finally:
+            for t in pending:
+                t.cancel()
+        return out
+
+    async def _secui_search(self, info: Dict[str, Any], payload: Dict[str, Any], max_rows: int,
+                            page_rows: int, window: int, max_wait_sec: float) -> List[List[Any]]:
+        """검색 1건 → [columns] + rows. 실패 시 예외 (secui_log_api._iter_search 와 같은 흐름)."""
+        request_id = None
+        try:
+            with metrics.span("search_start"):
+                data = await self._secui_call("POST", info, "/api/lr/log/start", json=payload)
+            if data.get("code") != "ok":
+                raise secui.SecuiError(f"검색 시작 실패: {data.get('message', 'An unknown error occurred')}")
+            request_id = data.get("result", {}).get("request_id")
+            if not request_id:
+                raise secui.SecuiError("요청 ID가 없습니다")
+
+            polls = [0]
+
+            async def _check():
+                polls[0] += 1
+                metrics.POLLS.inc()
+                status_data = await self._secui_call("GET", info, f"/api/lr/log/{request_id}/status")
+                return secui._search_status(status_data, request_id)
+
+            with metrics.span("poll"):
+                status_data = await apoll_until(_check, max_wait_sec, what=f"secui search {request_id}")
+            metrics.POLLS_PER_JOB.observe(polls[0])
+
+            searched_cnt = int(status_data.get("result", {}).get("searched_cnt", 0) or 0)
+            limit = max(0, min(searched_cnt, max_rows))
+            log_type = payload.get("log_type")
+            if limit == 0:
+                res = await self._secui_page(info, request_id, 0, 0)
+                return ([secui._columns_for(res, secui._page_rows(res), log_type)]
+                        + list(secui._iter_table_rows(secui._page_rows(res), [])))
+            table: List[List[Any]] = []
+            for res in await self._secui_pages(info, request_id, limit, page_rows, window):
+                rows = secui._page_rows(res)
+                if not table:
+                    table.append(secui._columns_for(res, rows, log_type))
+                if isinstance(rows, list):
+                    metrics.ROWS_PARSED.inc(len(rows), stage="page")
+                table.extend(secui._iter_table_rows(rows, table[0]))
+            metrics.ROWS_PER_QUERY.observe(len(table) - 1)
+            return table
+        finally:
+            if request_id:
+                try:
+                    with metrics.span("search_end"):
+                        await self._secui_call("DELETE", info, f"/api/lr/log/{request_id}/end")
+                except Exception as e:
+                    secui.log.warning("Secui 검색 종료 실패: %s", e)
+
+    async def secui_search(self, info: Dict[str, Any], payload: Dict[str, Any],
+                           max_rows: int = secui.MAX_ROWS, page_rows: int = secui.PAGE_ROWS,
+                           window: int = secui.PAGE_FETCH_WINDOW,
+                           max_wait_sec: float = secui.SEARCH_MAX_WAIT_SEC) -> Any:
+        """2차원 배열 또는 오류 문자열 (secui_log_api._run_search 와 같은 반환 규칙)."""
+        try:
+            return await self._secui_search(info, payload, max_rows, page_rows, window, max_wait_sec)
+        except secui.SecuiError as e:
+            return str(e)
+        except Exception as e:
+            return f"오류 발생: {str(e)}"
+
+# 모듈 공용 엔진
+engine = AsyncEngine()
+
+# ─────────────────────────────────────────────────────────────
+# 동기 래퍼 (palo_unified / secui_log_api 와 같은 시그니처)
+# ─────────────────────────────────────────────────────────────
+def palo_system_records(firewall_ip: str, severity_ui: str, account: str, password: str,
+                        nlogs: int = 100, poll_interval: float = 1.0, max_wait_sec: int = 20,
+                        cancel: Optional[threading.Event] = None,
+                        start: Optional[float] = None, end: Optional[float] = None) -> List[SystemRecord]:
+    return engine.run(engine.palo_system_records(firewall_ip, severity_ui, account, password,
+                                                 nlogs, poll_interval, max_wait_sec, start, end), cancel=cancel)
+
+def palo_traffic_records(firewall_ip: str, src_ip: str, dst_ip: str, account: str, password: str,
+                         nlogs: int = 100, poll_interval: float = 1.0, max_wait_sec: int = 20,
+                         cancel: Optional[threading.Event] = None,
+                         start: Optional[float] = None, end: Optional[float] = None) -> List[TrafficRecord]:
+    return engine.run(engine.palo_traffic_records(firewall_ip, src_ip, dst_ip, account, password,
+                                                  nlogs, poll_interval, max_wait_sec, start, end), cancel=cancel)
+
+def fetch_secui_system_logs(info, level, max_rows=secui.MAX_ROWS, page_rows=secui.PAGE_ROWS,
+                            total_rows=secui.TOTAL_ROWS, max_wait_sec=secui.SEARCH_MAX_WAIT_SEC, cancel=None,
+                            start=None, end=None):
+    payload = secui._system_payload(level, total_rows, page_rows, start, end)
+    return engine.run(engine.secui_search(info, payload, max_rows, page_rows,
+                                          secui.PAGE_FETCH_WINDOW, max_wait_sec), cancel=cancel)
+
+def fetch_secui_traffic_logs(info, src_ip, dst_ip, max_rows=secui.MAX_ROWS, page_rows=secui.PAGE_ROWS,
+                             total_rows=secui.TOTAL_ROWS, max_wait_sec=secui.SEARCH_MAX_WAIT_SEC, cancel=None,
+                             start=None, end=None):
+    payload = secui._traffic_payload(src_ip, dst_ip, total_rows, page_rows, start, end)
+    return engine.run(engine.secui_search(info, payload, max_rows, page_rows,
+                                          secui.PAGE_FETCH_WINDOW, max_wait_sec), cancel=cancel)
@@ -0,0 +1,85 @@
+# bench/bench_alias_plan.py
+# pretty._coerce_traffic_aliases 벤치마크 (레코드마다 별칭 탐색 vs 키 집합별 계획 캐시).
+#
+#   cd API && python bench/bench_alias_plan.py --rows 100000
+#
+# Palo/Secui 형태의 합성 레코드로 두 방식을 돌려 records/sec 를 출력하고, 결과가 같은지도 확인한다.
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pretty  # noqa: E402
+
+# 이전 구현(비교 기준) — 레코드마다 ascii_map 생성 + 전체 별칭 정규화
+def _legacy_aliases(records):
+    out = []
+    for rec in records:
+        if not isinstance(rec, dict):
+            out.append(rec); continue
+        ascii_map = {pretty._norm_ascii_key(k): k for k in rec.keys()}
+        new = dict(rec)
+        for canon, aliases in pretty._TRAFFIC_ALIASES.items():
+            if new.get(canon):
+                continue
+            val = None
+            for a in aliases:
+                if a in rec and rec[a] not in (None, ""):
+                    val = rec[a]; break
+                ak = pretty._norm_ascii_key(a)
+                if ak and ak in ascii_map:
+                    v = rec.get(ascii_map[ak])
+                    if v not in (None, ""):
+                        val = v; break
+            if val not in (None, ""):
+                new[canon] = str(val)
+        out.append(new)
+    return out
+
+def _ip(rnd):
+    return ".".join(str(rnd.randint(1, 254)) for _ in range(4))
+
+def make_records(n, seed=7):
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        if i % 2 == 0:
+            # Palo unified 형태
+            out.append({"time": "2025-10-20 12:00:00", "src": _ip(rnd), "dst": _ip(rnd),
+                        "dport": str(rnd.randint(1, 65535)), "app": "ssl",
+                        "action": rnd.choice(["allow", "deny"]), "rule": f"web-{i % 50}"})
+        else:
+            # Secui 테이블 형태(한글/구분자 섞인 컬럼명, 일부 빈 값)
+            out.append({"Start Time": "2025-10-20 12:00:00", "Source-IP": _ip(rnd),
+                        "Destination IP": _ip(rnd), "Service_Port": str(rnd.randint(1, 65535)),
+                        "Protocol": rnd.choice(["TCP", "UDP", ""]), "결과": rnd.choice(["허용", "차단"]),
+                        "정책명": f"내부-{i % 30}", "message": ""})
+    return out
+
+def _rate(fn, data):
+    t0 = time.perf_counter()
+    out = fn(data)
+    dt = time.perf_counter() - t0
+    return out, len(data) / dt if dt else float("inf")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=100_000)
+    args = ap.parse_args()
+
+    records = make_records(args.rows)
+    print(f"records: {len(records):,}")
+    before, before_rate = _rate(_legacy_aliases, records)
+    pretty._alias_plan.cache_clear()
+    after, after_rate = _rate(pretty._coerce_traffic_aliases, records)
+    mismatch = sum(1 for a, b in zip(before, after) if a != b)
+    print(f"{'before rec/s':>16}{'after rec/s':>16}{'speedup':>10}{'mismatch':>10}")
+    print(f"{before_rate:>16,.0f}{after_rate:>16,.0f}{after_rate / before_rate:>9.1f}x{mismatch:>10}")
+    print(f"plan cache: {pretty._alias_plan.cache_info()}")
+
+if __name__ == "__main__":
+    main()
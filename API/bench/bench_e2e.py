@@ -0,0 +1,178 @@
+# bench/bench_e2e.py
+# 종단 간 벤치마크: 로컬 스탠드인 장비(PAN-OS / Secui) 여러 대 + 실제 HTTP 로 띄운 Flask 앱.
+#
+#   cd API && python bench/bench_e2e.py --palo 4 --secui 4 --concurrency 1,4,16 --requests 64
+#   cd API && VENDOR_IO=async python bench/bench_e2e.py --latency 0.02 --json result/e2e.json
+#
+# 라우트(--routes)마다, 벤더마다, 동시 요청 수(--concurrency)마다 --requests 건을 보내고
+# p50/p95/p99 지연(ms)과 처리량(req/s), 오류 건수를 표로 출력한다(--json 으로 저장해 회귀 비교).
+# 요청은 해당 벤더 장비들에 돌아가며 배분하고, 기본은 refresh=1 로 결과 캐시를 건너뛴다(--cached 로 끔).
+#
+# 스탠드인 설정: --latency(응답마다 지연), --job-sec(로그 job/검색 완료까지 시간), --rows(결과 건수)
+# 인벤토리는 엑셀 대신 스탠드인 장비 목록으로 바꿔 끼운다(실제 장비/파일 불필요).
+
+import argparse
+import contextlib
+import itertools
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+os.environ.setdefault("LOG_STORE_DB", ":memory:")
+
+import requests  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+import inventory  # noqa: E402
+from standins import PaloStandin, SecuiStandin  # noqa: E402
+
+# 라우트 → (경로, 폼 만들기(장비명), 오류 표식). HTML 라우트는 장비 오류도 200 이라 본문의 오류 문구로 판정
+_HTML_ERROR = "처리 중 오류:".encode()
+ROUTES = {
+    "run_traffic": ("/run_traffic", lambda name: {"mode": "manual", "selected_device": name,
+                                                  "src_ip": "10.0.0.1", "dst_ip": "8.8.8.8"}, _HTML_ERROR),
+    "run_system":  ("/run_system", lambda name: {"selected_device": name, "level": "CRITICAL"}, _HTML_ERROR),
+    "api_traffic": ("/api/traffic", lambda name: {"device": name, "src_ip": "10.0.0.1", "dst_ip": "8.8.8.8"},
+                    b'"error"'),
+    "api_system":  ("/api/system", lambda name: {"device": name, "level": "CRITICAL"}, b'"error"'),
+}
+
+def start_fleet(args):
+    """스탠드인 장비들을 띄우고 {벤더: [(장비명, info)]} 와 서버 목록을 돌려준다."""
+    fleet, servers = {}, []
+    for i in range(args.palo):
+        st = PaloStandin(entries=args.rows, job_sec=args.job_sec, latency=args.latency).start()
+        servers.append(st)
+        fleet.setdefault("Paloalto", []).append((f"PA-{i}", {"management_ip": st.url, "vendor": "Paloalto"}))
+    for i in range(args.secui):
+        st = SecuiStandin(rows=args.rows, job_sec=args.job_sec, latency=args.latency).start()
+        servers.append(st)
+        info = st.info(client_id=f"bench-{i}")
+        fleet.setdefault(info["vendor"], []).append((f"SC-{i}", info))
+    return fleet, servers
+
+def install_inventory(fleet):
+    infos = {name: info for targets in fleet.values() for name, info in targets}
+    inventory.firewall_info_dict = lambda: infos
+    inventory.device_list = lambda: [{"name": n, "management_ip": i["management_ip"], "vendor": i["vendor"]}
+                                     for n, i in infos.items()]
+
+def serve(app):
+    srv = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=srv.serve_forever, name="bench-app", daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_port}"
+
+def percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[max(0, math.ceil(p / 100 * len(sorted_vals)) - 1)]
+
+def run_level(base, route, targets, concurrency, n, refresh):
+    """동시 요청 concurrency 개로 n 건. 반환: 지연 분포/처리량/오류 수"""
+    path, make_form, error_mark = ROUTES[route]
+    seq = itertools.count()
+    lat, errors = [], [0]
+    lock = threading.Lock()
+
+    def _worker():
+        sess = requests.Session()
+        mine, bad = [], 0
+        while True:
+            i = next(seq)
+            if i >= n:
+                break
+            form = dict(make_form(targets[i % len(targets)][0]), username="bench", password="bench")
+            if refresh:
+                form["refresh"] = "1"
+            t0 = time.perf_counter()
+            try:
+                r = sess.post(base + path, data=form, timeout=120)
+                ok = r.status_code == 200 and error_mark not in r.content
+            except requests.RequestException:
+                ok = False
+            mine.append(time.perf_counter() - t0)
+            bad += 0 if ok else 1
+        sess.close()
+        with lock:
+            lat.extend(mine)
+            errors[0] += bad
+
+    t0 = time.perf_counter()
+    workers = [threading.Thread(target=_worker) for _ in range(concurrency)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - t0
+    lat.sort()
+    return {"requests": len(lat), "errors": errors[0], "wall_sec": round(wall, 3),
+            "rps": round(len(lat) / wall, 1) if wall else 0.0,
+            "p50_ms": round(percentile(lat, 50) * 1000, 1),
+            "p95_ms": round(percentile(lat, 95) * 1000, 1),
+            "p99_ms": round(percentile(lat, 99) * 1000, 1)}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--palo", type=int, default=4, help="PAN-OS 스탠드인 장비 수")
+    ap.add_argument("--secui", type=int, default=4, help="Secui 스탠드인 장비 수")
+    ap.add_argument("--latency", type=float, default=0.01, help="스탠드인 응답마다 지연(초)")
+    ap.add_argument("--job-sec", type=float, default=0.2, help="로그 job/검색 완료까지 시간(초)")
+    ap.add_argument("--rows", type=int, default=100, help="장비당 결과 건수")
+    ap.add_argument("--routes", default="run_traffic,run_system", help="|".join(ROUTES))
+    ap.add_argument("--concurrency", default="1,4,16", help="쉼표 구분 동시 요청 수")
+    ap.add_argument("--requests", type=int, default=64, help="단계별 요청 수")
+    ap.add_argument("--cached", action="store_true", help="refresh 없이 보내 결과 캐시 적중도 포함")
+    ap.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = ap.parse_args()
+
+    routes = [r.strip() for r in args.routes.split(",") if r.strip()]
+    for r in routes:
+        if r not in ROUTES:
+            ap.error(f"unknown route: {r}")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    fleet, servers = start_fleet(args)
+    install_inventory(fleet)
+    import app as app_module   # 인벤토리를 바꿔 끼운 뒤 import (시작 시 인벤토리를 한 번 읽음)
+    logging.disable(logging.INFO)   # 요청/조회 로그 끄기(경고 이상만)
+    srv, base = serve(app_module.app)
+
+    print(f"app {base} · vendor I/O={os.environ.get('VENDOR_IO') or 'sync'} · "
+          f"latency={args.latency}s job={args.job_sec}s rows={args.rows} refresh={not args.cached}")
+    print(f"{'route':<12} {'vendor':<14} {'conc':>4} {'n':>5} {'err':>4} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>7}")
+    results = []
+    try:
+        with open(os.devnull, "w") as devnull:
+            for route in routes:
+                for vendor, targets in fleet.items():
+                    with contextlib.redirect_stdout(devnull):   # 벤더 모듈의 디버그 print
+                        run_level(base, route, targets, 1, len(targets), False)   # 워밍업(키/토큰/연결)
+                    for conc in levels:
+                        with contextlib.redirect_stdout(devnull):
+                            res = run_level(base, route, targets, conc, args.requests, not args.cached)
+                        res.update(route=route, vendor=vendor, concurrency=conc)
+                        results.append(res)
+                        print(f"{route:<12} {vendor:<14} {conc:>4} {res['requests']:>5} {res['errors']:>4} "
+                              f"{res['p50_ms']:>8} {res['p95_ms']:>8} {res['p99_ms']:>8} {res['rps']:>7}",
+                              flush=True)
+    finally:
+        srv.shutdown()
+        for st in servers:
+            st.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"saved {args.json}")
+    return 1 if any(r["errors"] for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# bench/bench_message_extract.py
+# pretty.py 메시지 필드 추출 벤치마크 (이전 정규식 반복 방식 vs 사전 컴파일+토큰 스캔).
+#
+#   cd API && python bench/bench_message_extract.py --rows 100000
+#
+# 같은 합성 코퍼스로 두 방식을 돌려 records/sec 를 출력하고, 결과가 서로 같은지도 확인한다.
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pretty  # noqa: E402
+
+# ─────────────────────────────────────────────────────────────
+# 이전 구현(비교 기준) — 패턴 문자열을 매 레코드 re.search/findall
+# ─────────────────────────────────────────────────────────────
+def _legacy_time_sev(s):
+    time_s = ""
+    sev_s = ""
+    for pat in pretty._TIME_PATTERNS:
+        m = re.search(pat, s)
+        if m:
+            time_s = m.group(0)
+            break
+    for pat in pretty._SEV_PATTERNS:
+        m = re.search(pat, s, re.IGNORECASE)
+        if m:
+            sev_s = pretty._norm_severity(m.group(1))
+            break
+    msg = s
+    if time_s:
+        msg = msg.replace(time_s, "").strip()
+    if sev_s:
+        msg = re.sub(re.escape(sev_s), "", msg, flags=re.IGNORECASE).strip()
+    return {"time": time_s, "severity": sev_s, "message": msg}
+
+def _legacy_from_message(records):
+    out = []
+    for rec in records:
+        new = dict(rec)
+        msg = new.get("message") or ""
+        if msg:
+            if not new.get("src") or not new.get("dst"):
+                ips = re.findall(pretty._IP_RE, msg)
+                if ips:
+                    if not new.get("src"): new["src"] = ips[0]
+                    if not new.get("dst") and len(ips) >= 2: new["dst"] = ips[1]
+            if not new.get("dport"):
+                m = re.search(pretty._PORT_RE, msg, re.IGNORECASE)
+                if m: new["dport"] = m.group(1)
+            if not new.get("rule"):
+                m = re.search(pretty._RULE_RE, msg, re.IGNORECASE)
+                if m: new["rule"] = m.group(1).strip()
+            if not new.get("app"):
+                m = re.search(pretty._APP_RE, msg, re.IGNORECASE)
+                if m: new["app"] = m.group(1).strip()
+            if not new.get("action"):
+                m = re.search(pretty._ACT_RE, msg, re.IGNORECASE)
+                if m: new["action"] = m.group(1).lower()
+            if not new.get("protocol"):
+                m = re.search(pretty._PROTO_RE, msg, re.IGNORECASE)
+                if m: new["protocol"] = m.group(1).upper()
+        out.append(new)
+    return out
+
+# ─────────────────────────────────────────────────────────────
+# 합성 코퍼스
+# ─────────────────────────────────────────────────────────────
+_SEVS = ["critical", "MAJOR", "info", "warning", "치명", "low", "informational"]
+_ACTS = ["allow", "deny", "drop", "reset-both", "차단", "permit"]
+
+def _ip(rnd):
+    return ".".join(str(rnd.randint(1, 254)) for _ in range(4))
+
+def make_corpus(n, seed=7):
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n):
+        kind = i % 4
+        ts = f"2025-10-{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}"
+        sev = rnd.choice(_SEVS)
+        if kind == 0:
+            lines.append(f"{ts} [{sev}] session {_ip(rnd)} -> {_ip(rnd)} dport: {rnd.randint(1, 65535)} "
+                         f"proto tcp action {rnd.choice(_ACTS)} rule: web-{i % 50}")
+        elif kind == 1:
+            lines.append(f"Oct {rnd.randint(1, 28)} 12:00:{rnd.randint(10, 59)} {sev} "
+                         f"CPU usage(individual) is too high : CPU{rnd.randint(0, 7)}(99.00%)")
+        elif kind == 2:
+            lines.append(f"src={_ip(rnd)} dst={_ip(rnd)} port={rnd.randint(1, 65535)} "
+                         f"application: ssl ({sev}) {rnd.choice(_ACTS)}")
+        else:
+            lines.append(f"정책명: 내부-{i % 30} 프로토콜: udp {_ip(rnd)} 허용 {ts}")
+    return lines
+
+def _rate(fn, arg, n):
+    t0 = time.perf_counter()
+    out = fn(arg)
+    dt = time.perf_counter() - t0
+    return out, n / dt if dt else float("inf"), dt
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=100_000)
+    args = ap.parse_args()
+
+    lines = make_corpus(args.rows)
+    records = [{"message": s} for s in lines]
+    print(f"corpus: {len(lines):,} rows")
+
+    rows = [
+        ("time/severity", lambda xs: [_legacy_time_sev(s) for s in xs],
+                          lambda xs: [pretty._extract_time_sev_from_string(s) for s in xs], lines),
+        ("traffic fields", _legacy_from_message, pretty._coerce_from_message, records),
+    ]
+    print(f"{'stage':<16}{'before rec/s':>16}{'after rec/s':>16}{'speedup':>10}{'mismatch':>10}")
+    for name, before_fn, after_fn, data in rows:
+        before, before_rate, _ = _rate(before_fn, data, len(data))
+        after, after_rate, _ = _rate(after_fn, data, len(data))
+        mismatch = sum(1 for a, b in zip(before, after) if a != b)
+        print(f"{name:<16}{before_rate:>16,.0f}{after_rate:>16,.0f}{after_rate / before_rate:>9.1f}x{mismatch:>10}")
+
+if __name__ == "__main__":
+    main()
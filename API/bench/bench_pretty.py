@@ -0,0 +1,168 @@
+# bench/bench_pretty.py
+# pretty.py 트래픽 정규화/렌더 파이프라인 단계별 벤치마크 (시간 + 메모리 할당).
+#
+#   cd API && python bench/bench_pretty.py --sizes 1000,10000,100000
+#   cd API && python bench/bench_pretty.py --save result/pretty_base.json      # 기준 저장
+#   cd API && python bench/bench_pretty.py --compare result/pretty_base.json   # 기준 대비 배율
+#
+# 코퍼스(실제 응답 모양의 합성 데이터)
+#   palo   palo_inified._traffic_record 가 만드는 TrafficRecord 목록(total 은 고정 스키마 경로를 탐)
+#   secui  [columns] + rows 2차원 배열(secui_log_api 결과 그대로, vendors._table_records 단계 포함)
+#   text   자유 형식 로그 문자열 목록(bench_message_extract 와 같은 코퍼스)
+#
+# 단계: table(secui 만) → to_records → flatten → aliases → from_message → render, 그리고
+#       render_traffic_table 한 번에(total), 스트리밍 iter_traffic_rows(stream)
+# 각 단계는 앞 단계의 출력을 입력으로 받는다.
+#   ms        --repeat 회 중 최솟값
+#   peak KB   tracemalloc 으로 잰 단계 실행 중 최대 추가 할당량
+#   kept KB   단계가 끝난 뒤에도 남는 할당량(출력이 붙잡고 있는 메모리)
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import palo_inified  # noqa: E402
+import pretty  # noqa: E402
+import vendors  # noqa: E402
+from bench_message_extract import make_corpus as make_text  # noqa: E402
+
+_ACTS = ["allow", "deny", "drop", "reset-both"]
+_APPS = ["ssl", "web-browsing", "dns", "ms-rdp", "ssh", "incomplete"]
+_SECUI_COLUMNS = ["etime", "mach_id", "fwrule_name", "user_id", "src_ip", "dst_ip", "dst_port",
+                  "protocol", "action", "reason", "tot_bytes"]
+
+def _ip(rnd):
+    return f"10.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}"
+
+def _ts(rnd):
+    return f"2025/10/{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}"
+
+def make_palo(n, seed=7):
+    rnd = random.Random(seed)
+    return [palo_inified._traffic_record({
+        "receive_time": _ts(rnd), "src": _ip(rnd), "dst": _ip(rnd), "dport": str(rnd.choice((53, 80, 443, 3389))),
+        "app": rnd.choice(_APPS), "action": rnd.choice(_ACTS), "rule": f"rule-{i % 50}",
+    }) for i in range(n)]
+
+def make_secui(n, seed=7):
+    rnd = random.Random(seed)
+    rows = [[_ts(rnd).replace("/", "-"), "FW-01", f"policy-{i % 40}", "", _ip(rnd), _ip(rnd),
+             str(rnd.choice((53, 80, 443, 3389))), rnd.choice(("TCP", "UDP")), rnd.choice(("Allow", "Deny")),
+             "", str(rnd.randint(60, 90000))] for i in range(n)]
+    return [list(_SECUI_COLUMNS)] + rows
+
+CORPORA = {"palo": make_palo, "secui": make_secui, "text": make_text}
+
+def _flatten_all(recs):
+    return [(pretty._flatten_record(r) if isinstance(r, dict) else r) for r in recs]
+
+def _render(recs):
+    return pretty.render_html_table(recs, pretty.TRAFFIC_KEYS, pretty.TRAFFIC_HEADERS)
+
+def _stream(data):
+    return sum(1 for _ in pretty.iter_traffic_rows(data))
+
+# (단계 이름, 함수) — render_traffic_table 과 같은 순서
+STAGES = [
+    ("to_records", pretty._to_records),
+    ("flatten", _flatten_all),
+    ("aliases", pretty._coerce_traffic_aliases),
+    ("from_message", pretty._coerce_from_message),
+    ("render", _render),
+]
+
+def _time(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _alloc(fn, arg):
+    """(peak, kept) bytes. 입력은 미리 만들어 둔 것이라 집계에 들어가지 않는다."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        out = fn(arg)
+        kept, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del out
+    return peak - base, kept - base
+
+def run_corpus(kind, n, repeat):
+    """코퍼스 하나의 단계별 결과 목록"""
+    data = CORPORA[kind](n)
+    plan = []
+    if kind == "secui":
+        plan.append(("table", vendors._table_records, data))
+        cur = vendors._table_records(data)
+    else:
+        cur = data
+    for name, fn in STAGES:
+        plan.append((name, fn, cur))
+        cur = fn(cur)
+    plan.append(("total", pretty.render_traffic_table, plan[1 if kind == "secui" else 0][2]))
+    plan.append(("stream", _stream, plan[1 if kind == "secui" else 0][2]))
+
+    results = []
+    for name, fn, arg in plan:
+        sec = _time(fn, arg, repeat)
+        peak, kept = _alloc(fn, arg)
+        results.append({"corpus": kind, "rows": n, "stage": name, "ms": round(sec * 1000, 2),
+                        "peak_kb": round(peak / 1024, 1), "kept_kb": round(kept / 1024, 1)})
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", default="1000,10000,100000", help="쉼표 구분 행 수")
+    ap.add_argument("--corpora", default=",".join(CORPORA), help="|".join(CORPORA))
+    ap.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수(최솟값 사용)")
+    ap.add_argument("--save", help="결과를 JSON 기준 파일로 저장")
+    ap.add_argument("--compare", help="이전에 저장한 기준 파일과 시간/할당 배율 비교")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    kinds = [k.strip() for k in args.corpora.split(",") if k.strip()]
+    for k in kinds:
+        if k not in CORPORA:
+            ap.error(f"unknown corpus: {k}")
+    base = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = {(r["corpus"], r["rows"], r["stage"]): r for r in json.load(f)["results"]}
+
+    head = f"{'corpus':<6} {'rows':>7} {'stage':<13} {'ms':>9} {'peak KB':>10} {'kept KB':>10}"
+    print(head + ("   x time  x peak" if base else ""))
+    results = []
+    for kind in kinds:
+        for n in sizes:
+            for r in run_corpus(kind, n, args.repeat):
+                results.append(r)
+                line = (f"{r['corpus']:<6} {r['rows']:>7} {r['stage']:<13} {r['ms']:>9} "
+                        f"{r['peak_kb']:>10} {r['kept_kb']:>10}")
+                b = base.get((r["corpus"], r["rows"], r["stage"]))
+                if b:
+                    line += (f"   {r['ms'] / b['ms'] if b['ms'] else 0:>6.2f}"
+                             f"  {r['peak_kb'] / b['peak_kb'] if b['peak_kb'] else 0:>6.2f}")
+                print(line, flush=True)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"saved {args.save}")
+
+if __name__ == "__main__":
+    main()
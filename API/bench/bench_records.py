@@ -0,0 +1,140 @@
+# bench/bench_records.py
+# 레코드 표현별 메모리/시간 벤치마크: 행마다 dict(기존) vs 고정 스키마 레코드(records.TrafficRecord / SystemRecord).
+#
+#   cd API && python bench/bench_records.py --rows 100000
+#   cd API && python bench/bench_records.py --rows 10000,100000 --json result/records.json
+#
+# 단계
+#   build   파서 출력 목록 만들기(entry 필드 dict → 레코드). B/row = 목록이 붙잡고 있는 행당 바이트
+#           (필드 문자열은 두 방식이 같이 쓰므로 미리 만들어 두고 집계에서 뺀다 → 컨테이너 오버헤드만)
+#   render  render_traffic_table / render_system_table 한 번(peak = 실행 중 최대 추가 할당)
+#   stream  iter_traffic_rows / iter_system_rows 전체 소비
+# dict 와 레코드 결과(HTML, 행)가 같은지도 확인한다(다르면 종료 코드 1).
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import palo_inified  # noqa: E402
+import pretty  # noqa: E402
+from bench_pretty import _ACTS, _APPS, _ip, _ts  # noqa: E402
+
+def make_entries(kind, n, seed=7):
+    """PAN-OS entry 필드 dict 목록(iterparse 가 _LogEvents 에서 넘기는 모양)"""
+    rnd = random.Random(seed)
+    if kind == "traffic":
+        return [{"receive_time": _ts(rnd), "src": _ip(rnd), "dst": _ip(rnd),
+                 "dport": str(rnd.choice((53, 80, 443, 3389))), "app": rnd.choice(_APPS),
+                 "action": rnd.choice(_ACTS), "rule": f"rule-{i % 50}"} for i in range(n)]
+    return [{"time_generated": _ts(rnd), "severity": rnd.choice(("critical", "high", "informational")),
+             "opaque": f"User admin logged in via web from {_ip(rnd)} (session {i})"} for i in range(n)]
+
+# 이전 변환기(행마다 dict)
+def dict_traffic(f):
+    return {"time": f.get("receive_time") or f.get("time_generated") or "", "src": f.get("src") or "",
+            "dst": f.get("dst") or "", "dport": f.get("dport") or f.get("dstport") or "",
+            "app": f.get("app") or f.get("application") or "", "action": f.get("action") or "",
+            "rule": f.get("rule") or ""}
+
+def dict_system(f):
+    return {"time": f.get("time_generated") or f.get("receive_time") or "", "severity": f.get("severity") or "",
+            "message": f.get("opaque") or f.get("msg") or f.get("message") or ""}
+
+KINDS = {
+    "traffic": {"dict": dict_traffic, "slots": palo_inified._traffic_record,
+                "render": pretty.render_traffic_table, "stream": pretty.iter_traffic_rows},
+    "system": {"dict": dict_system, "slots": palo_inified._system_record,
+               "render": pretty.render_system_table, "stream": pretty.iter_system_rows},
+}
+
+def _alloc(fn, *args):
+    """(결과, peak, kept) bytes"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        out = fn(*args)
+        kept, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return out, peak - base, kept - base
+
+def _time(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _build(convert, entries):
+    return [convert(f) for f in entries]
+
+def _drain(stream, recs):
+    return list(stream(recs))
+
+def run_kind(kind, n, repeat):
+    spec = KINDS[kind]
+    entries = make_entries(kind, n)
+    results, outputs = [], {}
+    for rep in ("dict", "slots"):
+        recs, peak, kept = _alloc(_build, spec[rep], entries)
+        res = [("build", _time(_build, spec[rep], entries, repeat=repeat), peak, kept)]
+        html_out, peak, _ = _alloc(spec["render"], recs)
+        res.append(("render", _time(spec["render"], recs, repeat=repeat), peak, 0))
+        rows_out, peak, _ = _alloc(_drain, spec["stream"], recs)
+        res.append(("stream", _time(_drain, spec["stream"], recs, repeat=repeat), peak, 0))
+        outputs[rep] = (html_out, rows_out)
+        for stage, sec, peak, kept in res:
+            results.append({"kind": kind, "rows": n, "repr": rep, "stage": stage, "ms": round(sec * 1000, 2),
+                            "peak_kb": round(peak / 1024, 1),
+                            "bytes_per_row": round(kept / n, 1) if stage == "build" else None})
+        del recs, html_out, rows_out
+    same = outputs["dict"] == outputs["slots"]
+    return results, same
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", default="100000", help="쉼표 구분 행 수")
+    ap.add_argument("--kinds", default="traffic,system", help="|".join(KINDS))
+    ap.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수(최솟값 사용)")
+    ap.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.rows.split(",") if s.strip()]
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    for k in kinds:
+        if k not in KINDS:
+            ap.error(f"unknown kind: {k}")
+
+    print(f"{'kind':<8} {'rows':>7} {'repr':<6} {'stage':<7} {'ms':>9} {'peak KB':>10} {'B/row':>7}")
+    results, ok = [], True
+    for kind in kinds:
+        for n in sizes:
+            res, same = run_kind(kind, n, args.repeat)
+            ok = ok and same
+            for r in res:
+                results.append(r)
+                bpr = "" if r["bytes_per_row"] is None else r["bytes_per_row"]
+                print(f"{r['kind']:<8} {r['rows']:>7} {r['repr']:<6} {r['stage']:<7} {r['ms']:>9} "
+                      f"{r['peak_kb']:>10} {bpr:>7}", flush=True)
+            print(f"{kind:<8} {n:>7} output {'same' if same else 'DIFFERENT'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"saved {args.json}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
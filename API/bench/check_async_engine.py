@@ -0,0 +1,64 @@
+# bench/check_async_engine.py
+# async_engine 동시 처리 점검 (로컬 스탠드인 서버 사용, 실제 장비 불필요).
+# 여러 장비에 걸친 job 다수를 루프 하나로 동시에 진행할 때의 소요 시간.
+# 결과 일치/인증/취소 동작은 tests/test_async_engine.py (pytest) 에서 확인한다.
+#
+#   cd API && python bench/check_async_engine.py --jobs 300 --devices 30
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import async_engine  # noqa: E402
+import secui_log_api  # noqa: E402
+from standins import PaloStandin, SecuiStandin  # noqa: E402
+
+def _check(name, ok, detail=""):
+    print(f"  [{'ok' if ok else 'FAIL'}] {name}{(' - ' + detail) if detail else ''}")
+    if not ok:
+        _check.failed += 1
+_check.failed = 0
+
+def check_fanout(jobs, devices, job_sec):
+    print(f"fan-out ({jobs} jobs over {devices} firewalls, job_sec={job_sec})")
+    palos = [PaloStandin(entries=50, job_sec=job_sec).start() for _ in range(devices // 2 or 1)]
+    secuis = [SecuiStandin(rows=50, job_sec=job_sec).start() for _ in range(devices - len(palos) or 1)]
+    eng = async_engine.engine
+    coros = []
+    for i in range(jobs):
+        if i % 2 == 0:
+            p = palos[i // 2 % len(palos)]
+            coros.append(eng.palo_traffic_records(p.url, "", "", "admin", "pw"))
+        else:
+            s = secuis[i // 2 % len(secuis)]
+            coros.append(eng.secui_search(s.info(), secui_log_api._traffic_payload("", "", 3, 100)))
+    t0 = time.perf_counter()
+    results = eng.run_all(coros, timeout=120)
+    dt = time.perf_counter() - t0
+    errors = [r for r in results if isinstance(r, BaseException) or isinstance(r, str)]
+    _check("all jobs finished", not errors, f"{len(errors)} errors" if errors else "")
+    print(f"  wall {dt:.2f}s for {jobs} jobs (serial would be >= {jobs * job_sec:.0f}s), "
+          f"client threads {sum(1 for t in threading.enumerate() if t.name == 'vendor-io')} (vendor-io)")
+    for s in palos + secuis:
+        s.stop()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--jobs", type=int, default=300)
+    ap.add_argument("--devices", type=int, default=30)
+    ap.add_argument("--job-sec", type=float, default=1.0)
+    args = ap.parse_args()
+
+    check_fanout(args.jobs, args.devices, args.job_sec)
+    async_engine.engine.close()
+    print("FAILED" if _check.failed else "all checks passed")
+    sys.exit(1 if _check.failed else 0)
+
+if __name__ == "__main__":
+    main()
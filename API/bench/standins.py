@@ -0,0 +1,256 @@
+# bench/standins.py
+# 로컬 스탠드인 서버: PAN-OS XML API(/api/) 와 Secui 로그 REST API(/api/lr/log).
+# 실제 장비 없이 동기/비동기 클라이언트를 돌려보기 위한 최소 구현(표준 라이브러리만 사용).
+#
+#   from standins import PaloStandin, SecuiStandin
+#   palo = PaloStandin(entries=500, job_sec=0.3).start()   # palo.url → management_ip 로 사용
+#   secui = SecuiStandin(rows=250).start()                  # secui.info() → firewall_info dict
+#
+# 공통 옵션 latency(초): 모든 응답을 보내기 전에 그만큼 지연(장비까지의 왕복/관리 플레인 응답 시간 흉내)
+#
+# 동작
+# - Palo: keygen → 키 발급, type=log → job 생성, action=get → job_sec 동안 ACT, 이후 FIN + entry 들
+#   (chunked 전송). 모르는 키는 <response status="error" code="403">.
+# - Secui: login → 토큰 발급, start → request_id, status → job_sec 동안 RUNNING 이후 DONE(status_reply 를 주면 그 응답),
+#   page/a/to/b → 행, end → ok. 모르는 토큰은 401.
+
+import http.server
+import json
+import re
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 응답을 다 읽지 않고 끊는 경우(폴링 중단 등)는 정상 동작
+        exc = sys.exc_info()[1]
+        if not isinstance(exc, (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+class _Standin:
+    handler = None
+
+    def __init__(self, latency=0.0):
+        self.lock = threading.Lock()
+        self.calls = []            # (종류, ...) 호출 기록
+        self.latency = latency     # 응답마다 추가 지연(초)
+        self._srv = None
+
+    def start(self):
+        handler = type("Handler", (self.handler,), {"standin": self})
+        self._srv = _Server(("127.0.0.1", 0), handler)
+        threading.Thread(target=self._srv.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._srv.server_port}"
+
+    def stop(self):
+        if self._srv is not None:
+            self._srv.shutdown()
+            self._srv.server_close()
+
+    def record(self, *call):
+        with self.lock:
+            self.calls.append(call)
+
+    def count(self, kind):
+        with self.lock:
+            return sum(1 for c in self.calls if c[0] == kind)
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    standin = None
+
+    def _delay(self):
+        if self.standin.latency:
+            time.sleep(self.standin.latency)
+
+    def _send(self, code, body, ctype):
+        self._delay()
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunked(self, parts, ctype):
+        self._delay()
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for part in parts:
+            part = part.encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+# ─────────────────────────────────────────────────────────────
+# PAN-OS
+# ─────────────────────────────────────────────────────────────
+_PALO_ENTRY = (
+    "<entry logid='{i}'><receive_time>2025/10/20 12:{m:02d}:{s:02d}</receive_time>"
+    "<time_generated>2025/10/20 12:{m:02d}:{s:02d}</time_generated>"
+    "<src>10.0.{a}.{b}</src><dst>8.8.8.8</dst><dport>443</dport><app>ssl</app>"
+    "<action>allow</action><rule>rule-{r}</rule><proto>tcp</proto><severity>critical</severity>"
+    "<opaque>message {i} from stand-in</opaque><from>trust</from><to>untrust</to>"
+    "<bytes>1234</bytes><session_end_reason>aged-out</session_end_reason></entry>"
+)
+
+class _PaloHandler(_Handler):
+    def _xml(self, body):
+        self._send(200, body, "application/xml")
+
+    def do_GET(self):
+        st = self.standin
+        q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if q.get("type") == "keygen":
+            with st.lock:
+                st.key_seq += 1
+                key = f"K{st.key_seq}"
+                st.keys.add(key)
+            st.record("keygen")
+            return self._xml(f'<response status="success"><result><key>{key}</key></result></response>')
+        if q.get("key") not in st.keys:
+            st.record("denied")
+            return self._xml('<response status="error" code="403"><result><msg>Invalid credentials.</msg>'
+                             '</result></response>')
+        if q.get("action") == "get":
+            st.record("poll", q.get("jobid"))
+            job = st.jobs.get(q.get("jobid"))
+            if job is None:
+                return self._xml('<response status="error"><msg>job not found</msg></response>')
+            started, params = job
+            if time.monotonic() - started < st.job_sec:
+                return self._xml('<response status="success"><result><job><status>ACT</status></job>'
+                                 '<log><logs count="0" progress="50"/></log></result></response>')
+            # 실제 장비처럼 nlogs/skip 만큼만 (nlogs 미지정이면 전부)
+            skip = int(params.get("skip") or 0)
+            n = max(0, min(int(params.get("nlogs") or st.entries), st.entries - skip))
+            return self._send_chunked(self._fin(n, skip), "application/xml")
+        with st.lock:
+            jobid = str(len(st.jobs) + 1)
+            st.jobs[jobid] = (time.monotonic(), q)
+        st.record("start", q.get("log-type"))
+        self._xml(f'<response status="success"><result><msg><line>job enqueued</line></msg>'
+                  f'<job>{jobid}</job></result></response>')
+
+    @staticmethod
+    def _fin(n, skip=0):
+        yield ('<response status="success"><result><job><status>FIN</status></job>'
+               f'<log><logs count="{n}" progress="100">')
+        for i in range(skip, skip + n):
+            yield _PALO_ENTRY.format(i=i, m=(i // 60) % 60, s=i % 60, a=i // 250 % 250, b=i % 250, r=i % 50)
+        yield "</logs></log></result></response>"
+
+class PaloStandin(_Standin):
+    """PAN-OS 스탠드인. url 을 management_ip 자리에 넣으면 palo_unified / async_engine 이 그대로 붙는다."""
+    handler = _PaloHandler
+
+    def __init__(self, entries=100, job_sec=0.2, latency=0.0):
+        super().__init__(latency)
+        self.entries = entries
+        self.job_sec = job_sec
+        self.keys = set()
+        self.key_seq = 0
+        self.jobs = {}
+
+    def revoke_keys(self):
+        """발급한 키를 모두 무효화(키 만료 재현)."""
+        with self.lock:
+            self.keys.clear()
+
+# ─────────────────────────────────────────────────────────────
+# Secui
+# ─────────────────────────────────────────────────────────────
+class _SecuiHandler(_Handler):
+    def _json(self, code, obj):
+        self._send(code, json.dumps(obj), "application/json")
+
+    def _authorized(self):
+        if self.headers.get("Authorization") not in self.standin.tokens:
+            self.standin.record("unauthorized")
+            self._json(401, {"code": "unauthorized"})
+            return False
+        return True
+
+    def do_POST(self):
+        st = self.standin
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/api/au/external/login":
+            with st.lock:
+                st.token_seq += 1
+                token = f"T{st.token_seq}"
+                st.tokens.add(token)
+            st.record("login", body.get("force"))
+            return self._json(200, {"code": "ok", "result": {"api_token": token}})
+        if not self._authorized():
+            return
+        with st.lock:
+            rid = f"R{len(st.searches) + 1}"
+            st.searches[rid] = (time.monotonic(), body)
+        st.record("start", body.get("log_type"))
+        self._json(200, {"code": "ok", "result": {"request_id": rid}})
+
+    def do_GET(self):
+        st = self.standin
+        if not self._authorized():
+            return
+        m = re.match(r"/api/lr/log/(\w+)/status$", self.path)
+        if m:
+            st.record("status", m.group(1))
+            if st.status_reply:
+                return self._json(*st.status_reply)
+            started, _ = st.searches[m.group(1)]
+            done = time.monotonic() - started >= st.job_sec
+            return self._json(200, {"code": "ok", "result": {"status": "DONE" if done else "RUNNING",
+                                                             "searched_cnt": st.rows}})
+        m = re.match(r"/api/lr/log/(\w+)/page/(\d+)/to/(\d+)$", self.path)
+        if m:
+            a, b = int(m.group(2)), int(m.group(3))
+            st.record("page", m.group(1), a, b)
+            if st.page_delay:
+                time.sleep(st.page_delay)
+            cols = st.searches[m.group(1)][1].get("columns") or ["etime", "src_ip"]
+            rows = [{c: f"{c}-{i}" for c in cols} for i in range(a, min(b, st.rows))]
+            return self._json(200, {"code": "ok", "result": {"rows": rows}})
+        self._json(404, {"code": "not_found"})
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        self.standin.record("end", self.path)
+        self._json(200, {"code": "ok"})
+
+class SecuiStandin(_Standin):
+    """Secui 로그 API 스탠드인. info() 를 firewall_info 자리에 넣어 쓴다."""
+    handler = _SecuiHandler
+
+    def __init__(self, rows=100, job_sec=0.2, page_delay=0.0, latency=0.0):
+        super().__init__(latency)
+        self.rows = rows
+        self.job_sec = job_sec
+        self.page_delay = page_delay
+        self.tokens = set()
+        self.token_seq = 0
+        self.searches = {}
+        self.status_reply = None   # (HTTP 코드, json) 를 주면 status 응답을 이것으로 고정(실패 재현용)
+
+    def info(self, client_id="standin"):
+        return {"vendor": "Secui Bluemax", "management_ip": self.url, "base_url": self.url,
+                "client_id": client_id, "client_secret": "secret"}
+
+    def revoke_tokens(self):
+        with self.lock:
+            self.tokens.clear()
@@ -0,0 +1,308 @@
+# collector.py
+# 시스템 로그 주기 수집기.
+# 지정한 장비/레벨마다 "어디까지 받았는지"(cursor: 마지막 수신 시각 + 그 시각의 행 해시별 건수)를 기억하고,
+# 주기마다 그 시각 이후만 방화벽에 물어 새 행만 메모리 버퍼에 쌓는다.
+# 대시보드/스크립트는 /api/collected/system 으로 버퍼를 읽으므로 조회 job 을 새로 띄우지 않는다.
+#   - cursor 는 조회 조건과 같은 수신 시각(receive_time, SystemRecord.received) 기준. 발생 시각(time)은
+#     늦게 도착한 로그가 cursor 보다 앞설 수 있어 쓰지 않는다(수신 시각이 없는 벤더는 time)
+#   - 경계 중복 제거: 방화벽은 start 시각을 포함해 돌려주므로, cursor 시각과 같은 행은 이미 받은 건수만큼 걸러낸다
+#     (PAN-OS seqno 는 파서가 넘겨주지 않아 시각 + 행 내용으로 판단. 같은 초에 똑같은 행이 여러 건이면 모두 유지)
+#   - 방화벽은 최신순으로 돌려주므로 한 번에 COLLECT_MAX_ROWS 를 다 채우면 그보다 오래된 행이 남아 있다.
+#     받은 것 중 가장 오래된 시각을 end 로 다시 물어(그 시각의 행은 다음 조회에서 통째로 받음) cursor 까지
+#     거슬러 올라간 뒤에 cursor 를 옮긴다. 한 주기에 COLLECT_MAX_PAGES 번을 넘거나 한 시각에
+#     COLLECT_MAX_ROWS 건 이상이 몰려 더 나눌 수 없으면 그 사이 일부를 놓쳤을 수 있어 truncated 로 기록
+#   - 버퍼는 장비/레벨별 최근 COLLECT_BUFFER_ROWS 행(오래된 것부터 밀려남)
+#
+#   COLLECTOR_DEVICES     수집할 장비명(쉼표 구분, "*" 면 인벤토리 전체). 비어 있으면 수집기를 켜지 않음
+#   COLLECT_INTERVAL_SEC  수집 주기(초)                      기본: 60
+#   COLLECT_LEVELS        레벨(쉼표 구분)                    기본: CRITICAL
+#   COLLECT_BACKFILL_SEC  처음 수집할 때 거슬러 올라갈 시간   기본: 3600
+#   COLLECTOR_ACCOUNT / COLLECTOR_PASSWORD   Palo 장비 조회용 계정(Secui 는 장비별 client 정보 사용)
+#
+# 프로세스마다 따로 돌므로 워커가 여러 개인 배포에서는 한 프로세스에서만 켠다.
+
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import inventory
+import metrics
+from fanout import fan_out
+from log_store import parse_time
+from polling import PollCancelled
+from pretty import iter_system_rows
+from vendors import device_timeout, dispatch_iter
+
+log = logging.getLogger(__name__)
+
+def _env_list(name: str, default: str = "") -> List[str]:
+    return [s.strip() for s in os.environ.get(name, default).split(",") if s.strip()]
+
+COLLECTOR_DEVICES = _env_list("COLLECTOR_DEVICES")
+COLLECT_INTERVAL_SEC = float(os.environ.get("COLLECT_INTERVAL_SEC", "60"))
+COLLECT_LEVELS = [s.upper() for s in _env_list("COLLECT_LEVELS", "CRITICAL")]
+COLLECT_BACKFILL_SEC = int(os.environ.get("COLLECT_BACKFILL_SEC", "3600"))
+COLLECT_MAX_ROWS = 5000      # 장비/레벨 하나에 한 번 물을 때 받을 최대 건수
+COLLECT_MAX_PAGES = 10       # 한 주기에 상한을 채워 거슬러 올라가며 물을 최대 횟수
+COLLECT_BUFFER_ROWS = 5000   # 장비/레벨별로 메모리에 남겨 둘 최근 행 수
+
+Row = Dict[str, Any]
+
+def _row_ts(row: Dict[str, str]) -> Optional[int]:
+    """행의 수집 위치 시각(epoch 초): 수신 시각, 없으면 발생 시각"""
+    return parse_time(row.get("received") or row.get("time"))
+
+class Cursor:
+    """장비 1대 + 레벨 1개의 수집 위치와 버퍼."""
+
+    __slots__ = ("device", "level", "vendor", "ts", "boundary", "buffer",
+                 "runs", "collected", "truncated", "last_run", "last_new", "error")
+
+    def __init__(self, device: str, level: str, buffer_rows: int = COLLECT_BUFFER_ROWS):
+        self.device = device
+        self.level = level
+        self.vendor = ""
+        self.ts: Optional[int] = None        # 받은 로그 중 가장 늦은 수신 시각(epoch 초)
+        self.boundary: Dict[int, int] = {}   # ts 시각에 이미 받은 행의 해시 → 건수
+        self.buffer: Deque[Row] = deque(maxlen=buffer_rows)   # 시각 오름차순
+        self.runs = 0
+        self.collected = 0
+        self.truncated = 0
+        self.last_run: Optional[float] = None
+        self.last_new = 0
+        self.error = ""
+
+    def absorb(self, rows: Iterator[Dict[str, str]]) -> Tuple[int, int]:
+        """
+        정규화된 시스템 로그 행 → cursor 이후의 새 행만 버퍼에 추가하고 cursor 를 옮긴다.
+        반환: (받은 행 수, 새로 추가한 행 수). 시각을 알 수 없는 행은 위치를 정할 수 없어 버린다.
+        cursor 시각의 행은 같은 행이 이번 응답에서 몇 번째인지 세어, 이미 받은 건수를 넘는 것만 새 행으로 본다.
+        """
+        seen = 0
+        counts: Dict[Tuple[int, int], int] = {}   # (ts, 해시) → 이번 응답에서 나온 건수
+        fresh: List[Tuple[int, Dict[str, str]]] = []
+        for row in rows:
+            seen += 1
+            ts = _row_ts(row)
+            if ts is None or (self.ts is not None and ts < self.ts):
+                continue
+            h = hash((row.get("time"), row.get("severity"), row.get("message")))
+            n = counts.get((ts, h), 0)
+            counts[(ts, h)] = n + 1
+            if ts == self.ts and n < self.boundary.get(h, 0):
+                continue
+            fresh.append((ts, row))
+        if not fresh:
+            return seen, 0
+        fresh.sort(key=lambda x: x[0])
+        top = fresh[-1][0]
+        if top != self.ts:
+            self.ts, self.boundary = top, {}
+        for (ts, h), n in counts.items():
+            if ts == top and n > self.boundary.get(h, 0):
+                self.boundary[h] = n
+        for ts, row in fresh:
+            self.buffer.append(dict(row, device=self.device, vendor=self.vendor, level=self.level, ts=ts))
+        return seen, len(fresh)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "device": self.device, "vendor": self.vendor, "level": self.level,
+            "cursor_ts": self.ts,
+            "cursor_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.ts)) if self.ts else None,
+            "buffered": len(self.buffer), "runs": self.runs, "collected": self.collected,
+            "last_new": self.last_new, "truncated": self.truncated,
+            "last_run": self.last_run, "error": self.error,
+        }
+
+class Collector:
+    """장비/레벨별 cursor 를 주기마다 한 번씩 앞으로 당기는 백그라운드 스레드."""
+
+    def __init__(self, devices: List[str], levels: List[str], interval_sec: float = COLLECT_INTERVAL_SEC,
+                 backfill_sec: int = COLLECT_BACKFILL_SEC, account: str = "", password: str = "",
+                 max_rows: int = COLLECT_MAX_ROWS, buffer_rows: int = COLLECT_BUFFER_ROWS,
+                 max_pages: int = COLLECT_MAX_PAGES):
+        self.devices = list(devices)
+        self.levels = list(levels) or ["CRITICAL"]
+        self.interval_sec = interval_sec
+        self.backfill_sec = backfill_sec
+        self.account = account
+        self.password = password
+        self.max_rows = max_rows
+        self.max_pages = max_pages
+        self.buffer_rows = buffer_rows
+        self._cursors: Dict[Tuple[str, str], Cursor] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.cycles = 0
+        self.last_cycle: Optional[float] = None
+        self.last_cycle_sec = 0.0
+
+    # ── 대상 ─────────────────────────────────────────────────
+    def _targets(self) -> List[Tuple[Cursor, Optional[Dict[str, Any]]]]:
+        """이번 주기에 돌 (cursor, 장비 정보). 인벤토리가 바뀌면 다음 주기부터 반영"""
+        infos = inventory.firewall_info_dict()
+        names = sorted(infos) if self.devices == ["*"] else self.devices
+        out = []
+        with self._lock:
+            for name in names:
+                for level in self.levels:
+                    cur = self._cursors.get((name, level))
+                    if cur is None:
+                        cur = self._cursors[(name, level)] = Cursor(name, level, self.buffer_rows)
+                    out.append((cur, infos.get(name)))
+        return out
+
+    # ── 수집 ─────────────────────────────────────────────────
+    def _fetch(self, cur: Cursor, info: Dict[str, Any], start: int, end: int,
+               cancel: threading.Event) -> Tuple[List[Dict[str, str]], int]:
+        """[start, end] 한 번 조회 → (정규화한 행들 + 수신 시각 received, 벤더가 돌려준 레코드 수)"""
+        records = list(dispatch_iter(info, "system", cancel=cancel, level=cur.level,
+                                     account=self.account, password=self.password,
+                                     start=start, end=end, limit=self.max_rows))
+        rows = []
+        for rec in records:
+            for row in iter_system_rows((rec,)):
+                row["received"] = getattr(rec, "received", "") or row["time"]
+                rows.append(row)
+        return rows, len(records)
+
+    def _fetch_since(self, cur: Cursor, info: Dict[str, Any], start: int, end: int,
+                     cancel: threading.Event) -> Tuple[List[Dict[str, str]], bool]:
+        """
+        [start, end] 의 행(최신순 응답을 상한만큼씩). 상한을 채우면 받은 것 중 가장 오래된 시각을 end 로
+        다시 물어 start 까지 내려간다. 반환: (행들, 다 받았는지)
+        """
+        out: List[Dict[str, str]] = []
+        for _ in range(self.max_pages):
+            rows, got = self._fetch(cur, info, start, end, cancel)
+            if got < self.max_rows:
+                out.extend(rows)
+                return out, True
+            times = [t for t in map(_row_ts, rows) if t is not None]
+            oldest = min(times, default=None)
+            if oldest is None or oldest >= end or oldest <= start:
+                # 한 시각에 상한 이상이 몰렸거나(더 나눌 수 없음) start 까지 이미 내려옴
+                out.extend(rows)
+                return out, oldest is not None and oldest <= start
+            # oldest 시각의 행은 이번에 일부만 왔을 수 있으므로 다음 조회(end=oldest)에서 통째로 받는다
+            out.extend(r for r in rows if _row_ts(r) != oldest)
+            end = oldest
+        return out, False
+
+    def _collect_one(self, target: Tuple[Cursor, Optional[Dict[str, Any]]], cancel: threading.Event) -> int:
+        cur, info = target
+        if not info:
+            raise LookupError("장비 정보 없음.")
+        cur.vendor = info.get("vendor", "")
+        now = int(time.time())
+        start = cur.ts if cur.ts is not None else now - self.backfill_sec
+        with metrics.tags(device=cur.device):
+            rows, complete = self._fetch_since(cur, info, start, now, cancel)
+            seen, new = cur.absorb(iter(rows))
+        if not complete:
+            cur.truncated += 1
+            log.warning("collector: %s/%s 한 주기 상한(%d건 x %d회) 도달, 일부 누락 가능",
+                        cur.device, cur.level, self.max_rows, self.max_pages)
+        cur.runs += 1
+        cur.collected += new
+        cur.last_new = new
+        cur.last_run = time.time()
+        cur.error = ""
+        return new
+
+    def run_once(self) -> int:
+        """모든 장비/레벨을 한 번 수집. 반환: 새로 받은 행 수"""
+        t0 = time.monotonic()
+        targets = self._targets()
+
+        def _on_error(target, e: BaseException) -> int:
+            cur = target[0]
+            if not isinstance(e, PollCancelled):
+                cur.error = str(e) or type(e).__name__
+                cur.last_run = time.time()
+                log.warning("collector: %s/%s 수집 실패: %s", cur.device, cur.level, cur.error)
+            return 0
+
+        # 장비별 타임아웃 또는 stop() 이면 그 장비의 조회를 멈춘다
+        total = sum(n for _, n in fan_out(targets, self._collect_one, on_error=_on_error,
+                                          timeout=device_timeout([i for _, i in targets if i]),
+                                          cancel=self._stop))
+        self.cycles += 1
+        self.last_cycle = time.time()
+        self.last_cycle_sec = round(time.monotonic() - t0, 3)
+        return total
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:   # 인벤토리 파일 오류 등: 다음 주기에 다시
+                log.exception("collector: 수집 주기 실패")
+            self._stop.wait(self.interval_sec)
+
+    def start(self) -> "Collector":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="collector", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ── 읽기 ─────────────────────────────────────────────────
+    def rows(self, devices: Optional[List[str]] = None, level: str = "",
+             since: Optional[int] = None, limit: Optional[int] = None) -> List[Row]:
+        """버퍼의 행을 최신순으로. since(epoch 초)보다 뒤의 행만"""
+        level = level.upper()
+        with self._lock:
+            cursors = [c for (name, lv), c in self._cursors.items()
+                       if (not devices or name in devices) and (not level or lv == level)]
+        streams = []
+        for c in cursors:
+            snap = list(c.buffer)   # 수집 스레드가 붙이는 중에도 안전하게
+            streams.append(r for r in reversed(snap) if since is None or r["ts"] > since)
+        out: List[Row] = []
+        for row in heapq.merge(*streams, key=lambda r: -r["ts"]):
+            out.append(row)
+            if limit and len(out) >= limit:
+                break
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cursors = [c.to_dict() for c in self._cursors.values()]
+        return {
+            "running": self.running, "devices": self.devices, "levels": self.levels,
+            "interval_sec": self.interval_sec, "backfill_sec": self.backfill_sec,
+            "max_rows": self.max_rows, "max_pages": self.max_pages, "buffer_rows": self.buffer_rows,
+            "cycles": self.cycles, "last_cycle": self.last_cycle, "last_cycle_sec": self.last_cycle_sec,
+            "buffered": sum(c["buffered"] for c in cursors),
+            "cursors": cursors,
+        }
+
+# 모듈 공용 인스턴스(COLLECTOR_DEVICES 가 없으면 None)
+collector: Optional[Collector] = None
+
+def start_from_env() -> Optional[Collector]:
+    """환경 변수 설정대로 수집기를 만들어 시작(이미 있으면 그대로). COLLECTOR_DEVICES 가 없으면 None"""
+    global collector
+    if collector is None and COLLECTOR_DEVICES:
+        collector = Collector(COLLECTOR_DEVICES, COLLECT_LEVELS,
+                              account=os.environ.get("COLLECTOR_ACCOUNT", ""),
+                              password=os.environ.get("COLLECTOR_PASSWORD", ""))
+    if collector is not None:
+        collector.start()
+    return collector
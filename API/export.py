@@ -0,0 +1,84 @@
+# export.py
+# 조회 결과 내보내기(CSV / Parquet).
+# 행 이터레이터를 받아 조금씩 써 내려가므로 결과 건수와 무관하게 메모리가 일정하다.
+#   CSV     : 일정 크기가 찰 때마다 문자열 청크를 yield → Flask 스트리밍(chunked) 응답
+#   Parquet : 행 묶음(row group) 단위로 임시 파일에 쓰고, 다 쓴 뒤 파일을 청크로 읽어 보냄
+#             (Parquet 은 파일 끝의 footer 가 있어야 완성되므로 쓰는 도중에는 보낼 수 없음)
+#             pyarrow 가 필요하다(선택 의존성, 없으면 parquet_available() 가 False).
+
+import csv
+import io
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 의존성
+    pa = pq = None
+
+CSV_CHUNK_BYTES = 64 * 1024     # 이만큼 모이면 한 번에 내보냄
+PARQUET_BATCH_ROWS = 10_000     # row group 하나의 행 수
+FILE_CHUNK_BYTES = 256 * 1024   # 완성된 Parquet 파일을 읽어 보내는 단위
+
+MIMETYPES = {
+    "csv": "text/csv",              # Flask 가 charset=utf-8 을 붙임
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def parquet_available() -> bool:
+    return pq is not None
+
+def iter_csv(rows: Iterable[Dict[str, Any]], columns: Sequence[str], bom: bool = True) -> Iterator[str]:
+    """
+    rows → CSV 텍스트 청크. columns 순서로 쓰고 없는 컬럼은 빈 칸.
+    bom=True 면 맨 앞에 UTF-8 BOM (엑셀에서 한글이 깨지지 않도록).
+    """
+    buf = io.StringIO()
+    if bom:
+        buf.write("\ufeff")
+    writer = csv.DictWriter(buf, fieldnames=list(columns), extrasaction="ignore", lineterminator="\r\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= CSV_CHUNK_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], columns: Sequence[str],
+                 batch_rows: int = PARQUET_BATCH_ROWS) -> Iterator[bytes]:
+    """
+    rows → Parquet 파일 바이트 청크. 모든 컬럼은 문자열(nullable).
+    메모리에는 batch_rows 행만 두고 나머지는 임시 파일에 row group 으로 쌓는다.
+    """
+    if pq is None:
+        raise RuntimeError("Parquet 내보내기에는 pyarrow 가 필요합니다 (pip install pyarrow)")
+    columns = list(columns)
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    with tempfile.TemporaryFile(prefix="export-", suffix=".parquet") as f:
+        writer = pq.ParquetWriter(f, schema, compression="snappy")
+        try:
+            batch = {c: [] for c in columns}
+            n = 0
+            for row in rows:
+                for c in columns:
+                    v = row.get(c)
+                    batch[c].append(None if v is None else str(v))
+                n += 1
+                if n >= batch_rows:
+                    writer.write_table(pa.table(batch, schema=schema))
+                    batch = {c: [] for c in columns}
+                    n = 0
+            if n:
+                writer.write_table(pa.table(batch, schema=schema))
+        finally:
+            writer.close()
+        f.seek(0)
+        while True:
+            chunk = f.read(FILE_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,100 @@
+# fanout.py
+# 여러 장비 조회를 제한된 워커 풀에서 동시에 실행하고,
+# 장비별 타임아웃을 적용해 결과를 (입력 순서대로) 돌려주는 유틸.
+# 타임아웃이 난 작업에는 cancel 이벤트를 걸어 벤더 폴링을 멈추고 워커를 돌려받는다.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 동시에 조회할 최대 장비 수 / 장비 1대당 허용 시간(초)
+FANOUT_MAX_WORKERS = 8
+DEVICE_TIMEOUT_SEC = 90.0
+
+_POOL = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+
+class _Task:
+    """작업 1건. 타임아웃은 큐 대기 시간이 아니라 실제 실행 시작 시점부터 잰다."""
+
+    __slots__ = ("item", "future", "submitted", "started", "cancel")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.future = None
+        self.submitted = time.monotonic()
+        self.started: Optional[float] = None
+        self.cancel = threading.Event()   # 타임아웃 또는 상위 취소 시 set
+
+    def run(self, fn: Callable[[Any, threading.Event], Any]) -> Any:
+        self.started = time.monotonic()
+        return fn(self.item, self.cancel)
+
+    def deadline(self, timeout: float) -> float:
+        if self.started is not None:
+            return self.started + timeout
+        # 풀이 꽉 차서 시작도 못 한 경우에도 무한정 기다리지 않도록 안전 한도
+        return self.submitted + 2 * timeout
+
+def fan_out(items: Sequence[Any],
+            fn: Callable[[Any, threading.Event], Any],
+            on_error: Callable[[Any, BaseException], Any],
+            timeout: float = DEVICE_TIMEOUT_SEC,
+            ordered: bool = True,
+            cancel: Optional[threading.Event] = None) -> Iterator[Tuple[Any, Any]]:
+    """
+    items 각각에 fn(item, cancel)을 동시에 실행하고 (item, 결과)를 yield.
+    - ordered=True 이면 입력 순서대로, False 이면 끝나는 순서대로 내보낸다.
+    - fn이 예외를 내거나 timeout을 넘기면 on_error(item, exc)의 반환값이 결과가 된다.
+      (타임아웃 시 exc는 TimeoutError)
+    - cancel 은 작업마다 따로 만든 Event. 타임아웃이 나면 set 되므로 fn 은 이를 벤더 조회에 넘겨
+      폴링을 멈춰야 한다(스레드를 강제 종료하지는 않음).
+    - 인자 cancel(상위 취소)이 set 되면 아직 끝나지 않은 모든 작업의 cancel 을 건다.
+    """
+    tasks: List[_Task] = [_Task(it) for it in items]
+    for t in tasks:
+        t.future = _POOL.submit(t.run, fn)
+
+    pending = set(range(len(tasks)))
+    ready: Dict[int, Any] = {}
+    next_idx = 0
+    try:
+        while pending:
+            if cancel is not None and cancel.is_set():
+                for i in pending:
+                    tasks[i].cancel.set()
+            now = time.monotonic()
+            for i in sorted(pending):
+                t = tasks[i]
+                if t.future.done():
+                    exc = t.future.exception()
+                    ready[i] = on_error(t.item, exc) if exc else t.future.result()
+                elif now >= t.deadline(timeout):
+                    t.cancel.set()
+                    t.future.cancel()
+                    ready[i] = on_error(t.item, TimeoutError(f"{timeout:g}s 내에 응답이 없습니다"))
+                else:
+                    continue
+                pending.discard(i)
+
+            if ordered:
+                while next_idx in ready:
+                    yield tasks[next_idx].item, ready.pop(next_idx)
+                    next_idx += 1
+            else:
+                for i in sorted(ready):
+                    yield tasks[i].item, ready[i]
+                ready.clear()
+
+            if pending:
+                remain = min(tasks[i].deadline(timeout) for i in pending) - time.monotonic()
+                if any(tasks[i].started is None for i in pending) or cancel is not None:
+                    # 대기 중이던 작업이 시작되면 마감 시각이 당겨지므로(또는 상위 취소 확인) 짧게 끊어서 다시 확인
+                    remain = min(remain, 0.5)
+                wait([tasks[i].future for i in pending],
+                     timeout=max(0.0, remain), return_when=FIRST_COMPLETED)
+    finally:
+        # 소비 측이 중간에 멈춘 경우(break, 스트리밍 연결 끊김 → GeneratorExit)에도 남은 작업을 멈춘다
+        for i in pending:
+            tasks[i].cancel.set()
+            tasks[i].future.cancel()
@@ -1,24 +1,22 @@
-import pandas as pd
+import threading
 import ipaddress
 import logging
+from bisect import bisect_right
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+import inventory
 
-EXCEL_FILE = r"D:\Microsoft VS Code\test\Firewall_Log_API\firewall_info_new.xlsx"
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def load_firewall_info():
-  try:
-    df = pd.read_excel(EXCEL_FILE)
-  except FileNotFoundError:
-    raise FileNotFoundError(f"엑셀 파일을 찾을 수 없습니다: {EXCEL_FILE}")
-  except Exception as e:
-    raise RuntimeError(f"엑셀 파일을 읽는 중 오류가 발생했습니다: {e}")
+def load_firewall_info(sheet=None):
+  # 엑셀 파싱은 inventory 캐시를 거침(원본이 바뀌었을 때만 다시 읽음). 파일은 앱과 같은 FIREWALL_INFO_FILE
+  if sheet is None:
+    sheet = inventory.load_sheet(inventory.FIREWALL_INFO_FILE)
 
   required_columns = {"name", "management_ip", "ip_range"}
-  if not required_columns.issubset(df.columns):
+  if not required_columns.issubset(sheet.columns):
     raise ValueError(f"엑셀 파일에 다음 열이 포함되어야 합니다.: {required_columns}")
   
-  firewall_info = df[["name", "management_ip", "ip_range"]].to_dict(orient="records")
+  firewall_info = [{k: r[k] for k in ("name", "management_ip", "ip_range")} for r in sheet.records()]
   return firewall_info
 
 def parse_ip_range(ip_range):
@@ -39,38 +37,107 @@ def ip_in_range(ip, ip_range):
   except ValueError:
     return False
 
+# ─────────────────────────────────────────────────────────────
+# ip_range 인덱스: 엑셀을 한 번 읽어 구간 배열로 만들어 두고 bisect로 조회.
+# 엑셀 파일이 바뀌면 inventory.load_sheet 가 새 Sheet 를 돌려주므로, 그때만 다시 만든다.
+# ─────────────────────────────────────────────────────────────
+class _RangeTable:
+  """
+  서로 겹칠 수 있는 [start, end] 구간들을 경계점 기준 기본 구간으로 쪼개 정렬한 표.
+  lookup(v) → v를 포함하는 원래 구간 번호들(tuple). O(log n)
+  """
+
+  def __init__(self, intervals):
+    # intervals: [(start_int, end_int, idx), ...]
+    events = {}
+    for start, end, idx in intervals:
+      events.setdefault(start, ([], []))[0].append(idx)
+      events.setdefault(end + 1, ([], []))[1].append(idx)
+
+    self.points = []
+    self.owners = []
+    active = set()
+    for p in sorted(events):
+      adds, removes = events[p]
+      active.difference_update(removes)
+      active.update(adds)
+      self.points.append(p)
+      self.owners.append(tuple(sorted(active)))
+
+  def lookup(self, value):
+    i = bisect_right(self.points, value) - 1
+    return self.owners[i] if i >= 0 else ()
+
+class FirewallIndex:
+  """
+  find_target_firewall 용 인덱스.
+  - candidates: 내부 방화벽들 + 기흥화성준사내 방화벽들 (엑셀 순서, 기존 매칭 순서와 동일)
+  - ds_gateway: "DS관문" 행 (구간 매칭 대상 아님)
+  """
+
+  def __init__(self, firewall_info):
+    self.ds_gateway = None
+    internal, gihwa = [], []
+    for fw in firewall_info:
+      if fw['name'] == "DS관문":
+        self.ds_gateway = fw
+      elif "기흥화성준사내" in fw['name']:
+        gihwa.append(fw)
+      else:
+        internal.append(fw)
+
+    self.candidates = internal + gihwa
+    self.is_gihwa = [False] * len(internal) + [True] * len(gihwa)
+
+    by_version = {4: [], 6: []}
+    for idx, fw in enumerate(self.candidates):
+      try:
+        start_ip, end_ip = parse_ip_range(str(fw['ip_range']).strip())
+      except (ValueError, TypeError):
+        logging.warning("ip_range 형식 오류로 인덱스에서 제외: %s (%r)", fw['name'], fw['ip_range'])
+        continue
+      if start_ip.version != end_ip.version:
+        logging.warning("ip_range 시작/끝 버전 불일치로 제외: %s (%r)", fw['name'], fw['ip_range'])
+        continue
+      by_version[start_ip.version].append((int(start_ip), int(end_ip), idx))
+    self._tables = {v: _RangeTable(iv) for v, iv in by_version.items()}
+
+  def lookup(self, ip):
+    """ip를 담당하는 candidates 번호들."""
+    return self._tables[ip.version].lookup(int(ip))
+
+_index_lock = threading.Lock()
+_index = None
+_index_sheet = None   # 인덱스를 만들 때 쓴 Sheet (원본이 바뀌면 load_sheet 가 다른 객체를 돌려줌)
+
+def get_firewall_index():
+  """엑셀이 바뀌었을 때만 다시 읽어서 인덱스를 만든다."""
+  global _index, _index_sheet
+  sheet = inventory.load_sheet(inventory.FIREWALL_INFO_FILE)
+  with _index_lock:
+    if _index is None or _index_sheet is not sheet:
+      _index = FirewallIndex(load_firewall_info(sheet))
+      _index_sheet = sheet
+      logging.info("방화벽 ip_range 인덱스 생성: %d대", len(_index.candidates))
+    return _index
+
 def find_target_firewall(src_ip, dst_ip):
-    firewall_info = load_firewall_info()
+    index = get_firewall_index()
     src_ip = ipaddress.ip_address(src_ip)
     dst_ip = ipaddress.ip_address(dst_ip)
 
+    src_hits = index.lookup(src_ip)
+    dst_hits = index.lookup(dst_ip)
 
-    ds_gateway = None
-    internal_firewalls = []
-    gihwa_firewalls = []
-
-    matched_firewalls = []
+    is_src_internal = any(not index.is_gihwa[i] for i in src_hits)
+    is_dst_internal = any(not index.is_gihwa[i] for i in dst_hits)
+    is_dst_gihwa = any(index.is_gihwa[i] for i in dst_hits)
 
-    for fw in firewall_info:
-        if fw['name'] == "DS관문":
-            ds_gateway = fw
-        elif "기흥화성준사내" in fw['name']:
-            gihwa_firewalls.append(fw)
-        else:
-            internal_firewalls.append(fw)
-
-    
-    is_src_internal = any(ip_in_range(src_ip, fw['ip_range']) for fw in internal_firewalls)
-    is_dst_internal = any(ip_in_range(dst_ip, fw['ip_range']) for fw in internal_firewalls)
-    is_src_gihwa = any(ip_in_range(src_ip, fw['ip_range']) for fw in gihwa_firewalls)
-    is_dst_gihwa = any(ip_in_range(dst_ip, fw['ip_range']) for fw in gihwa_firewalls)
-
-    # 내부/기흥 방화벽에서 매칭되는 것들 추가
-    for fw in internal_firewalls + gihwa_firewalls:
-        if ip_in_range(src_ip, fw['ip_range']) or ip_in_range(dst_ip, fw['ip_range']):
-            matched_firewalls.append(fw)
+    # 내부/기흥 방화벽에서 매칭되는 것들 추가 (엑셀 순서 유지)
+    matched_firewalls = [index.candidates[i] for i in sorted(set(src_hits) | set(dst_hits))]
 
     #  포함 조건
+    ds_gateway = index.ds_gateway
     if ds_gateway:
         if is_src_internal:
             if not is_dst_internal and not is_dst_gihwa:
@@ -0,0 +1,148 @@
+# http_pool.py
+# 벤더 API 호출용 공용 HTTP 세션 풀.
+# 호스트(scheme://host:port)마다 requests.Session 하나를 두고 keep-alive 연결을 재사용한다.
+# → keygen / job 시작 / 상태 폴링 / 페이지 조회 / 종료 호출이 TCP·TLS 핸드셰이크를 공유.
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import urllib3
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+except Exception:
+    pass
+
+# ── 설정값(configure()로 변경) ───────────────────────────────
+POOL_MAXSIZE    = 10      # 호스트당 최대 연결 수
+POOL_BLOCK      = True    # 연결이 모두 사용 중이면 새로 만들지 않고 반납을 기다림
+CONNECT_TIMEOUT = 10.0    # 초
+READ_TIMEOUT    = 30.0    # 초
+
+_lock = threading.Lock()
+_sessions: Dict[str, requests.Session] = {}
+
+def configure(pool_maxsize: Optional[int] = None,
+              pool_block: Optional[bool] = None,
+              connect_timeout: Optional[float] = None,
+              read_timeout: Optional[float] = None) -> None:
+    """풀 크기/타임아웃 변경. 기존 세션은 닫고 다음 호출부터 새 설정으로 만든다."""
+    global POOL_MAXSIZE, POOL_BLOCK, CONNECT_TIMEOUT, READ_TIMEOUT
+    if pool_maxsize is not None:
+        POOL_MAXSIZE = int(pool_maxsize)
+    if pool_block is not None:
+        POOL_BLOCK = bool(pool_block)
+    if connect_timeout is not None:
+        CONNECT_TIMEOUT = float(connect_timeout)
+    if read_timeout is not None:
+        READ_TIMEOUT = float(read_timeout)
+    close_all()
+
+def _host_key(url: str) -> str:
+    u = urlsplit(url)
+    return f"{u.scheme}://{u.netloc}".lower()
+
+def _new_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, pool_block=POOL_BLOCK)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.verify = False
+    return s
+
+def get_session(url: str) -> requests.Session:
+    """url의 호스트 전용 세션(없으면 생성)."""
+    key = _host_key(url)
+    with _lock:
+        s = _sessions.get(key)
+        if s is None:
+            s = _sessions[key] = _new_session()
+        return s
+
+def default_timeout() -> Tuple[float, float]:
+    return (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    """requests.request 와 같은 인자. verify=False, timeout 기본값을 채워준다."""
+    kwargs.setdefault("verify", False)
+    kwargs.setdefault("timeout", default_timeout())
+    return get_session(url).request(method, url, **kwargs)
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+def delete(url: str, **kwargs: Any) -> requests.Response:
+    return request("DELETE", url, **kwargs)
+
+def close_all() -> None:
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for s in sessions:
+        try:
+            s.close()
+        except Exception:
+            pass
+
+# ─────────────────────────────────────────────────────────────
+# 풀 통계
+# ─────────────────────────────────────────────────────────────
+def _conn_pool_stats(cp: Any) -> Dict[str, int]:
+    q = getattr(cp, "pool", None)
+    idle = in_use = 0
+    if q is not None:
+        items = list(q.queue)
+        idle = sum(1 for c in items if c is not None and getattr(c, "sock", None) is not None)
+        in_use = max(0, (q.maxsize or 0) - len(items))
+    return {
+        "requests": int(getattr(cp, "num_requests", 0)),
+        "new_connections": int(getattr(cp, "num_connections", 0)),
+        "open_connections": idle + in_use,
+        "idle_connections": idle,
+    }
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    호스트별 요청 수/신규 연결 수/재사용 비율/열린 연결 수.
+    reuse_ratio = 1 - (신규 연결 / 요청 수)
+    """
+    with _lock:
+        items = list(_sessions.items())
+
+    hosts: Dict[str, Dict[str, Any]] = {}
+    total = {"requests": 0, "new_connections": 0, "open_connections": 0, "idle_connections": 0}
+    for key, s in items:
+        agg = {"requests": 0, "new_connections": 0, "open_connections": 0, "idle_connections": 0}
+        adapter = s.get_adapter(key + "/")
+        pm = getattr(adapter, "poolmanager", None)
+        if pm is not None:
+            for pool_key in list(pm.pools.keys()):
+                cp = pm.pools.get(pool_key)
+                if cp is None:
+                    continue
+                for k, v in _conn_pool_stats(cp).items():
+                    agg[k] += v
+        for k in total:
+            total[k] += agg[k]
+        agg["reused"] = max(0, agg["requests"] - agg["new_connections"])
+        agg["reuse_ratio"] = round(agg["reused"] / agg["requests"], 4) if agg["requests"] else 0.0
+        hosts[key] = agg
+
+    total["reused"] = max(0, total["requests"] - total["new_connections"])
+    total["reuse_ratio"] = round(total["reused"] / total["requests"], 4) if total["requests"] else 0.0
+    return {
+        "config": {
+            "pool_maxsize": POOL_MAXSIZE,
+            "pool_block": POOL_BLOCK,
+            "connect_timeout": CONNECT_TIMEOUT,
+            "read_timeout": READ_TIMEOUT,
+        },
+        "hosts": hosts,
+        "total": total,
+    }
@@ -0,0 +1,181 @@
+# inventory.py
+# 장비 인벤토리(엑셀) 로더.
+# 엑셀을 처음 읽을 때 행 데이터를 marshal 캐시 파일로 저장해 두고, 이후 시작 시에는 캐시에서 바로 읽는다.
+# 원본 엑셀의 mtime/size 가 바뀌었을 때만 다시 파싱한다(프로세스 안에서도 같은 규칙으로 메모리 재사용).
+#
+# 경로(환경변수로 변경 가능)
+#   FIREWALL_INFO_XLSX   방화벽 상세(이름→IP/vendor/자격/ip_range)   기본: firewall_info_new.xlsx
+#   FIREWALL_LIST_XLSX   UI 표시용 장비 리스트                         기본: firewall_list.xlsx
+#   INVENTORY_CACHE_DIR  캐시 파일 위치                                기본: 엑셀과 같은 폴더의 .inventory_cache
+
+import logging
+import marshal
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+FIREWALL_INFO_FILE = os.environ.get("FIREWALL_INFO_XLSX", "firewall_info_new.xlsx")
+FIREWALL_LIST_FILE = os.environ.get("FIREWALL_LIST_XLSX", "firewall_list.xlsx")
+CACHE_DIR = os.environ.get("INVENTORY_CACHE_DIR", "")
+
+_CACHE_FORMAT = 1   # 캐시 파일 구조가 바뀌면 올림(이전 캐시는 자동 무시)
+
+Stamp = Tuple[int, int]   # (mtime_ns, size)
+
+def _cell(v: Any) -> Any:
+    """엑셀 셀 값 → marshal 가능한 기본 타입 (빈 칸/NaN → None)"""
+    if v is None:
+        return None
+    if hasattr(v, "item") and not isinstance(v, (str, bytes)):
+        v = v.item()   # numpy 스칼라
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, (str, int, float, bool)):
+        return v
+    return str(v)
+
+class Sheet:
+    """시트 하나: 컬럼 목록 + 행(list). records()는 한 번 만든 dict 목록을 재사용."""
+
+    def __init__(self, columns: List[str], rows: List[List[Any]]):
+        self.columns = columns
+        self.rows = rows
+        self._records: Optional[List[Dict[str, Any]]] = None
+
+    def records(self) -> List[Dict[str, Any]]:
+        if self._records is None:
+            cols = self.columns
+            self._records = [dict(zip(cols, r)) for r in self.rows]
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+def _stamp(path: str) -> Stamp:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"엑셀 파일을 찾을 수 없습니다: {path}")
+    return (st.st_mtime_ns, st.st_size)
+
+def _cache_path(path: str) -> str:
+    src = os.path.abspath(path)
+    cache_dir = CACHE_DIR or os.path.join(os.path.dirname(src), ".inventory_cache")
+    return os.path.join(cache_dir, os.path.basename(src) + ".marshal")
+
+def _read_cache(cache_file: str, stamp: Stamp) -> Optional[Sheet]:
+    try:
+        with open(cache_file, "rb") as f:
+            data = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != _CACHE_FORMAT or tuple(data.get("stamp", ())) != stamp:
+        return None
+    return Sheet(list(data["columns"]), data["rows"])
+
+def _write_cache(cache_file: str, stamp: Stamp, sheet: Sheet) -> None:
+    data = {"format": _CACHE_FORMAT, "stamp": stamp, "columns": sheet.columns, "rows": sheet.rows}
+    tmp = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(data, f)
+        os.replace(tmp, cache_file)   # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 원자적 교체
+    except OSError as e:
+        logging.warning("인벤토리 캐시 저장 실패(엑셀 직접 사용): %s (%s)", cache_file, e)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def _parse_excel(path: str) -> Sheet:
+    import pandas as pd   # 캐시 적중 시에는 pandas 를 쓰지 않음
+    try:
+        df = pd.read_excel(path)
+    except Exception as e:
+        raise RuntimeError(f"엑셀 파일을 읽는 중 오류가 발생했습니다: {e}")
+    columns = [str(c) for c in df.columns]
+    rows = [[_cell(v) for v in row] for row in df.itertuples(index=False, name=None)]
+    return Sheet(columns, rows)
+
+_lock = threading.Lock()
+_loaded: Dict[str, Tuple[Stamp, Sheet]] = {}   # 절대경로 → (stamp, Sheet)
+
+def load_sheet(path: str) -> Sheet:
+    """
+    엑셀 시트를 Sheet 로 반환.
+    메모리 → 캐시 파일 → 엑셀 파싱 순으로 찾고, 원본 mtime/size 가 다르면 다음 단계로 넘어간다.
+    """
+    key = os.path.abspath(path)
+    stamp = _stamp(key)
+    with _lock:
+        ent = _loaded.get(key)
+        if ent and ent[0] == stamp:
+            return ent[1]
+        cache_file = _cache_path(key)
+        sheet = _read_cache(cache_file, stamp)
+        if sheet is None:
+            sheet = _parse_excel(key)
+            _write_cache(cache_file, stamp, sheet)
+            logging.info("인벤토리 캐시 생성: %s (%d행)", cache_file, len(sheet))
+        _loaded[key] = (stamp, sheet)
+        return sheet
+
+# ─────────────────────────────────────────────────────────────
+# app.py 용 뷰 (원본이 바뀌면 다음 호출에서 새로 만든다)
+# ─────────────────────────────────────────────────────────────
+_views: Dict[str, Tuple[Sheet, Any]] = {}   # 이름 → (만들 때 쓴 Sheet, 값)
+
+def _view(name: str, sheet: Sheet, build):
+    with _lock:
+        ent = _views.get(name)
+        if ent and ent[0] is sheet:
+            return ent[1]
+    value = build(sheet)
+    with _lock:
+        _views[name] = (sheet, value)
+    return value
+
+def device_list() -> List[Dict[str, Any]]:
+    """UI 장비 리스트(firewall_list.xlsx 행들)."""
+    return load_sheet(FIREWALL_LIST_FILE).records()
+
+def firewall_info_dict() -> Dict[str, Dict[str, Any]]:
+    """장비명 → {management_ip, vendor, client_id, client_secret, base_url}"""
+    def _build(sheet: Sheet) -> Dict[str, Dict[str, Any]]:
+        return {
+            row["name"]: {
+                "management_ip": row["management_ip"],
+                "vendor": row["vendor"],
+                "client_id": row.get("client_id"),
+                "client_secret": row.get("client_secret"),
+                "base_url": row.get("base_url"),
+            }
+            for row in sheet.records()
+        }
+    return _view("firewall_info_dict", load_sheet(FIREWALL_INFO_FILE), _build)
+
+def resolve_device(m: Any) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """자동탐색 결과 원소(장비명/dict/tuple)에서 (name, info) 안정적으로 뽑기. 실패 시 (None, None)"""
+    info_dict = firewall_info_dict()
+    # "장비명" 문자열
+    if isinstance(m, str):
+        return m, info_dict.get(m)
+    # dict인 경우
+    if isinstance(m, dict):
+        name = m.get("name") or m.get("device") or m.get("hostname") or m.get("fw_name")
+        # 이미 vendor/ip가 들어있다면 그대로 info로 사용
+        if m.get("vendor") and (m.get("management_ip") or m.get("ip") or m.get("mgmt_ip")):
+            info = {
+                "vendor": m.get("vendor"),
+                "management_ip": m.get("management_ip") or m.get("ip") or m.get("mgmt_ip"),
+            }
+            return name or "(unknown)", info
+        # 아니면 엑셀 dict에서 조회
+        return (name or "(unknown)"), info_dict.get(name) if name else None
+    # tuple/list면 첫 원소가 이름일 수 있음
+    if isinstance(m, (list, tuple)) and m and isinstance(m[0], str):
+        return m[0], info_dict.get(m[0])
+    # 그 밖은 실패
+    return None, None
@@ -0,0 +1,238 @@
+# jobs.py
+# 백그라운드 조회 job.
+# 조회를 제출하면 job id 를 바로 돌려주고, 장비별 조회는 제한된 워커 풀에서 진행한다.
+# 화면/클라이언트는 job 상태(장비별 진행 상황)를 폴링하다가 끝난 장비의 결과를 가져간다.
+#   - 워커 풀 크기(JOB_MAX_WORKERS)와 동시에 살아 있는 미완료 job 수(JOB_MAX_ACTIVE) 상한
+#   - 끝난 job 은 JOB_TTL_SEC 이 지나면 결과와 함께 정리
+#   - 취소: 아직 시작 안 한 장비는 건너뛰고, 진행 중인 장비는 cancel 이벤트로 벤더 폴링을 멈춘다
+#   - 장비별 타임아웃: 조회 시작 후 timeout 초가 지나면 그 장비만 error 로 끝내고 cancel 이벤트를 걸어
+#     벤더 폴링을 멈춘다(응답 없는 장비가 JOB_MAX_AGE_SEC 까지 워커를 잡고 있지 않도록)
+
+import itertools
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fanout import DEVICE_TIMEOUT_SEC
+
+JOB_MAX_WORKERS = 8      # 장비 조회를 동시에 실행하는 스레드 수(전체 job 공용)
+JOB_MAX_ACTIVE = 32      # 끝나지 않은 job 수 상한(넘으면 JobLimit)
+JOB_TTL_SEC = 600        # 끝난 job 보관 시간
+JOB_MAX_AGE_SEC = 1800   # 이 시간이 지나도 안 끝난 job 은 취소 후 정리
+
+Target = Tuple[str, Optional[Dict[str, Any]]]
+RunOne = Callable[[str, Optional[Dict[str, Any]], threading.Event], Any]
+
+class JobLimit(RuntimeError):
+    """미완료 job 이 너무 많아 새 job 을 받을 수 없음."""
+
+class DeviceTask:
+    """job 안의 장비 1대. status: queued → running → done / error / cancelled"""
+
+    __slots__ = ("index", "name", "info", "vendor", "status", "result", "error", "started", "finished", "future",
+                 "cancel")
+
+    def __init__(self, index: int, name: str, info: Optional[Dict[str, Any]]):
+        self.index = index
+        self.name = name
+        self.info = info
+        self.vendor = (info or {}).get("vendor", "")
+        self.status = "queued"
+        self.result: Any = None
+        self.error = ""
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.future = None
+        self.cancel = threading.Event()   # job 취소 또는 이 장비의 타임아웃
+
+    def to_dict(self, with_result: bool = False) -> Dict[str, Any]:
+        d: Dict[str, Any] = {"index": self.index, "name": self.name, "vendor": self.vendor, "status": self.status}
+        if self.started is not None:
+            d["elapsed_sec"] = round((self.finished or time.monotonic()) - self.started, 2)
+        if self.error:
+            d["error"] = self.error
+        if with_result and self.status == "done":
+            d["result"] = self.result
+        return d
+
+class Job:
+    _FINAL = ("done", "error", "cancelled")
+
+    def __init__(self, kind: str, targets: Sequence[Target], params: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = dict(params or {})
+        self.created = time.monotonic()
+        self.created_at = time.time()
+        self.finished: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.devices = [DeviceTask(i, name, info) for i, (name, info) in enumerate(targets)]
+        self._lock = threading.Lock()
+        if not self.devices:
+            self.finished = self.created
+
+    @property
+    def status(self) -> str:
+        states = [d.status for d in self.devices]
+        if self.finished is None:
+            return "running" if any(s != "queued" for s in states) else "queued"
+        if self.cancel_event.is_set():
+            return "cancelled"
+        if states and all(s == "error" for s in states):
+            return "error"
+        return "done"
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def _start(self, task: DeviceTask) -> bool:
+        """queued → running. 그 사이 취소(또는 이미 최종 상태)면 cancelled 로 두고 False"""
+        with self._lock:
+            if task.status == "queued" and not self.cancel_event.is_set():
+                task.started = time.monotonic()
+                task.status = "running"
+                return True
+        self._finish(task, "cancelled")
+        return False
+
+    def _finish(self, task: DeviceTask, status: str, result: Any = None, error: str = "") -> bool:
+        """장비를 최종 상태로(이미 최종이면 그대로 두고 False). 마지막 장비면 job 도 끝낸다"""
+        with self._lock:
+            if task.status in self._FINAL:
+                return False
+            task.result, task.error, task.status = result, error, status
+            task.finished = time.monotonic()
+            if self.finished is None and all(d.status in self._FINAL for d in self.devices):
+                self.finished = task.finished
+            return True
+
+    def to_dict(self, with_results: bool = False) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for d in self.devices:
+            counts[d.status] = counts.get(d.status, 0) + 1
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "created_at": self.created_at,
+            "elapsed_sec": round((self.finished or time.monotonic()) - self.created, 2),
+            "progress": counts,
+            "devices": [d.to_dict(with_results) for d in self.devices],
+        }
+
+class JobManager:
+    """
+    job 제출/조회/취소 + 만료 정리. 장비 조회는 run_one(name, info, cancel)이 한다.
+    run_one 이 예외를 내면 그 장비는 error(메시지 = 예외 문자열), 값을 돌려주면 done.
+    """
+
+    def __init__(self, max_workers: int = JOB_MAX_WORKERS, max_active: int = JOB_MAX_ACTIVE,
+                 ttl_sec: float = JOB_TTL_SEC, max_age_sec: float = JOB_MAX_AGE_SEC,
+                 device_timeout_sec: float = DEVICE_TIMEOUT_SEC):
+        self.max_workers = max_workers
+        self.max_active = max_active
+        self.ttl_sec = ttl_sec
+        self.max_age_sec = max_age_sec
+        self.device_timeout_sec = device_timeout_sec
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._counts = {"submitted": 0, "rejected": 0, "cancelled": 0, "expired": 0, "timeouts": 0}
+
+    def submit(self, kind: str, targets: Sequence[Target], run_one: RunOne,
+               params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Job:
+        """timeout: 장비 1대 조회 상한(초, 조회 시작부터). 생략 시 device_timeout_sec"""
+        self.sweep()
+        timeout = self.device_timeout_sec if timeout is None else timeout
+        job = Job(kind, targets, params)
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if not j.done)
+            if active >= self.max_active:
+                self._counts["rejected"] += 1
+                raise JobLimit(f"진행 중인 조회가 너무 많습니다({active}/{self.max_active}). 잠시 후 다시 시도하세요.")
+            self._jobs[job.id] = job
+            self._counts["submitted"] += 1
+        for task in job.devices:
+            task.future = self._pool.submit(self._run_device, job, task, run_one, timeout)
+        return job
+
+    def _run_device(self, job: Job, task: DeviceTask, run_one: RunOne, timeout: float) -> None:
+        if not job._start(task):
+            return
+        timer = None
+        if timeout and timeout > 0:
+            timer = threading.Timer(timeout, self._device_timed_out, (job, task, timeout))
+            timer.daemon = True
+            timer.start()
+        try:
+            result = run_one(task.name, task.info, task.cancel)
+            job._finish(task, "cancelled" if job.cancel_event.is_set() else "done", result)
+        except BaseException as e:
+            if job.cancel_event.is_set():
+                job._finish(task, "cancelled")
+            else:
+                job._finish(task, "error", error=str(e) or type(e).__name__)
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def _device_timed_out(self, job: Job, task: DeviceTask, timeout: float) -> None:
+        """장비 타임아웃: 바로 error 로 끝내고, 진행 중인 벤더 폴링은 cancel 로 멈춰 워커를 돌려받는다"""
+        if job._finish(task, "error", error=f"장비 조회 시간 초과({timeout:g}초)"):
+            with self._lock:
+                self._counts["timeouts"] += 1
+        task.cancel.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.sweep()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.done or job.cancel_event.is_set():
+            return job
+        job.cancel_event.set()
+        with self._lock:
+            self._counts["cancelled"] += 1
+        for task in job.devices:
+            task.cancel.set()
+            # 아직 풀에서 시작하지 않은 장비는 바로 취소 처리
+            if task.future is not None and task.future.cancel():
+                job._finish(task, "cancelled")
+        return job
+
+    def sweep(self) -> None:
+        """보관 시간이 지난 끝난 job 제거, 너무 오래 걸리는 job 은 취소."""
+        now = time.monotonic()
+        stale: List[str] = []
+        with self._lock:
+            for job in list(self._jobs.values()):
+                if job.done and now - job.finished >= self.ttl_sec:
+                    del self._jobs[job.id]
+                    self._counts["expired"] += 1
+                elif not job.done and now - job.created >= self.max_age_sec:
+                    stale.append(job.id)
+        for job_id in stale:
+            self.cancel(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            counts = dict(self._counts)
+        by_status: Dict[str, int] = {}
+        for j in jobs:
+            by_status[j.status] = by_status.get(j.status, 0) + 1
+        running = sum(1 for d in itertools.chain.from_iterable(j.devices for j in jobs) if d.status == "running")
+        return dict(counts, jobs=len(jobs), by_status=by_status, running_devices=running,
+                    max_workers=self.max_workers, max_active=self.max_active,
+                    ttl_sec=self.ttl_sec, max_age_sec=self.max_age_sec,
+                    device_timeout_sec=self.device_timeout_sec)
+
+# 모듈 공용 인스턴스
+job_manager = JobManager()
@@ -0,0 +1,318 @@
+# log_store.py
+# 로컬 트래픽 로그 저장소(SQLite).
+# 시간 범위를 정해 조회하면 방화벽에서 받은 레코드를 정규화해 저장하고, "어느 장비/조건으로 어느 시간대를
+# 빠짐없이 받았는지"(coverage)를 함께 기록한다. 같은 조사를 다시 하면
+#   - 요청 범위가 이미 전부 받은 범위면 방화벽에 가지 않고 로컬에서 바로 응답
+#   - 일부만 받았으면 빠진 시간대만 방화벽에서 받아 채운 뒤 응답
+# 인덱스: (device, ts), (src, ts), (dst, ts), (dport, ts)
+# 중복 판정: 같은 장비/시각(초)/컬럼 값 + dup(한 번 받은 응답 안에서 똑같은 행이 몇 번째인지).
+#   정규화한 컬럼에는 출발지 포트/세션 ID 가 없어, 같은 초에 같은 호스트→서비스 세션이 여러 개면 행이 똑같다.
+#   dup 으로 그 행들을 따로 저장하고, 같은 시간대를 다시 받으면 같은 dup 이 나와 겹친 만큼만 무시된다.
+#
+#   LOG_STORE_DB   저장 파일 경로   기본: log_store.db (":memory:" 도 가능)
+
+import ipaddress
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pretty import TRAFFIC_HEADERS, iter_traffic_rows
+from vendors import dispatch_iter, get_adapter
+
+LOG_STORE_DB = os.environ.get("LOG_STORE_DB", "log_store.db")
+STORE_FETCH_ROWS = 10_000   # 빠진 시간대 하나를 받을 때 최대 건수(넘으면 받은 만큼만 coverage 로 인정)
+STORE_SETTLE_SEC = 60       # 최근 이 시간 안쪽은 로그가 늦게 도착할 수 있어 coverage 로 기록하지 않음
+INSERT_BATCH = 1000
+
+Interval = Tuple[int, int]   # epoch 초, 양 끝 포함
+Fetch = Callable[[int, int], Iterable[Any]]   # (start, end) → 벤더 records
+
+_TIME_FORMATS = ("%Y/%m/%d %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S",
+                 "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y/%m/%d %H:%M")
+
+def parse_time(value: Any) -> Optional[int]:
+    """로그/입력 시각 문자열(로컬 시간) 또는 epoch 숫자 → epoch 초. 알 수 없으면 None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    s = str(value).strip()
+    if s.isdigit():
+        return int(s)
+    s = s[:19]   # 소수 초/타임존 꼬리 무시
+    for fmt in _TIME_FORMATS:
+        try:
+            return int(time.mktime(datetime.strptime(s, fmt).timetuple()))
+        except ValueError:
+            continue
+    return None
+
+def filter_key(src_ip: str, dst_ip: str) -> str:
+    """coverage 구분용 조건 키. 빈 조건("")으로 받은 범위는 모든 조건을 덮는다."""
+    src_ip, dst_ip = (src_ip or "").strip(), (dst_ip or "").strip()
+    return f"src={src_ip};dst={dst_ip}" if (src_ip or dst_ip) else ""
+
+def _gaps(covered: List[Interval], start: int, end: int) -> List[Interval]:
+    """[start, end] 중 covered(시작순 정렬)로 덮이지 않은 구간들"""
+    gaps: List[Interval] = []
+    cur = start
+    for s, e in covered:
+        if e < cur:
+            continue
+        if s > end:
+            break
+        if s > cur:
+            gaps.append((cur, s - 1))
+        cur = max(cur, e + 1)
+        if cur > end:
+            break
+    if cur <= end:
+        gaps.append((cur, end))
+    return gaps
+
+def _ip_filter(value: str):
+    """src/dst 조건 → (SQL 로 비교할 값, 파이썬 매처). CIDR 이면 SQL 비교 없이 매처로 거른다."""
+    value = (value or "").strip()
+    if not value:
+        return None, None
+    if "/" in value:
+        net = ipaddress.ip_network(value, strict=False)
+
+        def _match(ip: str) -> bool:
+            try:
+                return ipaddress.ip_address(ip) in net
+            except ValueError:
+                return False
+        return None, _match
+    return value, None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS traffic (
+    device   TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,
+    time     TEXT, src TEXT, dst TEXT, dport TEXT,
+    app      TEXT, protocol TEXT, action TEXT, rule TEXT,
+    dup      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS traffic_dev_ts ON traffic(device, ts);
+CREATE INDEX IF NOT EXISTS traffic_src_ts ON traffic(src, ts);
+CREATE INDEX IF NOT EXISTS traffic_dst_ts ON traffic(dst, ts);
+CREATE INDEX IF NOT EXISTS traffic_dport_ts ON traffic(dport, ts);
+CREATE TABLE IF NOT EXISTS coverage (
+    device   TEXT    NOT NULL,
+    log_type TEXT    NOT NULL,
+    fkey     TEXT    NOT NULL,
+    start    INTEGER NOT NULL,
+    end      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_lookup ON coverage(device, log_type, fkey, start);
+"""
+
+# dup 컬럼이 없던 저장 파일 → 컬럼 추가 + 중복 키 교체(기존 행은 dup 0)
+_MIGRATE_DUP = """
+ALTER TABLE traffic ADD COLUMN dup INTEGER NOT NULL DEFAULT 0;
+DROP INDEX IF EXISTS traffic_uniq;
+"""
+_UNIQUE_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS traffic_uniq_dup
+    ON traffic(device, ts, src, dst, dport, app, protocol, action, rule, dup);
+"""
+
+_COLUMNS = tuple(TRAFFIC_HEADERS)   # time, src, dst, dport, app, protocol, action, rule
+
+class LogStore:
+    """스레드마다 연결 1개(WAL), 쓰기는 락으로 직렬화."""
+
+    def __init__(self, path: str = LOG_STORE_DB):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._counts = {"queries": 0, "local": 0, "gaps_fetched": 0, "rows_fetched": 0, "rows_stored": 0}
+        # ":memory:" 는 연결마다 따로 생기므로 공유 캐시 URI 로 연다
+        self._uri = "file:log_store?mode=memory&cache=shared" if path == ":memory:" else None
+        self._keepalive = self._connect() if self._uri else None
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        if "dup" not in [r[1] for r in conn.execute("PRAGMA table_info(traffic)")]:
+            conn.executescript(_MIGRATE_DUP)
+        conn.executescript(_UNIQUE_INDEX)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._uri:
+            conn = sqlite3.connect(self._uri, uri=True, timeout=30)
+        else:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ── coverage ─────────────────────────────────────────────
+    def covered(self, device: str, log_type: str, fkey: str, start: int, end: int) -> List[Interval]:
+        """[start, end]와 겹치는 받은 구간(같은 조건 + 무조건으로 받은 구간), 시작순"""
+        rows = self._conn().execute(
+            "SELECT start, end FROM coverage WHERE device=? AND log_type=? AND fkey IN (?, '')"
+            " AND end>=? AND start<=? ORDER BY start",
+            (device, log_type, fkey, start, end)).fetchall()
+        return [(s, e) for s, e in rows]
+
+    def missing(self, device: str, log_type: str, fkey: str, start: int, end: int) -> List[Interval]:
+        return _gaps(self.covered(device, log_type, fkey, start, end), start, end)
+
+    def _add_coverage(self, conn: sqlite3.Connection, device: str, log_type: str, fkey: str,
+                      start: int, end: int) -> None:
+        """구간 추가 + 겹치거나 맞닿은 같은 조건 구간과 합치기 (쓰기 락 안에서 호출)"""
+        rows = conn.execute(
+            "SELECT rowid, start, end FROM coverage WHERE device=? AND log_type=? AND fkey=?"
+            " AND end>=? AND start<=?",
+            (device, log_type, fkey, start - 1, end + 1)).fetchall()
+        for rowid, s, e in rows:
+            start, end = min(start, s), max(end, e)
+            conn.execute("DELETE FROM coverage WHERE rowid=?", (rowid,))
+        conn.execute("INSERT INTO coverage(device, log_type, fkey, start, end) VALUES (?, ?, ?, ?, ?)",
+                     (device, log_type, fkey, start, end))
+
+    # ── 저장 ─────────────────────────────────────────────────
+    def ingest_traffic(self, device: str, records: Iterable[Any], start: int, end: int) -> Tuple[int, int, Optional[int]]:
+        """
+        벤더 records → 정규화해 [start, end] 안의 행만 저장.
+        이번 응답 안의 똑같은 행은 dup 0, 1, 2... 로 모두 저장하고, 이미 저장된 (행, dup) 만 무시한다.
+        반환: (받은 행 수, 새로 저장한 행 수, 받은 행 중 가장 이른 ts)
+        """
+        seen = stored = 0
+        oldest: Optional[int] = None
+        batch: List[tuple] = []
+        repeats: Dict[tuple, int] = {}
+        conn = self._conn()
+
+        def _flush():
+            nonlocal stored
+            with self._write_lock, conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO traffic(device, ts, time, src, dst, dport, app, protocol, action, rule, dup)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                stored += conn.total_changes - before
+            batch.clear()
+
+        for row in iter_traffic_rows(records):
+            seen += 1
+            ts = parse_time(row.get("time"))
+            if ts is None:
+                continue
+            oldest = ts if oldest is None else min(oldest, ts)
+            if start <= ts <= end:
+                key = (device, ts) + tuple(row.get(c, "") for c in _COLUMNS)
+                dup = repeats.get(key, 0)
+                repeats[key] = dup + 1
+                batch.append(key + (dup,))
+                if len(batch) >= INSERT_BATCH:
+                    _flush()
+        if batch:
+            _flush()
+        return seen, stored, oldest
+
+    def fill_traffic(self, device: str, src_ip: str, dst_ip: str, start: int, end: int,
+                     fetch: Fetch, limit: int = STORE_FETCH_ROWS, refresh: bool = False) -> Dict[str, Any]:
+        """
+        [start, end] 중 아직 받지 않은 시간대만 fetch(gap_start, gap_end)로 받아 저장(refresh=True 면 전체 범위).
+        fetch 는 최신순으로 최대 limit 건을 돌려준다고 가정: limit 을 채웠으면 받은 가장 이른 시각 이후만
+        coverage 로 기록(나머지는 다음 조회 때 다시 빠진 구간이 됨).
+        """
+        fkey = filter_key(src_ip, dst_ip)
+        settled = int(time.time()) - STORE_SETTLE_SEC
+        gaps = [(start, end)] if refresh else self.missing(device, "traffic", fkey, start, end)
+        fetched = stored = 0
+        for g_start, g_end in gaps:
+            seen, new, oldest = self.ingest_traffic(device, fetch(g_start, g_end), g_start, g_end)
+            fetched += seen
+            stored += new
+            cov_start = g_start if seen < limit or oldest is None else oldest + 1
+            cov_end = min(g_end, settled)
+            if cov_start <= cov_end:
+                conn = self._conn()
+                with self._write_lock, conn:
+                    self._add_coverage(conn, device, "traffic", fkey, cov_start, cov_end)
+        with self._write_lock:
+            self._counts["queries"] += 1
+            self._counts["local"] += 0 if gaps else 1
+            self._counts["gaps_fetched"] += len(gaps)
+            self._counts["rows_fetched"] += fetched
+            self._counts["rows_stored"] += stored
+        return {"local": not gaps, "gaps": len(gaps), "fetched": fetched, "stored": stored}
+
+    # ── 조회 ─────────────────────────────────────────────────
+    def iter_traffic(self, device: str, start: int, end: int, src_ip: str = "", dst_ip: str = "",
+                     dport: str = "", limit: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """저장된 행을 최신순으로 (TRAFFIC_HEADERS 컬럼 dict). src/dst 는 IP 또는 CIDR"""
+        sql = ["SELECT time, src, dst, dport, app, protocol, action, rule FROM traffic"
+               " WHERE device=? AND ts BETWEEN ? AND ?"]
+        args: List[Any] = [device, start, end]
+        matchers = []
+        for col, value in (("src", src_ip), ("dst", dst_ip)):
+            exact, match = _ip_filter(value)
+            if exact is not None:
+                sql.append(f"AND {col}=?")
+                args.append(exact)
+            elif match is not None:
+                matchers.append((_COLUMNS.index(col), match))
+        if dport:
+            sql.append("AND dport=?")
+            args.append(str(dport).strip())
+        sql.append("ORDER BY ts DESC")
+        if limit and not matchers:
+            sql.append("LIMIT ?")
+            args.append(int(limit))
+        n = 0
+        for r in self._conn().execute(" ".join(sql), args):
+            if matchers and not all(m(r[i]) for i, m in matchers):
+                continue
+            yield dict(zip(_COLUMNS, r))
+            n += 1
+            if limit and n >= limit:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        rows = conn.execute("SELECT COUNT(*) FROM traffic").fetchone()[0]
+        intervals = conn.execute("SELECT COUNT(*) FROM coverage").fetchone()[0]
+        with self._write_lock:
+            counts = dict(self._counts)
+        return dict(counts, path=self.path, rows=rows, coverage_intervals=intervals)
+
+def traffic_window(name: str, info: Dict[str, Any], src_ip: str, dst_ip: str, start: int, end: int,
+                   account: str = "", password: str = "", dport: str = "", limit: Optional[int] = None,
+                   refresh: bool = False, cancel: Optional[threading.Event] = None) -> Tuple[Iterator[Dict[str, str]], Dict[str, Any]]:
+    """
+    장비 1대의 [start, end] 트래픽: 빠진 시간대만 방화벽에서 받아 저장한 뒤 저장소에서 읽는다.
+    반환: (행 이터레이터(최신순, 최대 limit 또는 어댑터 max_rows), fill_traffic 결과)
+    """
+    adapter = get_adapter((info or {}).get("vendor", ""))
+    store = get_store()
+
+    def _fetch(a: int, b: int) -> Iterator[Any]:
+        return dispatch_iter(info, "traffic", cancel=cancel, src_ip=src_ip, dst_ip=dst_ip,
+                             account=account, password=password, start=a, end=b, limit=STORE_FETCH_ROWS)
+
+    fill = store.fill_traffic(name, src_ip, dst_ip, start, end, _fetch, refresh=refresh)
+    rows = store.iter_traffic(name, start, end, src_ip, dst_ip, dport, limit=adapter.rows_for(limit))
+    return rows, fill
+
+_store: Optional[LogStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> LogStore:
+    """모듈 공용 저장소(처음 쓸 때 파일을 연다)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LogStore(LOG_STORE_DB)
+        return _store
@@ -0,0 +1,237 @@
+# metrics.py
+# 조회 단계별 소요 시간 / 카운터 수집과 Prometheus 텍스트 형식 출력(/metrics).
+# 외부 라이브러리 없이 Counter, Histogram(누적 버킷)만 최소 구현.
+#
+# 레이블 device / vendor / log_type 은 tags() 로 현재 컨텍스트에 걸어 두면 그 안에서 잰 span 과
+# 카운터에 자동으로 붙는다(app.py 의 장비 블록, vendors.dispatch 에서 건다).
+#   with metrics.tags(device=name, vendor=vendor, log_type="traffic"):
+#       with metrics.span("keygen"): ...
+# 스레드 풀에 넘기는 작업은 wrap(fn) 으로 감싸야 태그가 따라간다.
+# 느린 조회 원인 확인용으로 span 마다 DEBUG 로그도 남긴다(logging 레벨을 DEBUG 로 올리면 보임).
+
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+log = logging.getLogger(__name__)
+
+TAG_NAMES = ("device", "vendor", "log_type")
+_TAGS: "contextvars.ContextVar[Dict[str, str]]" = contextvars.ContextVar("metrics_tags", default={})
+
+# 초 단위 기본 버킷(벤더 job 은 수 초 ~ 수십 초, 파싱/렌더는 ms 단위)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+ROWS_BUCKETS = (0, 10, 100, 1000, 5000, 10_000, 50_000, 100_000)
+
+_REGISTRY: List["_Metric"] = []
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = TAG_NAMES):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        _REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        """명시한 레이블 우선, 없으면 현재 tags(), 그래도 없으면 빈 문자열"""
+        tags = _TAGS.get()
+        return tuple(str(labels[n]) if n in labels else tags.get(n, "") for n in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def lines(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            items = [(k, list(v) if isinstance(v, list) else v) for k, v in items]
+        for key, value in items:
+            out.extend(self._sample_lines(key, value))
+        return out
+
+    def _sample_lines(self, key: Tuple[str, ...], value: Any) -> List[str]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, value: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _sample_lines(self, key, value):
+        return [f"{self.name}{self._labels(key)} {_fmt(value)}"]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = TAG_NAMES,
+                 buckets: Sequence[float] = SECONDS_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            st = self._values.get(key)
+            if st is None:
+                # 버킷별 개수(비누적) + 합계 + 개수
+                st = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    st[i] += 1
+                    break
+            st[-2] += value
+            st[-1] += 1
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            st = self._values.get(self._key(labels))
+            return st[-1] if st else 0
+
+    def _sample_lines(self, key, st):
+        out, acc = [], 0
+        for b, n in zip(self.buckets, st):
+            acc += n
+            le = 'le="%s"' % _fmt(b)
+            out.append(f"{self.name}_bucket{self._labels(key, le)} {acc}")
+        out.append(f"{self.name}_sum{self._labels(key)} {_fmt(round(st[-2], 6))}")
+        out.append(f"{self.name}_count{self._labels(key)} {st[-1]}")
+        return out
+
+# ─────────────────────────────────────────────────────────────
+# 공용 지표
+# ─────────────────────────────────────────────────────────────
+STAGE_SECONDS = Histogram("firewall_stage_seconds",
+                          "Time spent per query stage (keygen, job_start, poll, download, parse, normalize, render ...)",
+                          ("stage",) + TAG_NAMES)
+POLLS = Counter("firewall_polls_total", "Job/search status checks sent to the firewall")
+POLLS_PER_JOB = Histogram("firewall_polls_per_job", "Status checks needed until a job/search finished",
+                          buckets=COUNT_BUCKETS)
+BYTES_RECEIVED = Counter("firewall_bytes_received_total", "Response bytes read from firewall APIs")
+ROWS_PARSED = Counter("firewall_rows_parsed_total", "Log rows parsed per stage", ("stage",) + TAG_NAMES)
+ROWS_PER_QUERY = Histogram("firewall_rows_per_query", "Rows returned by one firewall job/search",
+                           buckets=ROWS_BUCKETS)
+REQUEST_SECONDS = Histogram("http_request_seconds", "Flask request latency by route",
+                            ("route", "method", "status"))
+
+# ─────────────────────────────────────────────────────────────
+# 태그 / span
+# ─────────────────────────────────────────────────────────────
+@contextmanager
+def tags(**labels: Optional[str]) -> Iterator[None]:
+    """with 블록 안의 span/카운터에 붙일 레이블(None 은 무시, 바깥 태그를 덮어씀)"""
+    merged = dict(_TAGS.get())
+    merged.update({k: str(v) for k, v in labels.items() if v is not None})
+    token = _TAGS.set(merged)
+    try:
+        yield
+    finally:
+        _TAGS.reset(token)
+
+def current_tags() -> Dict[str, str]:
+    return dict(_TAGS.get())
+
+def tagged(it: Iterable[T], **labels: Optional[str]) -> Iterator[T]:
+    """이터레이터를 한 건씩 꺼낼 때만 태그를 건다(제너레이터가 소비 측 컨텍스트에 태그를 남기지 않도록)."""
+    it = iter(it)
+    try:
+        while True:
+            with tags(**labels):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        # 중간에 닫혀도 안쪽 정리(finally 의 span 기록 등)가 같은 태그로 돌도록
+        close = getattr(it, "close", None)
+        if close is not None:
+            with tags(**labels):
+                close()
+
+def wrap(fn: Callable[..., T]) -> Callable[..., T]:
+    """스레드 풀에 넘길 함수에 현재 태그를 묶는다(제출마다 새 컨텍스트 복사)."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+@contextmanager
+def span(stage: str, **labels: Any) -> Iterator[None]:
+    """단계 소요 시간을 firewall_stage_seconds 에 기록(예외가 나도 기록)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=stage, **labels)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("span %s %.3fs %s", stage, dt, dict(_TAGS.get(), **labels))
+
+def timed_iter(it: Iterable[T], stage: str, **labels: Any) -> Iterator[T]:
+    """
+    이터레이터 안에서 보낸 시간만 합산해 stage 로 기록하고 꺼낸 건수를 rows 로 센다
+    (스트리밍 소비 측의 처리 시간은 빼고 다운로드/파싱 시간만).
+    """
+    it = iter(it)
+    spent, rows = 0.0, 0
+    try:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                spent += time.perf_counter() - t0
+            rows += 1
+            yield item
+    finally:
+        STAGE_SECONDS.observe(spent, stage=stage, **labels)
+        ROWS_PARSED.inc(rows, stage=stage, **labels)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("span %s %.3fs rows=%d %s", stage, spent, rows, dict(_TAGS.get(), **labels))
+
+# ─────────────────────────────────────────────────────────────
+# 출력
+# ─────────────────────────────────────────────────────────────
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def render() -> str:
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로"""
+    lines: List[str] = []
+    for m in _REGISTRY:
+        lines.extend(m.lines())
+    return "\n".join(lines) + "\n"
+
+def reset() -> None:
+    for m in _REGISTRY:
+        m.clear()
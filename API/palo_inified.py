@@ -1,11 +1,20 @@
 # palo_unified.py
-# Palo Alto 로그 API를 호출하여 "records(list[dict])" 형태로 반환.
+# Palo Alto 로그 API를 호출하여 records(list[TrafficRecord] / list[SystemRecord]) 형태로 반환.
 # pretty.py의 render_*_table()에 바로 넣어 공통 테이블로 출력할 수 있음.
 
+import threading
 import time
-import requests
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+import http_pool
+import metrics
+from polling import poll_until
+from records import SystemRecord, TrafficRecord
+from palo_key_cache import api_key_cache, raise_for_auth, PaloAuthError
+
+# convert 가 만드는 레코드 타입(job 하나는 한 종류만 내보냄)
+LogRecord = TypeVar("LogRecord", TrafficRecord, SystemRecord)
 
 try:
     import urllib3
@@ -13,11 +22,34 @@ try:
 except Exception:
     pass
 
-def _api_get(base_url: str, params: Dict[str, Any], timeout: int = 30):
-    r = requests.get(base_url, params=params, verify=False, timeout=timeout)
+def _api_get(base_url: str, params: Dict[str, Any], timeout: Optional[Any] = None):
+    """timeout 생략 시 http_pool 설정값((CONNECT_TIMEOUT, READ_TIMEOUT))"""
+    r = http_pool.get(base_url, params=params, timeout=timeout or http_pool.default_timeout())
+    metrics.BYTES_RECEIVED.inc(len(r.content))
+    raise_for_auth(r.status_code, r.text)
     r.raise_for_status()
     return r.text
 
+def _api_get_stream(base_url: str, params: Dict[str, Any], timeout: Optional[Any] = None):
+    """본문을 메모리에 올리지 않고 스트림으로 읽기 위한 GET (호출 측에서 close). timeout 은 _api_get 과 같음"""
+    r = http_pool.get(base_url, params=params, timeout=timeout or http_pool.default_timeout(), stream=True)
+    if r.status_code >= 400:
+        try:
+            raise_for_auth(r.status_code, r.text)
+            r.raise_for_status()
+        finally:
+            r.close()
+    r.raw.decode_content = True
+    return r
+
+def _close_stream(r) -> None:
+    """스트림 응답 닫기 + 실제로 읽은 바이트 수 기록"""
+    try:
+        metrics.BYTES_RECEIVED.inc(r.raw.tell())
+    except Exception:
+        pass
+    r.close()
+
 def _extract_job_id(xml_text: str) -> str:
     try:
         root = ET.fromstring(xml_text)
@@ -26,10 +58,13 @@ def _extract_job_id(xml_text: str) -> str:
     except ET.ParseError:
         return ""
 
-def generate_api_key(firewall_ip: str, account: str, password: str) -> str:
-    base = f"https://{firewall_ip}/api/"
-    params = {"type": "keygen", "user": account, "password": password}
-    xml = _api_get(base, params)
+def _api_base(firewall_ip: str) -> str:
+    """관리 IP → API URL. 스킴을 붙여 주면(예: http://127.0.0.1:8443) 그대로 사용."""
+    if "://" in firewall_ip:
+        return firewall_ip.rstrip("/") + "/api/"
+    return f"https://{firewall_ip}/api/"
+
+def _key_from_keygen(xml: str) -> str:
     try:
         root = ET.fromstring(xml)
         key = root.findtext(".//key")
@@ -39,6 +74,211 @@ def generate_api_key(firewall_ip: str, account: str, password: str) -> str:
     except ET.ParseError as e:
         raise RuntimeError(f"API keygen XML parse error: {e}")
 
+def generate_api_key(firewall_ip: str, account: str, password: str) -> str:
+    base = _api_base(firewall_ip)
+    params = {"type": "keygen", "user": account, "password": password}
+    with metrics.span("keygen"):
+        return _key_from_keygen(_api_get(base, params))
+
+def _iter_with_api_key(firewall_ip: str, account: str, password: str,
+                       run: Callable[[str], Iterator[LogRecord]]) -> Iterator[LogRecord]:
+    """
+    캐시된 API 키로 run(key)의 레코드들을 내보냄.
+    레코드를 내보내기 전에 인증 오류가 나면 캐시 키를 버리고 새로 발급받아 1회 재시도한다.
+    """
+    fresh = []
+
+    def _keygen() -> str:
+        fresh.append(True)
+        return generate_api_key(firewall_ip, account, password)
+
+    key = api_key_cache.get_or_create(firewall_ip, account, password, _keygen)
+    yielded = False
+    try:
+        for rec in run(key):
+            yielded = True
+            yield rec
+        return
+    except PaloAuthError:
+        api_key_cache.invalidate(firewall_ip, account)
+        if fresh or yielded:
+            # 방금 발급한 키도 거부되면 재시도해도 소용없음
+            raise
+    key = api_key_cache.get_or_create(firewall_ip, account, password, _keygen)
+    yield from run(key)
+
+# ─────────────────────────────────────────────────────────────
+# action=get 응답 스트리밍 파서
+# - job status를 먼저 읽고, FIN이면 entry를 하나씩 레코드로 변환
+# - 처리한 entry는 clear + 부모에서 제거 → 결과 크기와 무관하게 메모리 일정
+# - _LogEvents: (event, elem)을 하나씩 받는 상태 기계
+#   (동기: iterparse → _LogGetStream, 비동기: XMLPullParser → async_engine 에서 공용)
+# ─────────────────────────────────────────────────────────────
+class _LogEvents:
+    def __init__(self, fields: Sequence[str]):
+        self._fields = frozenset(fields)
+        self._stack: List[ET.Element] = []
+        self.root: Optional[ET.Element] = None
+        self.error = False      # <response status="error">
+        # job status(FIN/ACT/PEND/FAIL ...). 첫 entry가 status보다 먼저 나오면 ""
+        self.status: Optional[str] = None
+        self._entry: Optional[ET.Element] = None
+        self._entry_depth = 0
+        self._values: Dict[str, str] = {}
+
+    def feed(self, ev: str, el: ET.Element) -> Optional[Dict[str, str]]:
+        """이벤트 1개 처리. entry 하나가 끝나면 그 필드 dict를 반환."""
+        if ev == "start":
+            if self.root is None:
+                self.root = el
+                self.error = el.get("status") == "error"
+            self._stack.append(el)
+            if self._entry is None and el.tag == "entry":
+                if self.status is None:
+                    self.status = ""
+                self._entry, self._entry_depth, self._values = el, len(self._stack), {}
+            return None
+        self._stack.pop()
+        if self._entry is None:
+            if self.status is None and el.tag == "status":
+                self.status = (el.text or "").strip().upper()
+            return None
+        if el is self._entry:
+            values = self._values
+            el.clear()
+            if self._stack:
+                self._stack[-1].remove(el)
+            self._entry, self._values = None, {}
+            return values
+        if len(self._stack) == self._entry_depth and el.tag in self._fields:
+            # entry의 직계 자식 중 필요한 필드만 보관
+            self._values[el.tag] = el.text or ""
+        return None
+
+    def raise_error(self) -> None:
+        """문서를 끝까지 읽은 뒤 호출: 원인과 함께 예외."""
+        body = ET.tostring(self.root, encoding="unicode")
+        raise_for_auth(200, body)
+        raise RuntimeError(f"PAN-OS error response\n{body[:1200]}")
+
+class _LogGetStream:
+    def __init__(self, source: Any, fields: Sequence[str]):
+        self._events = ET.iterparse(source, events=("start", "end"))
+        self._parser = _LogEvents(fields)
+
+    def status(self) -> str:
+        """job status(FIN/ACT/PEND/FAIL ...). 첫 entry 전까지만 읽는다."""
+        p = self._parser
+        for ev, el in self._events:
+            p.feed(ev, el)
+            if p.error:
+                # <response status="error"> → 나머지를 읽어 원인과 함께 예외
+                for _ in self._events:
+                    pass
+                p.raise_error()
+            if p.status is not None:
+                break
+        if p.status is None:
+            p.status = ""
+        return p.status
+
+    def records(self, convert: Callable[[Dict[str, str]], LogRecord]) -> Iterator[LogRecord]:
+        """entry마다 필요한 필드만 뽑아 convert(fields) 결과를 yield."""
+        self.status()
+        feed = self._parser.feed
+        for ev, el in self._events:
+            values = feed(ev, el)
+            if values is not None:
+                yield convert(values)
+
+def _run_log_job(base: str,
+                 key: str,
+                 start_params: Dict[str, Any],
+                 fields: Sequence[str],
+                 convert: Callable[[Dict[str, str]], LogRecord],
+                 poll_interval: float,
+                 max_wait_sec: int,
+                 cancel: Optional[threading.Event] = None) -> Iterator[LogRecord]:
+    """
+    log job 생성 → FIN까지 폴링 → entry를 하나씩 convert 해서 yield.
+    폴링 간격은 빠르게 시작해 poll_interval까지 늘어나며, max_wait_sec을 넘기면 PollTimeout.
+    """
+    with metrics.span("job_start"):
+        start_xml = _api_get(base, dict(start_params, key=key))
+    jobid = _extract_job_id(start_xml)
+    if not jobid:
+        raise RuntimeError(f"no job id\n{start_xml[:800]}")
+
+    get_params = {"type": "log", "action": "get", "key": key, "jobid": jobid}
+    polls = [0]
+
+    def _check():
+        polls[0] += 1
+        metrics.POLLS.inc()
+        r = _api_get_stream(base, get_params)
+        try:
+            stream = _LogGetStream(r.raw, fields)
+            status = stream.status()
+        except ET.ParseError as e:
+            _close_stream(r)
+            raise RuntimeError(f"job {jobid} XML parse error: {e}")
+        except BaseException:
+            _close_stream(r)
+            raise
+        if status == "FIN":
+            return r, stream
+        _close_stream(r)
+        if status == "FAIL":
+            raise RuntimeError(f"job {jobid} failed")
+        return None
+
+    with metrics.span("poll"):
+        r, stream = poll_until(_check, max_wait_sec, cancel=cancel,
+                               max_interval=poll_interval, what=f"job {jobid}")
+    metrics.POLLS_PER_JOB.observe(polls[0])
+    try:
+        # 결과는 받으면서 파싱(iterparse)하므로 다운로드와 파싱을 한 단계로 잰다
+        yield from metrics.timed_iter(stream.records(convert), "download_parse")
+    except ET.ParseError as e:
+        raise RuntimeError(f"job {jobid} XML parse error: {e}")
+    finally:
+        _close_stream(r)
+
+PALO_MAX_NLOGS = 5000   # PAN-OS 로그 쿼리 1건이 돌려주는 최대 건수
+
+def _page_params(start_params: Dict[str, Any], nlogs: int, skip: int) -> Tuple[Dict[str, Any], int]:
+    """skip 번째부터 받을 job 1건의 파라미터와 요청 건수(PALO_MAX_NLOGS 이하). async_engine 도 같이 씀"""
+    page = min(PALO_MAX_NLOGS, nlogs - skip)
+    params = dict(start_params, nlogs=str(page))
+    if skip:
+        params["skip"] = str(skip)
+    return params, page
+
+def _run_log_pages(base: str,
+                   key: str,
+                   start_params: Dict[str, Any],
+                   fields: Sequence[str],
+                   convert: Callable[[Dict[str, str]], LogRecord],
+                   nlogs: int,
+                   poll_interval: float,
+                   max_wait_sec: int,
+                   cancel: Optional[threading.Event] = None) -> Iterator[LogRecord]:
+    """
+    nlogs 건까지 레코드를 yield. PALO_MAX_NLOGS 를 넘으면 skip 을 늘려 가며 job 을 이어서 실행하고,
+    한 job 이 요청보다 적게 돌려주면(더 이상 로그 없음) 멈춘다. max_wait_sec 은 job 마다 적용.
+    """
+    skip = 0
+    while skip < nlogs:
+        params, page = _page_params(start_params, nlogs, skip)
+        got = 0
+        for rec in _run_log_job(base, key, params, fields, convert, poll_interval, max_wait_sec, cancel):
+            got += 1
+            yield rec
+        metrics.ROWS_PER_QUERY.observe(got)
+        if got < page:
+            return
+        skip += got
+
 # ─────────────────────────────────────────────────────────────
 # Palo SYSTEM → records
 # ─────────────────────────────────────────────────────────────
@@ -48,130 +288,150 @@ _SEV_MAP = {
     "INFO": "informational",
 }
 
-def palo_system_records(firewall_ip: str,
-                        severity_ui: str,
-                        account: str,
-                        password: str,
-                        nlogs: int = 100,
-                        poll_interval: float = 1.0,
-                        max_wait_sec: int = 20) -> List[Dict[str, Any]]:
-    """
-    시스템 로그를 list[dict]로 반환.
-    dict 예: {"time": "...", "severity": "critical", "message": "..."}
-    """
-    key = generate_api_key(firewall_ip, account, password)
-    base = f"https://{firewall_ip}/api/"
+_SYSTEM_FIELDS = ("time_generated", "receive_time", "severity", "opaque", "msg", "message")
 
-    sev = _SEV_MAP.get((severity_ui or "").upper(), "critical")
-    query = f"(severity eq {sev})"
+def _system_record(f: Dict[str, str]) -> SystemRecord:
+    time_s = f.get("time_generated") or f.get("receive_time") or ""
+    sev_s  = f.get("severity") or ""
+    msg    = f.get("opaque") or f.get("msg") or f.get("message") or ""
+    # 표에는 발생 시각, 기간 조회/수집 위치는 receive_time 기준
+    return SystemRecord(time_s, sev_s, msg, f.get("receive_time") or time_s)
 
-    start_params = {
+def _system_job_params(severity_ui: str, nlogs: int,
+                       start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+    """start/end(epoch 초, 포함)를 주면 receive_time 범위 조건을 붙인다."""
+    sev = _SEV_MAP.get((severity_ui or "").upper(), "critical")
+    q_parts = [f"(severity eq {sev})"]
+    if start is not None:
+        q_parts.append(f"(receive_time geq '{_palo_time(start)}')")
+    if end is not None:
+        q_parts.append(f"(receive_time leq '{_palo_time(end)}')")
+    return {
         "type": "log",
         "log-type": "system",
-        "key": key,
-        "query": query,
+        "query": " and ".join(q_parts),
         "nlogs": str(nlogs),
     }
 
-    start_xml = _api_get(base, start_params)
-    jobid = _extract_job_id(start_xml)
-    if not jobid:
-        raise RuntimeError(f"no job id\n{start_xml[:800]}")
-
-    get_params = {"type": "log", "action": "get", "key": key, "jobid": jobid}
+def iter_palo_system_records(firewall_ip: str,
+                             severity_ui: str,
+                             account: str,
+                             password: str,
+                             nlogs: int = 100,
+                             poll_interval: float = 1.0,
+                             max_wait_sec: int = 20,
+                             cancel: Optional[threading.Event] = None,
+                             start: Optional[float] = None,
+                             end: Optional[float] = None) -> Iterator[SystemRecord]:
+    """시스템 로그 레코드를 하나씩 yield (palo_system_records의 스트리밍 버전). nlogs 가 크면 여러 job 으로 나눠 조회."""
+    base = _api_base(firewall_ip)
+    start_params = _system_job_params(severity_ui, nlogs, start, end)
 
-    deadline = time.time() + max_wait_sec
-    last_xml = ""
-    while time.time() < deadline:
-        last_xml = _api_get(base, get_params)
-        root = ET.fromstring(last_xml)
-        status = (root.findtext(".//status") or "").upper()
-        if status == "FIN":
-            # 보통 .//log/logs/entry 경로
-            entries = root.findall(".//log/logs/entry")
-            if not entries:
-                entries = root.findall(".//entry")
-            out: List[Dict[str, Any]] = []
-            for e in entries:
-                time_s = e.findtext("time_generated") or e.findtext("receive_time") or ""
-                sev_s  = e.findtext("severity") or ""
-                msg    = e.findtext("opaque") or e.findtext("msg") or e.findtext("message") or ""
-                out.append({"time": time_s, "severity": sev_s, "message": msg})
-            return out
-        if status == "FAIL":
-            raise RuntimeError(f"job {jobid} failed\n{last_xml[:1200]}")
-        time.sleep(poll_interval)
+    return _iter_with_api_key(
+        firewall_ip, account, password,
+        lambda key: _run_log_pages(base, key, start_params, _SYSTEM_FIELDS, _system_record,
+                                   nlogs, poll_interval, max_wait_sec, cancel),
+    )
 
-    raise RuntimeError(f"timeout waiting job {jobid}\n{last_xml[:1200]}")
+def palo_system_records(firewall_ip: str,
+                        severity_ui: str,
+                        account: str,
+                        password: str,
+                        nlogs: int = 100,
+                        poll_interval: float = 1.0,
+                        max_wait_sec: int = 20,
+                        cancel: Optional[threading.Event] = None,
+                        start: Optional[float] = None,
+                        end: Optional[float] = None) -> List[SystemRecord]:
+    """
+    시스템 로그를 list[SystemRecord]로 반환.
+    레코드 예: SystemRecord(time="...", severity="critical", message="...") (dict 처럼 rec["message"] 로도 읽음)
+    """
+    return list(iter_palo_system_records(firewall_ip, severity_ui, account, password,
+                                         nlogs, poll_interval, max_wait_sec, cancel, start, end))
 
 # ─────────────────────────────────────────────────────────────
 # Palo TRAFFIC → records
 # ─────────────────────────────────────────────────────────────
-def palo_traffic_records(firewall_ip: str,
-                         src_ip: str,
-                         dst_ip: str,
-                         account: str,
-                         password: str,
-                         nlogs: int = 100,
-                         poll_interval: float = 1.0,
-                         max_wait_sec: int = 20) -> List[Dict[str, Any]]:
-    """
-    트래픽 로그를 list[dict]로 반환.
-    dict 예: {"time":"...", "src":"...", "dst":"...", "dport":"...", "app":"...", "action":"...", "rule":"..."}
-    """
-    key = generate_api_key(firewall_ip, account, password)
-    base = f"https://{firewall_ip}/api/"
+_TRAFFIC_FIELDS = ("receive_time", "time_generated", "src", "dst", "dport", "dstport",
+                   "app", "application", "action", "rule")
+
+def _traffic_record(f: Dict[str, str]) -> TrafficRecord:
+    t   = f.get("receive_time") or f.get("time_generated") or ""
+    src = f.get("src") or ""
+    dst = f.get("dst") or ""
+    dpt = f.get("dport") or f.get("dstport") or ""
+    app = f.get("app") or f.get("application") or ""
+    act = f.get("action") or ""
+    rule= f.get("rule") or ""
+    # entry 마다 dict 대신 고정 스키마 레코드(protocol 은 PAN-OS 필드에 없어 빈 값)
+    return TrafficRecord(t, src, dst, dpt, app, "", act, rule)
+
+def _palo_time(ts: float) -> str:
+    return time.strftime("%Y/%m/%d %H:%M:%S", time.localtime(ts))
 
+def _traffic_job_params(src_ip: str, dst_ip: str, nlogs: int,
+                        start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+    """start/end(epoch 초, 포함)를 주면 receive_time 범위 조건을 붙인다."""
     q_parts = []
     if src_ip:
         q_parts.append(f"(addr.src in {src_ip})")
     if dst_ip:
         q_parts.append(f"(addr.dst in {dst_ip})")
+    if start is not None:
+        q_parts.append(f"(receive_time geq '{_palo_time(start)}')")
+    if end is not None:
+        q_parts.append(f"(receive_time leq '{_palo_time(end)}')")
     query = " and ".join(q_parts) if q_parts else None
 
     start_params = {
         "type": "log",
         "log-type": "traffic",
-        "key": key,
         "nlogs": str(nlogs),
         "dir": "backward",
     }
     if query:
         start_params["query"] = query
+    return start_params
 
-    start_xml = _api_get(base, start_params)
-    jobid = _extract_job_id(start_xml)
-    if not jobid:
-        raise RuntimeError(f"no job id\n{start_xml[:800]}")
-
-    get_params = {"type": "log", "action": "get", "key": key, "jobid": jobid}
+def iter_palo_traffic_records(firewall_ip: str,
+                              src_ip: str,
+                              dst_ip: str,
+                              account: str,
+                              password: str,
+                              nlogs: int = 100,
+                              poll_interval: float = 1.0,
+                              max_wait_sec: int = 20,
+                              cancel: Optional[threading.Event] = None,
+                              start: Optional[float] = None,
+                              end: Optional[float] = None) -> Iterator[TrafficRecord]:
+    """
+    트래픽 로그 레코드를 하나씩 yield (palo_traffic_records의 스트리밍 버전). nlogs 가 크면 여러 job 으로 나눠 조회.
+    start/end(epoch 초)를 주면 그 시간 범위만.
+    """
+    base = _api_base(firewall_ip)
+    start_params = _traffic_job_params(src_ip, dst_ip, nlogs, start, end)
 
-    deadline = time.time() + max_wait_sec
-    last_xml = ""
-    while time.time() < deadline:
-        last_xml = _api_get(base, get_params)
-        root = ET.fromstring(last_xml)
-        status = (root.findtext(".//status") or "").upper()
-        if status == "FIN":
-            entries = root.findall(".//log/logs/entry")
-            if not entries:
-                entries = root.findall(".//entry")
-            out: List[Dict[str, Any]] = []
-            for e in entries:
-                t   = e.findtext("receive_time") or e.findtext("time_generated") or ""
-                src = e.findtext("src") or ""
-                dst = e.findtext("dst") or ""
-                dpt = e.findtext("dport") or e.findtext("dstport") or ""
-                app = e.findtext("app") or e.findtext("application") or ""
-                act = e.findtext("action") or ""
-                rule= e.findtext("rule") or ""
-                out.append({
-                    "time": t, "src": src, "dst": dst, "dport": dpt,
-                    "app": app, "action": act, "rule": rule
-                })
-            return out
-        if status == "FAIL":
-            raise RuntimeError(f"job {jobid} failed\n{last_xml[:1200]}")
-        time.sleep(poll_interval)
+    return _iter_with_api_key(
+        firewall_ip, account, password,
+        lambda key: _run_log_pages(base, key, start_params, _TRAFFIC_FIELDS, _traffic_record,
+                                   nlogs, poll_interval, max_wait_sec, cancel),
+    )
 
-    raise RuntimeError(f"timeout waiting job {jobid}\n{last_xml[:1200]}")
\ No newline at end of file
+def palo_traffic_records(firewall_ip: str,
+                         src_ip: str,
+                         dst_ip: str,
+                         account: str,
+                         password: str,
+                         nlogs: int = 100,
+                         poll_interval: float = 1.0,
+                         max_wait_sec: int = 20,
+                         cancel: Optional[threading.Event] = None,
+                         start: Optional[float] = None,
+                         end: Optional[float] = None) -> List[TrafficRecord]:
+    """
+    트래픽 로그를 list[TrafficRecord]로 반환.
+    레코드 필드: time, src, dst, dport, app, protocol(Palo 는 ""), action, rule (dict 처럼 rec["src"] 로도 읽음)
+    """
+    return list(iter_palo_traffic_records(firewall_ip, src_ip, dst_ip, account, password,
+                                          nlogs, poll_interval, max_wait_sec, cancel, start, end))
@@ -0,0 +1,92 @@
+# palo_key_cache.py
+# PAN-OS API 키를 (방화벽 IP, 계정) 단위로 재사용하기 위한 TTL + LRU 캐시.
+# palo_unified / paloalto_*_log_new 가 같은 인스턴스(api_key_cache)를 공유한다.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+KEY_TTL_SEC = 1800        # 키 재사용 시간(초)
+KEY_CACHE_MAX = 256       # 최대 보관 개수(초과 시 가장 오래 안 쓴 키부터 제거)
+
+class PaloAuthError(RuntimeError):
+    """키 만료/무효 등 인증 오류. 캐시된 키를 버리고 다시 발급받아야 함."""
+
+def is_auth_error(status_code: int, body: str) -> bool:
+    """PAN-OS 응답이 인증 오류인지 판정 (HTTP 401/403 또는 <response status="error" code="403">)."""
+    if status_code in (401, 403):
+        return True
+    head = (body or "")[:600]
+    if 'status="error"' not in head:
+        return False
+    return ('code="403"' in head or "Invalid credential" in head
+            or "Invalid key" in head or "API key" in head)
+
+def raise_for_auth(status_code: int, body: str) -> None:
+    if is_auth_error(status_code, body):
+        raise PaloAuthError(f"PAN-OS auth error (HTTP {status_code}): {(body or '')[:400]}")
+
+def _fingerprint(firewall_ip: str, account: str, password: str) -> str:
+    # 같은 계정이라도 비밀번호가 다르면 캐시 키를 돌려주지 않도록 비밀번호 해시를 함께 보관
+    return hashlib.sha256(f"{firewall_ip}\0{account}\0{password}".encode("utf-8")).hexdigest()
+
+class ApiKeyCache:
+    """스레드 안전 TTL + LRU 캐시. 키: (firewall_ip, account)"""
+
+    def __init__(self, ttl_sec: float = KEY_TTL_SEC, max_entries: int = KEY_CACHE_MAX):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # (ip, account) → (api_key, fingerprint, expires_at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, str, float]]" = OrderedDict()
+
+    def get(self, firewall_ip: str, account: str, password: str) -> Optional[str]:
+        k = (firewall_ip, account)
+        fp = _fingerprint(firewall_ip, account, password)
+        now = time.monotonic()
+        with self._lock:
+            ent = self._entries.get(k)
+            if not ent:
+                return None
+            api_key, ent_fp, expires_at = ent
+            if ent_fp != fp or expires_at <= now:
+                del self._entries[k]
+                return None
+            self._entries.move_to_end(k)
+            return api_key
+
+    def put(self, firewall_ip: str, account: str, password: str, api_key: str) -> None:
+        k = (firewall_ip, account)
+        ent = (api_key, _fingerprint(firewall_ip, account, password), time.monotonic() + self.ttl_sec)
+        with self._lock:
+            self._entries[k] = ent
+            self._entries.move_to_end(k)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_create(self, firewall_ip: str, account: str, password: str,
+                      keygen: Callable[[], str]) -> str:
+        """캐시에 있으면 재사용, 없으면 keygen()으로 발급 후 저장."""
+        api_key = self.get(firewall_ip, account, password)
+        if api_key:
+            return api_key
+        api_key = keygen()
+        self.put(firewall_ip, account, password, api_key)
+        return api_key
+
+    def invalidate(self, firewall_ip: str, account: str) -> None:
+        with self._lock:
+            self._entries.pop((firewall_ip, account), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+# 모듈 공용 인스턴스
+api_key_cache = ApiKeyCache()
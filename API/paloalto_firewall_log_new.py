@@ -3,11 +3,14 @@ from html import escape
 import requests
 import xml.etree.ElementTree as ET
 
+from palo_key_cache import api_key_cache, raise_for_auth, PaloAuthError
+
 def generate_api_key(firewall_ip, account, password):
     base_url = f"https://{firewall_ip}/api/"
     params = {"type": "keygen", "user": account, "password": password}
     try:
         r = requests.get(base_url, params=params, verify=False, timeout=30)
+        raise_for_auth(r.status_code, r.text)
         r.raise_for_status()
         root = ET.fromstring(r.text)
         api_key = root.findtext(".//key")
@@ -18,12 +21,15 @@ def generate_api_key(firewall_ip, account, password):
         raise RuntimeError(f"API 키 생성 중 오류 발생: {e}")
 
 def paloalto_fetch_traffic(firewall_ip, src_ip, dst_ip, account, password,
-                           nlogs=100, poll_interval=1.0, max_wait_sec=20):
+                           nlogs=100, poll_interval=1.0, max_wait_sec=20, _auth_retry=True):
     """
     Palo Alto 트래픽 로그를 Job 기반으로 조회해 HTML 테이블 문자열로 반환.
     """
     # 1) 키 생성
-    api_key = generate_api_key(firewall_ip, account, password)
+    api_key = api_key_cache.get_or_create(
+        firewall_ip, account, password,
+        lambda: generate_api_key(firewall_ip, account, password),
+    )
     base_url = f"https://{firewall_ip}/api/"
 
     # 2) 쿼리 조립 (빈 값은 제외)
@@ -45,6 +51,7 @@ def paloalto_fetch_traffic(firewall_ip, src_ip, dst_ip, account, password,
     try:
         # 3) Job 생성
         r = requests.get(base_url, params=start_params, verify=False, timeout=30)
+        raise_for_auth(r.status_code, r.text)
         r.raise_for_status()
         start_xml = r.text
         root = ET.fromstring(start_xml)
@@ -64,6 +71,7 @@ def paloalto_fetch_traffic(firewall_ip, src_ip, dst_ip, account, password,
         last_body = ""
         while time.time() < deadline:
             rr = requests.get(base_url, params=get_params, verify=False, timeout=30)
+            raise_for_auth(rr.status_code, rr.text)
             rr.raise_for_status()
             last_body = rr.text
             rroot = ET.fromstring(last_body)
@@ -111,6 +119,13 @@ def paloalto_fetch_traffic(firewall_ip, src_ip, dst_ip, account, password,
         # 타임아웃
         return f"[error] Job {job_id} 대기 타임아웃.<br><pre>{escape(last_body[:2000])}</pre>"
 
+    except PaloAuthError as e:
+        # 캐시된 키가 만료/무효 → 버리고 1회 재발급 후 재시도
+        api_key_cache.invalidate(firewall_ip, account)
+        if _auth_retry:
+            return paloalto_fetch_traffic(firewall_ip, src_ip, dst_ip, account, password,
+                                          nlogs, poll_interval, max_wait_sec, _auth_retry=False)
+        return f"[error] 인증 오류: {escape(str(e))}"
     except requests.exceptions.RequestException as e:
         return f"[error] 트래픽 로그 추출 실패: {escape(str(e))}"
     except ET.ParseError as e:
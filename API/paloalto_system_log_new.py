@@ -3,11 +3,14 @@ from html import escape
 import requests
 import xml.etree.ElementTree as ET
 
+from palo_key_cache import api_key_cache, raise_for_auth, PaloAuthError
+
 def generate_api_key(firewall_ip, account, password):
     base_url = f"https://{firewall_ip}/api/"
     params = {"type": "keygen", "user": account, "password": password}
     try:
         r = requests.get(base_url, params=params, verify=False, timeout=30)
+        raise_for_auth(r.status_code, r.text)
         r.raise_for_status()
         root = ET.fromstring(r.text)
         api_key = root.findtext(".//key")
@@ -18,14 +21,17 @@ def generate_api_key(firewall_ip, account, password):
         raise RuntimeError(f"API 키 생성 중 오류 발생: {e}")
 
 def paloalto_fetch_system(firewall_ip, severity, account, password,
-                          nlogs=100, poll_interval=1.0, max_wait_sec=20):
+                          nlogs=100, poll_interval=1.0, max_wait_sec=20, _auth_retry=True):
     """
     Palo Alto 시스템 로그를 Job ID 기반으로 추출.
     - severity: UI 값(CRITICAL/MAJOR/INFO)을 PA 필드 값으로 매핑하여 쿼리 구성
     - 결과: HTML 문자열 (테이블) 반환 → index.html의 {{ result|safe }}로 바로 표시 가능
     """
     # 1) 키 생성
-    api_key = generate_api_key(firewall_ip, account, password)
+    api_key = api_key_cache.get_or_create(
+        firewall_ip, account, password,
+        lambda: generate_api_key(firewall_ip, account, password),
+    )
     base_url = f"https://{firewall_ip}/api/"
 
     # 2) severity 매핑
@@ -48,6 +54,7 @@ def paloalto_fetch_system(firewall_ip, severity, account, password,
     }
     try:
         r = requests.get(base_url, params=start_params, verify=False, timeout=30)
+        raise_for_auth(r.status_code, r.text)
         r.raise_for_status()
         start_xml = r.text
         root = ET.fromstring(start_xml)
@@ -68,6 +75,7 @@ def paloalto_fetch_system(firewall_ip, severity, account, password,
         last_body = ""
         while time.time() < deadline:
             rr = requests.get(base_url, params=get_params, verify=False, timeout=30)
+            raise_for_auth(rr.status_code, rr.text)
             rr.raise_for_status()
             last_body = rr.text
             rroot = ET.fromstring(last_body)
@@ -112,6 +120,13 @@ def paloalto_fetch_system(firewall_ip, severity, account, password,
         # 타임아웃
         return f"[error] Job {job_id} 대기 타임아웃.<br><pre>{escape(last_body[:2000])}</pre>"
 
+    except PaloAuthError as e:
+        # 캐시된 키가 만료/무효 → 버리고 1회 재발급 후 재시도
+        api_key_cache.invalidate(firewall_ip, account)
+        if _auth_retry:
+            return paloalto_fetch_system(firewall_ip, severity, account, password,
+                                         nlogs, poll_interval, max_wait_sec, _auth_retry=False)
+        return f"[error] 인증 오류: {escape(str(e))}"
     except requests.exceptions.RequestException as e:
         return f"[error] 시스템 로그 추출 실패: {escape(str(e))}"
     except ET.ParseError as e:
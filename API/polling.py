@@ -0,0 +1,88 @@
+# polling.py
+# 벤더 job 상태 폴링 공용 스케줄러.
+# 첫 확인은 빠르게, 이후 지수 백오프(상한 있음). 전체 마감 시간과 취소(Event)를 지원.
+
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+FIRST_DELAY_SEC  = 0.1    # job 시작 직후 첫 확인까지 대기
+INITIAL_INTERVAL = 0.25   # 두 번째 확인부터의 시작 간격
+BACKOFF_FACTOR   = 2.0
+MAX_INTERVAL     = 2.0    # 간격 상한
+
+class PollTimeout(RuntimeError):
+    """마감 시간 안에 job이 끝나지 않음."""
+
+class PollCancelled(RuntimeError):
+    """호출 측에서 취소함."""
+
+def _delays(first_delay: float, initial_interval: float,
+            max_interval: float, factor: float) -> Iterator[float]:
+    """대기 간격 수열: first_delay → initial_interval → ×factor … (max_interval 상한)"""
+    yield first_delay
+    interval = initial_interval
+    while True:
+        yield interval
+        interval = min(interval * factor, max_interval)
+
+def poll_until(check: Callable[[], Optional[T]],
+               max_wait_sec: float,
+               cancel: Optional[threading.Event] = None,
+               first_delay: float = FIRST_DELAY_SEC,
+               initial_interval: float = INITIAL_INTERVAL,
+               max_interval: float = MAX_INTERVAL,
+               factor: float = BACKOFF_FACTOR,
+               what: str = "job") -> T:
+    """
+    check()가 None이 아닌 값을 돌려줄 때까지 반복 호출하고 그 값을 반환.
+    - 대기 간격: first_delay → initial_interval → ×factor … (max_interval 상한)
+    - max_wait_sec 초과 시 PollTimeout, cancel이 set 되면 PollCancelled
+    - check()에서 난 예외는 그대로 전파
+    """
+    deadline = time.monotonic() + max_wait_sec
+    attempts = 0
+    for delay in _delays(first_delay, initial_interval, max_interval, factor):
+        remain = deadline - time.monotonic()
+        if remain <= 0:
+            raise PollTimeout(f"{what}: {max_wait_sec:g}s 내에 완료되지 않음 (확인 {attempts}회)")
+        # 마감 시각을 넘겨서 자지 않도록 남은 시간으로 자름
+        wait = min(delay, remain)
+        if cancel is not None:
+            if cancel.wait(wait):
+                raise PollCancelled(f"{what}: 취소됨")
+        elif wait > 0:
+            time.sleep(wait)
+
+        attempts += 1
+        value = check()
+        if value is not None:
+            return value
+
+async def apoll_until(check: Callable[[], Awaitable[Optional[T]]],
+                      max_wait_sec: float,
+                      first_delay: float = FIRST_DELAY_SEC,
+                      initial_interval: float = INITIAL_INTERVAL,
+                      max_interval: float = MAX_INTERVAL,
+                      factor: float = BACKOFF_FACTOR,
+                      what: str = "job") -> T:
+    """
+    poll_until의 asyncio 버전(check는 코루틴 함수). 대기 간격/마감 규칙은 같다.
+    취소는 태스크 취소(CancelledError)로 처리한다.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait_sec
+    attempts = 0
+    for delay in _delays(first_delay, initial_interval, max_interval, factor):
+        remain = deadline - loop.time()
+        if remain <= 0:
+            raise PollTimeout(f"{what}: {max_wait_sec:g}s 내에 완료되지 않음 (확인 {attempts}회)")
+        await asyncio.sleep(min(delay, remain))
+
+        attempts += 1
+        value = await check()
+        if value is not None:
+            return value
@@ -1,12 +1,18 @@
 # pretty.py
 # 벤더별 원본 데이터를 공통 스키마(list[dict])로 정규화하고,
 # 지정 컬럼 순서대로 HTML 테이블을 생성하는 유틸.
+# 벤더 파서가 이미 표 컬럼 순서의 고정 스키마 레코드(records.TrafficRecord / SystemRecord)를 주면
+# 평탄화/별칭/메시지 보정 복사를 건너뛰고 필드를 그대로 셀로 쓴다.
 
-from typing import Any, Dict, List, Sequence
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
 import json
 import html
 import re
 
+import metrics
+from records import SystemRecord, TrafficRecord
+
 # ─────────────────────────────────────────────────────────────
 # 헤더/배너 라인 감지 (시스템 로그에서 종종 처음에 뜨는 컬럼 라인 제거용)
 # ─────────────────────────────────────────────────────────────
@@ -54,11 +60,13 @@ _TIME_PATTERNS = [
     r"[A-Z][a-z]{2}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}",        # Oct 20 12:34:56
     r"\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2}",              # 20/10/2025 12:34:56
 ]
+_SEV_WORDS = r"critical|major|minor|warning|warn|info|informational|high|medium|low|치명|중요|경고|정보"
 _SEV_PATTERNS = [
-    r"\[(critical|major|minor|warning|warn|info|informational|high|medium|low|치명|중요|경고|정보)\]",
-    r"\b(critical|major|minor|warning|warn|info|informational|high|medium|low|치명|중요|경고|정보)\b",
-    r"\((critical|major|minor|warning|warn|info|informational|high|medium|low|치명|중요|경고|정보)\)",
+    rf"\[({_SEV_WORDS})\]",
+    rf"\b({_SEV_WORDS})\b",
+    rf"\(({_SEV_WORDS})\)",
 ]
+_TIME_ANY_RE = re.compile("|".join(_TIME_PATTERNS))
 
 def _norm_severity(tok: str) -> str:
     t = (tok or "").strip().lower()
@@ -66,39 +74,33 @@ def _norm_severity(tok: str) -> str:
 
 def _extract_time_sev_from_string(s: str) -> Dict[str, str]:
     """문자열 한 줄에서 time, severity, message 추출(휴리스틱)."""
-    time_s = ""
-    sev_s = ""
-    # 시간
-    for pat in _TIME_PATTERNS:
-        m = re.search(pat, s)
-        if m:
-            time_s = m.group(0)
-            break
-    # 심각도
-    for pat in _SEV_PATTERNS:
-        m = re.search(pat, s, re.IGNORECASE)
-        if m:
-            sev_s = _norm_severity(m.group(1))
-            break
+    time_s, sev_tok = _find_time_sev(s)
+    sev_s = _norm_severity(sev_tok) if sev_tok else ""
     # 메시지는 전체에서 시간/심각도 토큰을 살짝 제거
     msg = s
     if time_s:
         msg = msg.replace(time_s, "").strip()
     if sev_s:
-        msg = re.sub(re.escape(sev_s), "", msg, flags=re.IGNORECASE).strip()
+        msg = _sev_strip_re(sev_s).sub("", msg).strip()
     return {"time": time_s, "severity": sev_s, "message": msg}
 
+@lru_cache(maxsize=64)
+def _sev_strip_re(sev: str) -> "re.Pattern[str]":
+    return re.compile(re.escape(sev), re.IGNORECASE)
+
 # ─────────────────────────────────────────────────────────────
 # Any → list[dict] 구조 정규화
 # ─────────────────────────────────────────────────────────────
+_RECORD_TYPES = (dict, TrafficRecord, SystemRecord)   # 그대로 레코드로 쓰는 타입
+
 def _to_records(data: Any) -> List[Dict[str, Any]]:
     # list
     if isinstance(data, list):
-        if data and all(isinstance(x, dict) for x in data):
+        if data and all(isinstance(x, _RECORD_TYPES) for x in data):
             return data
         recs: List[Dict[str, Any]] = []
         for x in data:
-            if isinstance(x, dict):
+            if isinstance(x, _RECORD_TYPES):
                 recs.append(x)
             elif isinstance(x, (list, tuple)):
                 # [time, severity, ...message] 가정
@@ -106,7 +108,7 @@ def _to_records(data: Any) -> List[Dict[str, Any]]:
                 sev_raw = str(x[1]) if len(x) > 1 else ""
                 sev = _norm_severity(sev_raw)
                 msg = " ".join(str(v) for v in x[2:]) if len(x) > 2 else ""
-                if not t or not re.search("|".join(_TIME_PATTERNS), t) or not sev:
+                if not t or not _TIME_ANY_RE.search(t) or not sev:
                     recs.append(_extract_time_sev_from_string(" ".join(str(v) for v in x)))
                 else:
                     recs.append({"time": t, "severity": sev, "message": msg})
@@ -115,7 +117,7 @@ def _to_records(data: Any) -> List[Dict[str, Any]]:
         return recs
 
     # dict
-    if isinstance(data, dict):
+    if isinstance(data, _RECORD_TYPES):
         return [data]
 
     # str
@@ -164,11 +166,22 @@ def render_html_table(records: List[Dict[str, Any]],
                       columns: Sequence[Sequence[str]],
                       headers: Sequence[str]) -> str:
     """records(list[dict])를 지정 columns(키 후보들)로 테이블 렌더."""
+    return _html_table(_table_rows(records, columns), headers)
+
+def _table_rows(records: Iterable[Dict[str, Any]], columns: Sequence[Sequence[str]]) -> List[List[str]]:
+    """records → 셀 문자열 행들(완전히 빈 행은 제외)"""
     rows: List[List[str]] = []
     for rec in records:
         row = [_pick(rec, ks) for ks in columns]
-        if any(cell for cell in row):  # 완전히 빈 행은 제외
+        if any(cell for cell in row):
             rows.append(row)
+    return rows
+
+def _html_rows(rows: Iterable[Sequence[str]]) -> List[str]:
+    return ["<tr>" + "".join(f"<td>{html.escape(c)}</td>" for c in row) + "</tr>" for row in rows]
+
+def _html_table(rows: Sequence[Sequence[str]], headers: Sequence[str]) -> str:
+    """셀 문자열 행들 → 테이블 HTML"""
     if not rows:
         return "[ok] 표시할 로그가 없습니다."
     out = [
@@ -176,9 +189,33 @@ def render_html_table(records: List[Dict[str, Any]],
         "<thead><tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in headers) + "</tr></thead>",
         "<tbody>",
     ]
-    for row in rows:
-        out.append("<tr>" + "".join(f"<td>{html.escape(c)}</td>" for c in row) + "</tr>")
+    out.extend(_html_rows(rows))
+    out.append("</tbody></table>")
+    return "\n".join(out)
+
+def render_paged_table(handle: str, headers: Sequence[str], rows: Sequence[Sequence[str]],
+                       total: int, size: int) -> str:
+    """
+    서버에 보관한 결과(result_pages)의 첫 페이지만 그린 표.
+    정렬(헤더 클릭)/컬럼 필터/다음 페이지는 index.html 스크립트가 /results/<handle> 로 받아 온다.
+    """
+    if not total:
+        return "[ok] 표시할 로그가 없습니다."
+    h = html.escape(handle)
+    out = [
+        f'<table class="result-table" border="1" cellpadding="4" cellspacing="0" '
+        f'data-handle="{h}" data-size="{size}" data-page="1" data-total="{total}">',
+        "<thead><tr>" + "".join(f'<th data-col="{html.escape(c)}" title="정렬">{html.escape(c)}</th>'
+                                for c in headers) + "</tr>",
+        '<tr class="result-filters">' + "".join(f'<th><input type="text" data-filter="{html.escape(c)}" '
+                                                f'placeholder="필터"></th>' for c in headers) + "</tr></thead>",
+        "<tbody>",
+    ]
+    out.extend(_html_rows(rows))
     out.append("</tbody></table>")
+    more = "" if len(rows) >= total else ' <button type="button" class="result-more">더 보기</button>'
+    out.append(f'<div class="result-pager" data-handle="{h}">'
+               f'<span class="result-count">{len(rows):,} / {total:,}행</span>{more}</div>')
     return "\n".join(out)
 
 # ─────────────────────────────────────────────────────────────
@@ -260,29 +297,40 @@ _TRAFFIC_ALIASES = {
     "rule": ["rule","rule_name","policy","policyname","policy-name","정책","정책명"],
 }
 
+@lru_cache(maxsize=256)
+def _alias_plan(keys: Tuple[Any, ...]) -> Tuple[Tuple[str, Tuple[Any, ...]], ...]:
+    """
+    레코드 키 집합(순서 포함) → ((표준키, 값을 볼 원본 키들), ...).
+    한 응답의 레코드들은 키 구성이 같으므로 정규화/별칭 탐색은 키 집합당 한 번만 한다.
+    """
+    ascii_map = {_norm_ascii_key(k): k for k in keys}
+    key_set = set(keys)
+    plan = []
+    for canon, aliases in _TRAFFIC_ALIASES.items():
+        cands: List[Any] = []
+        for a in aliases:
+            if a in key_set:
+                cands.append(a)
+            ak = _norm_ascii_key(a)
+            if ak and ak in ascii_map:
+                cands.append(ascii_map[ak])
+        if cands:
+            plan.append((canon, tuple(dict.fromkeys(cands))))
+    return tuple(plan)
+
+def _coerce_traffic_alias(rec: Dict[str, Any]) -> Dict[str, Any]:
+    new = dict(rec)
+    for canon, cands in _alias_plan(tuple(rec)):
+        if new.get(canon):
+            continue
+        for k in cands:
+            v = rec[k]
+            if v not in (None, ""):
+                new[canon] = str(v); break
+    return new
+
 def _coerce_traffic_aliases(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for rec in records:
-        if not isinstance(rec, dict):
-            out.append(rec); continue
-        ascii_map = {_norm_ascii_key(k): k for k in rec.keys()}
-        new = dict(rec)
-        for canon, aliases in _TRAFFIC_ALIASES.items():
-            if new.get(canon):
-                continue
-            val = None
-            for a in aliases:
-                if a in rec and rec[a] not in (None, ""):
-                    val = rec[a]; break
-                ak = _norm_ascii_key(a)
-                if ak and ak in ascii_map:
-                    v = rec.get(ascii_map[ak])
-                    if v not in (None, ""):
-                        val = v; break
-            if val not in (None, ""):
-                new[canon] = str(val)
-        out.append(new)
-    return out
+    return [(_coerce_traffic_alias(rec) if isinstance(rec, dict) else rec) for rec in records]
 
 _IP_RE   = r"(?:(?:\d{1,3}\.){3}\d{1,3})"
 _PORT_RE = r"(?:^|\s)(?:dport|dstport|destport|destinationport|port)[:=\s]+(\d{1,5})(?:\b|$)"
@@ -291,54 +339,160 @@ _APP_RE  = r"(?:^|\s)(?:app|application|서비스|애플리케이션)[:=\s]+([^\
 _ACT_RE  = r"\b(allow|permit|accept|deny|drop|block|reset|차단|허용)\b"
 _PROTO_RE= r"(?:^|\s)(?:proto|protocol|프로토콜)[:=\s]+([A-Za-z0-9]+)"
 
-def _coerce_from_message(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for rec in records:
-        if not isinstance(rec, dict):
-            out.append(rec); continue
-        new = dict(rec)
-        msg = (new.get("message") or new.get("msg") or new.get("opaque")
-               or new.get("description") or new.get("detail") or "")
-        if msg:
-            if not new.get("src") or not new.get("dst"):
-                ips = re.findall(_IP_RE, msg)
-                if ips:
-                    if not new.get("src"): new["src"] = ips[0]
-                    if not new.get("dst") and len(ips) >= 2: new["dst"] = ips[1]
-            if not new.get("dport"):
-                m = re.search(_PORT_RE, msg, re.IGNORECASE)
-                if m: new["dport"] = m.group(1)
-            if not new.get("rule"):
-                m = re.search(_RULE_RE, msg, re.IGNORECASE)
-                if m: new["rule"] = m.group(1).strip()
-            if not new.get("app"):
-                m = re.search(_APP_RE, msg, re.IGNORECASE)
-                if m: new["app"] = m.group(1).strip()
-            if not new.get("action"):
-                m = re.search(_ACT_RE, msg, re.IGNORECASE)
-                if m: new["action"] = m.group(1).lower()
-            if not new.get("protocol"):
-                m = re.search(_PROTO_RE, msg, re.IGNORECASE)
-                if m: new["protocol"] = m.group(1).upper()
-        out.append(new)
+# 메시지 필드 추출기 (정규식은 모두 모듈 로드 시 한 번만 컴파일)
+# - 동작/키워드는 전부 \b 경계 단어라서, 소문자 문자열을 \w+ 로 한 번 토큰화한 뒤 집합 조회로 찾는다.
+#   (\b(word)\b 매치 == 어떤 \w+ 토큰이 word 와 같음)
+# - 키워드 값(port/rule/app/proto)은 해당 키워드 토큰이 있을 때만 기존 패턴으로 한 번 찾는다.
+# - 시간/심각도/IP는 컴파일된 정규식으로 찾는다(심각도는 소문자 문자열에 대소문자 구분 검색).
+_TOKEN_RE = re.compile(r"\w+")
+_ACT_WORD_SET = frozenset(["allow", "permit", "accept", "deny", "drop", "block", "reset", "차단", "허용"])
+_KW_KIND = {
+    "dport": "port", "dstport": "port", "destport": "port", "destinationport": "port", "port": "port",
+    "rule": "rule", "policy": "rule", "정책": "rule", "정책명": "rule",
+    "app": "app", "application": "app", "서비스": "app", "애플리케이션": "app",
+    "proto": "protocol", "protocol": "protocol", "프로토콜": "protocol",
+}
+_KW_RES = {
+    "port": re.compile(_PORT_RE, re.IGNORECASE),
+    "rule": re.compile(_RULE_RE, re.IGNORECASE),
+    "app": re.compile(_APP_RE, re.IGNORECASE),
+    "protocol": re.compile(_PROTO_RE, re.IGNORECASE),
+}
+_KW_RES_LOWER = {k: re.compile(r.pattern) for k, r in _KW_RES.items()}   # 소문자 문자열용
+_ACT_COMPILED = re.compile(_ACT_RE, re.IGNORECASE)
+_SEV_COMPILED = [re.compile(p, re.IGNORECASE) for p in _SEV_PATTERNS]
+_IP_COMPILED = re.compile(_IP_RE)
+_TIME_COMPILED = [re.compile(p) for p in _TIME_PATTERNS]
+
+_SEV_LOWER = [re.compile(p) for p in _SEV_PATTERNS]   # 소문자로 바꾼 문자열용(대소문자 구분 검색이 더 빠름)
+
+def _find_time_sev(s: str) -> Tuple[str, str]:
+    """(시간 문자열, 심각도 원문 토큰). 패턴 우선순위는 기존과 동일."""
+    time_s = ""
+    if ":" in s:   # 모든 시간 패턴에 hh:mm:ss 가 있음
+        for r in _TIME_COMPILED:
+            m = r.search(s)
+            if m:
+                time_s = m.group(0)
+                break
+    sev_s = ""
+    low = s.lower()
+    pats, target = (_SEV_LOWER, low) if len(low) == len(s) else (_SEV_COMPILED, s)
+    for r in pats:
+        m = r.search(target)
+        if m:
+            sev_s = m.group(1)
+            break
+    return time_s, sev_s
+
+def _kw_value(kind: str, v: str) -> str:
+    if kind == "protocol":
+        return v.upper()
+    if kind in ("rule", "app"):
+        return v.strip()
+    return v
+
+def _scan_traffic_fields(s: str) -> Dict[str, Any]:
+    """
+    메시지 1건 → {"ips": [...], "port", "rule", "app", "action", "protocol"} (없는 값은 "")
+    단어 필드는 \w+ 토큰화 한 번으로 찾고, 값이 필요한 키워드만 해당 패턴을 한 번 검색.
+    """
+    out = {"port": "", "rule": "", "app": "", "action": "", "protocol": ""}
+    low = s.lower()
+    if len(low) == len(s):
+        kinds = set()
+        for w in _TOKEN_RE.findall(low):
+            if w in _ACT_WORD_SET:
+                if not out["action"]:
+                    out["action"] = w
+            else:
+                k = _KW_KIND.get(w)
+                if k:
+                    kinds.add(k)
+        # 위치가 같으므로 소문자 문자열에서 찾고 값은 원문에서 잘라온다
+        for k in kinds:
+            m = _KW_RES_LOWER[k].search(low)
+            if m:
+                a, b = m.span(1)
+                out[k] = _kw_value(k, s[a:b])
+    else:
+        # 소문자 변환으로 길이가 바뀌는 드문 문자 → 패턴별 대소문자 무시 검색
+        m = _ACT_COMPILED.search(s)
+        if m:
+            out["action"] = m.group(1).lower()
+        for k, r in _KW_RES.items():
+            m = r.search(s)
+            if m:
+                out[k] = _kw_value(k, m.group(1))
+    out["ips"] = _IP_COMPILED.findall(s)
     return out
 
-def render_traffic_table(data: Any) -> str:
-    """벤더 무관 트래픽 결과 → 공통 표 HTML."""
-    recs = _to_records(data)
+_MSG_FILL_KEYS = ("src", "dst", "dport", "rule", "app", "action", "protocol")
+
+def _fill_from_message(rec: Dict[str, Any]) -> Dict[str, Any]:
+    new = dict(rec)
+    msg = (new.get("message") or new.get("msg") or new.get("opaque")
+           or new.get("description") or new.get("detail") or "")
+    if msg and not all(new.get(k) for k in _MSG_FILL_KEYS):
+        f = _scan_traffic_fields(msg)
+        if not new.get("src") or not new.get("dst"):
+            ips = f["ips"]
+            if ips:
+                if not new.get("src"): new["src"] = ips[0]
+                if not new.get("dst") and len(ips) >= 2: new["dst"] = ips[1]
+        if not new.get("dport") and f["port"]:
+            new["dport"] = f["port"]
+        if not new.get("rule") and f["rule"]:
+            new["rule"] = f["rule"]
+        if not new.get("app") and f["app"]:
+            new["app"] = f["app"]
+        if not new.get("action") and f["action"]:
+            new["action"] = f["action"]
+        if not new.get("protocol") and f["protocol"]:
+            new["protocol"] = f["protocol"]
+    return new
+
+def _coerce_from_message(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [(_fill_from_message(rec) if isinstance(rec, dict) else rec) for rec in records]
+
+def traffic_table_rows(data: Any) -> List[Sequence[str]]:
+    """벤더 무관 트래픽 결과 → 표 행들(TRAFFIC_HEADERS 순서의 셀 문자열, 빈 행 제외)"""
+    with metrics.span("to_records"):
+        recs = _to_records(data)
+    if recs and all(type(r) is TrafficRecord for r in recs):
+        # 고정 스키마 레코드: 이미 표준키 그대로라 보정할 것이 없음 → 필드 = 셀
+        metrics.ROWS_PARSED.inc(len(recs), stage="normalize")
+        return [c for c in (r.cells() for r in recs) if any(c)]
     # 1) 중첩 평탄화
-    recs = [(_flatten_record(r) if isinstance(r, dict) else r) for r in recs]
+    with metrics.span("flatten"):
+        recs = [(_flatten_record(r) if isinstance(r, dict) else r) for r in recs]
     # 2) 별칭 → 표준키 보정
-    recs = _coerce_traffic_aliases(recs)
+    with metrics.span("aliases"):
+        recs = _coerce_traffic_aliases(recs)
     # 3) message 문자열에서 추가 추출(모자란 값 채움)
-    recs = _coerce_from_message(recs)
-    return render_html_table(recs, TRAFFIC_KEYS, TRAFFIC_HEADERS)
+    with metrics.span("from_message"):
+        recs = _coerce_from_message(recs)
+    metrics.ROWS_PARSED.inc(len(recs), stage="normalize")
+    return _table_rows(recs, TRAFFIC_KEYS)
+
+def render_traffic_table(data: Any) -> str:
+    """벤더 무관 트래픽 결과 → 공통 표 HTML."""
+    rows = traffic_table_rows(data)
+    with metrics.span("render"):
+        return _html_table(rows, TRAFFIC_HEADERS)
 
 # ─────────────────────────────────────────────────────────────
 # 시스템: 헤더/배너 라인 제거 후 렌더
 # ─────────────────────────────────────────────────────────────
-def render_system_table(data: Any) -> str:
-    recs = _to_records(data)
+def system_table_rows(data: Any) -> List[Sequence[str]]:
+    """시스템 로그 결과 → 표 행들(SYSTEM_HEADERS 순서의 셀 문자열, 헤더/배너 줄과 빈 행 제외)"""
+    with metrics.span("to_records"):
+        recs = _to_records(data)
+    if recs and all(type(r) is SystemRecord for r in recs):
+        rows = [c for c in (r.cells() for r in recs)
+                if any(c) and not (not c[0] and not c[1] and _is_headerish(c[2]))]
+        metrics.ROWS_PARSED.inc(len(rows), stage="normalize")
+        return rows
     cleaned: List[Dict[str, Any]] = []
     for r in recs:
         t   = _pick(r, ["time_generated", "receive_time", "time", "event_time"])
@@ -347,11 +501,50 @@ def render_system_table(data: Any) -> str:
         if (not t) and (not sev) and _is_headerish(msg):
             continue
         cleaned.append(r)
-    return render_html_table(cleaned, SYSTEM_KEYS, SYSTEM_HEADERS)
+    metrics.ROWS_PARSED.inc(len(cleaned), stage="normalize")
+    return _table_rows(cleaned, SYSTEM_KEYS)
+
+def render_system_table(data: Any) -> str:
+    rows = system_table_rows(data)
+    with metrics.span("render"):
+        return _html_table(rows, SYSTEM_HEADERS)
 
 # (옵션) 여러 장비 결과를 한 번에 묶어서 렌더할 때 사용
 def render_traffic_table_from_records(records: List[Dict[str, Any]]) -> str:
     return render_html_table(records, TRAFFIC_KEYS, TRAFFIC_HEADERS)
 
 def render_system_table_from_records(records: List[Dict[str, Any]]) -> str:
-    return render_html_table(records, SYSTEM_KEYS, SYSTEM_HEADERS)
\ No newline at end of file
+    return render_html_table(records, SYSTEM_KEYS, SYSTEM_HEADERS)
+
+# ─────────────────────────────────────────────────────────────
+# 스트리밍 정규화: 레코드를 하나씩 받아 표와 같은 컬럼의 dict를 하나씩 (JSON/NDJSON/내보내기용)
+# ─────────────────────────────────────────────────────────────
+def _iter_raw(records: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    for rec in records:
+        if isinstance(rec, _RECORD_TYPES):
+            yield rec
+        else:
+            yield from _to_records([rec])
+
+def iter_traffic_rows(records: Iterable[Any]) -> Iterator[Dict[str, str]]:
+    """records(이터레이터 가능) → {time, src, dst, ...} (render_traffic_table 과 같은 규칙, 빈 행 제외)"""
+    for rec in _iter_raw(records):
+        if type(rec) is TrafficRecord:
+            row = rec.to_dict()
+        else:
+            rec = _fill_from_message(_coerce_traffic_alias(_flatten_record(rec)))
+            row = {h: _pick(rec, ks) for h, ks in zip(TRAFFIC_HEADERS, TRAFFIC_KEYS)}
+        if any(row.values()):
+            yield row
+
+def iter_system_rows(records: Iterable[Any]) -> Iterator[Dict[str, str]]:
+    """records(이터레이터 가능) → {time, severity, message} (render_system_table 과 같은 규칙)"""
+    for rec in _iter_raw(records):
+        if type(rec) is SystemRecord:
+            row = rec.to_dict()
+        else:
+            row = {h: _pick(rec, ks) for h, ks in zip(SYSTEM_HEADERS, SYSTEM_KEYS)}
+        if not row["time"] and not row["severity"] and _is_headerish(row["message"]):
+            continue
+        if any(row.values()):
+            yield row
@@ -0,0 +1,89 @@
+# records.py
+# 고정 스키마 로그 레코드(__slots__).
+# 벤더 파서(palo_inified / async_engine)가 entry 마다 dict 대신 이 객체를 만들고,
+# pretty 의 렌더러/정규화는 표 컬럼 순서 그대로 필드를 읽어 복사 없이 쓴다.
+#   - dict 처럼 읽을 수 있음(Mapping: rec["src"], rec.get("src"), keys(), items(), dict(rec))
+#     → 캐시/로그/비교 등 records 를 dict 로 다루던 코드는 그대로 동작
+#   - 필드 순서 == pretty.TRAFFIC_HEADERS / SYSTEM_HEADERS (표 한 행)
+#   - 표에 나오지 않는 속성은 __slots__ 에만 두고 _fields 에서 뺀다(SystemRecord.received)
+
+from collections.abc import Mapping
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+class _SlotRecord(Mapping):
+    """필드 = _fields(생략 시 __slots__). 값은 항상 문자열(없으면 "", 만드는 쪽에서 채움)."""
+
+    __slots__ = ()
+    _fields: Tuple[str, ...]
+    _get_cells: Callable[["_SlotRecord"], Tuple[str, ...]]
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        if "_fields" not in cls.__dict__:
+            cls._fields = cls.__slots__
+        cls._get_cells = attrgetter(*cls._fields)
+
+    # ── Mapping ──────────────────────────────────────────────
+    def __getitem__(self, key: str) -> str:
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields else default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    # ── 표 한 행 ─────────────────────────────────────────────
+    def cells(self) -> Tuple[str, ...]:
+        """필드 값들(표 컬럼 순서)"""
+        return self._get_cells(self)   # attrgetter 는 메서드로 묶이지 않아 self 를 직접 넘김
+
+    def to_dict(self) -> Dict[str, str]:
+        return {n: getattr(self, n) for n in self._fields}
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is type(self):
+            return self.cells() == other.cells()
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None   # 값 비교 객체(변경 가능)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{n}={getattr(self, n)!r}' for n in self._fields)})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return type(self), tuple(getattr(self, n) for n in self.__slots__)
+
+# 파서가 entry 마다 부르므로 __init__ 은 필드별 대입만(일반화한 루프보다 몇 배 빠름)
+class TrafficRecord(_SlotRecord):
+    __slots__ = ("time", "src", "dst", "dport", "app", "protocol", "action", "rule")
+
+    def __init__(self, time: str = "", src: str = "", dst: str = "", dport: str = "",
+                 app: str = "", protocol: str = "", action: str = "", rule: str = ""):
+        self.time = time
+        self.src = src
+        self.dst = dst
+        self.dport = dport
+        self.app = app
+        self.protocol = protocol
+        self.action = action
+        self.rule = rule
+
+class SystemRecord(_SlotRecord):
+    __slots__ = ("time", "severity", "message", "received")
+    _fields = ("time", "severity", "message")
+
+    def __init__(self, time: str = "", severity: str = "", message: str = "", received: str = ""):
+        self.time = time
+        self.severity = severity
+        self.message = message
+        self.received = received   # 방화벽 수신 시각(기간 조회 조건과 같은 기준). 없으면 ""
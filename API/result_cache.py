@@ -0,0 +1,143 @@
+# result_cache.py
+# 트래픽/시스템 조회 결과를 잠시 재사용하기 위한 TTL + LRU 캐시.
+# 같은 장비에 같은 조건으로 짧은 시간 안에 다시 조회하면 방화벽 job을 새로 만들지 않는다.
+# 키: (장비, 로그 종류, 정규화한 필터, 시간 범위, 계정 지문)
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+RESULT_TTL_SEC = {         # 벤더별 재사용 시간(초)
+    "Paloalto": 60,
+    "Secui Bluemax": 60,
+}
+DEFAULT_TTL_SEC = 60
+RESULT_CACHE_MAX = 256         # 최대 항목 수
+RESULT_CACHE_MAX_ROWS = 200_000  # 전체 보관 행 수 상한(초과 시 가장 오래 안 쓴 항목부터 제거)
+
+CacheKey = Tuple[Any, ...]
+
+def _norm(v: Any) -> str:
+    return str(v).strip().lower() if v is not None else ""
+
+def make_key(device: str, log_type: str, filters: Dict[str, Any],
+             window: Any = None, credentials: Optional[Tuple[str, str]] = None) -> CacheKey:
+    """
+    캐시 키 생성. 빈 필터 값은 제외하고 이름순으로 정렬해 같은 조건이면 같은 키가 되게 한다.
+    credentials(계정, 비밀번호)를 주면 해시만 키에 넣는다(다른 계정에게 결과를 돌려주지 않도록).
+    """
+    norm_filters = tuple(sorted((k, _norm(v)) for k, v in (filters or {}).items() if _norm(v)))
+    cred_fp = ""
+    if credentials:
+        cred_fp = hashlib.sha256("\0".join(credentials).encode("utf-8")).hexdigest()
+    return (device, log_type, norm_filters, window, cred_fp)
+
+def _rows(value: Any) -> int:
+    try:
+        return max(1, len(value))
+    except TypeError:
+        return 1
+
+class ResultCache:
+    """스레드 안전 TTL + LRU 캐시 (항목 수/전체 행 수 상한)."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX, max_rows: int = RESULT_CACHE_MAX_ROWS,
+                 ttl_by_vendor: Optional[Dict[str, float]] = None, default_ttl: float = DEFAULT_TTL_SEC):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl_by_vendor = dict(RESULT_TTL_SEC if ttl_by_vendor is None else ttl_by_vendor)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        # key → (value, rows, expires_at)
+        self._entries: "OrderedDict[CacheKey, Tuple[Any, int, float]]" = OrderedDict()
+        self._rows = 0
+        self._counts = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, "refresh": 0}
+
+    def ttl_for(self, vendor: str) -> float:
+        return self.ttl_by_vendor.get(vendor, self.default_ttl)
+
+    def _drop(self, key: CacheKey) -> None:
+        _, rows, _ = self._entries.pop(key)
+        self._rows -= rows
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        """(찾았는지, 값). 만료된 항목은 지우고 miss."""
+        now = time.monotonic()
+        with self._lock:
+            ent = self._entries.get(key)
+            if ent is None:
+                self._counts["misses"] += 1
+                return False, None
+            if ent[2] <= now:
+                self._drop(key)
+                self._counts["expired"] += 1
+                self._counts["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            return True, ent[0]
+
+    def put(self, key: CacheKey, value: Any, vendor: str = "") -> None:
+        ttl = self.ttl_for(vendor)
+        if ttl <= 0:
+            return
+        rows = _rows(value)
+        if rows > self.max_rows:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, rows, time.monotonic() + ttl)
+            self._rows += rows
+            self._counts["stores"] += 1
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._drop(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+
+    def get_or_fetch(self, key: CacheKey, vendor: str, fetch: Callable[[], Any],
+                     refresh: bool = False,
+                     cacheable: Callable[[Any], bool] = lambda v: isinstance(v, list)) -> Tuple[Any, bool]:
+        """
+        (값, 캐시 적중 여부). refresh=True면 캐시를 건너뛰고 새로 조회해 덮어쓴다.
+        cacheable(값)이 참인 결과만 저장(기본: list — 오류 문자열/HTML은 저장하지 않음).
+        반환값은 캐시와 공유되므로 호출 측에서 수정하지 말 것.
+        """
+        if refresh:
+            with self._lock:
+                self._counts["refresh"] += 1
+        else:
+            hit, value = self.get(key)
+            if hit:
+                return value, True
+        value = fetch()
+        if cacheable(value):
+            self.put(key, value, vendor)
+        return value, False
+
+    def invalidate(self, device: Optional[str] = None) -> None:
+        """device를 주면 그 장비 항목만, 아니면 전부 제거."""
+        with self._lock:
+            for k in [k for k in self._entries if device is None or k[0] == device]:
+                self._drop(k)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            entries, rows = len(self._entries), self._rows
+        lookups = counts["hits"] + counts["misses"]
+        return dict(counts, entries=entries, rows=rows,
+                    max_entries=self.max_entries, max_rows=self.max_rows,
+                    ttl_by_vendor=dict(self.ttl_by_vendor), default_ttl=self.default_ttl,
+                    hit_ratio=round(counts["hits"] / lookups, 3) if lookups else 0.0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+# 모듈 공용 인스턴스
+result_cache = ResultCache()
@@ -0,0 +1,151 @@
+# result_pages.py
+# 조회 결과 표를 서버에 잠시 보관하고(결과 핸들), 화면은 한 페이지씩만 받아 가게 하는 저장소.
+# 결과창에는 첫 페이지만 그리고, 정렬/컬럼 필터/다음 페이지는 GET /results/<handle> 로 요청한다
+# → 수만 행 결과도 HTML 한 장에 다 싣지 않아 브라우저가 버벅이지 않는다.
+#   - 보관 단위: 장비 1대 결과 = 헤더 + 정규화한 셀 문자열 행들(pretty.traffic_table_rows / system_table_rows)
+#   - 만료: 마지막으로 읽은 뒤 RESULT_HANDLE_TTL_SEC, 항목 수/전체 행 수 상한을 넘으면 오래 안 쓴 것부터 제거
+#   - 정렬/필터를 적용한 행 목록은 핸들마다 마지막 조건 하나만 기억(같은 조건으로 페이지를 넘길 때 다시 정렬하지 않음)
+# 프로세스 메모리에만 있으므로 워커가 여러 개인 배포에서는 같은 워커로 요청이 가야 한다(스티키 세션).
+
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+RESULT_PAGE_SIZE = 100              # 기본 페이지 크기(행)
+RESULT_PAGE_MAX_SIZE = 1000         # 한 번에 받을 수 있는 최대 행 수
+RESULT_HANDLE_TTL_SEC = 1800        # 마지막 사용 후 보관 시간(초)
+RESULT_HANDLES_MAX = 256            # 최대 핸들 수
+RESULT_HANDLES_MAX_ROWS = 500_000   # 전체 보관 행 수 상한
+
+Row = Sequence[str]
+Filters = Tuple[Tuple[str, str], ...]   # ((컬럼, 소문자 검색어), ...)
+
+_NUM_SPLIT_RE = re.compile(r"(\d+)")
+
+def _natural_key(s: str) -> Tuple[Any, ...]:
+    """숫자 부분은 수로 비교(포트 80 < 443, IP 10.0.0.9 < 10.0.0.10). 홀수 자리는 항상 숫자라 타입이 섞이지 않음"""
+    parts = _NUM_SPLIT_RE.split(s)
+    parts[1::2] = [int(p) for p in parts[1::2]]
+    parts[0::2] = [p.lower() for p in parts[0::2]]
+    return tuple(parts)
+
+class ResultSet:
+    """핸들 하나 = 장비 1대의 결과 표."""
+
+    __slots__ = ("handle", "log_type", "device", "columns", "rows", "expires", "_lock", "_view_key", "_view")
+
+    def __init__(self, handle: str, log_type: str, device: str, columns: Sequence[str], rows: List[Row]):
+        self.handle = handle
+        self.log_type = log_type
+        self.device = device
+        self.columns = list(columns)
+        self.rows = rows
+        self.expires = 0.0
+        self._lock = threading.Lock()   # 같은 핸들의 view 캐시를 여러 요청이 동시에 바꾸지 않도록
+        self._view_key: Optional[Tuple[str, bool, Filters]] = None
+        self._view: List[Row] = rows
+
+    def view(self, sort: str = "", desc: bool = False, filters: Filters = ()) -> List[Row]:
+        """필터 → 정렬한 행 목록(마지막 조건 하나는 재사용). 정렬 없이 필터도 없으면 원래 순서"""
+        key = (sort, desc, filters)
+        with self._lock:
+            if key == self._view_key:
+                return self._view
+            rows = self.rows
+            if filters:
+                idx = [(self.columns.index(c), q) for c, q in filters]
+                rows = [r for r in rows if all(q in r[i].lower() for i, q in idx)]
+            if sort:
+                i = self.columns.index(sort)
+                rows = sorted(rows, key=lambda r: _natural_key(r[i]), reverse=desc)
+            self._view_key, self._view = key, rows
+            return rows
+
+class ResultPages:
+    """스레드 안전 결과 핸들 저장소(TTL + LRU, 항목 수/전체 행 수 상한)."""
+
+    def __init__(self, max_entries: int = RESULT_HANDLES_MAX, max_rows: int = RESULT_HANDLES_MAX_ROWS,
+                 ttl_sec: float = RESULT_HANDLE_TTL_SEC):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, ResultSet]" = OrderedDict()
+        self._rows = 0
+        self._counts = {"stored": 0, "pages": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def _drop(self, handle: str) -> None:
+        self._rows -= len(self._entries.pop(handle).rows)
+
+    def put(self, columns: Sequence[str], rows: List[Row], log_type: str = "", device: str = "") -> str:
+        """행들을 보관하고 핸들 반환. 상한보다 큰 결과도 받아 두고 대신 다른 핸들을 밀어낸다."""
+        handle = secrets.token_urlsafe(12)
+        rs = ResultSet(handle, log_type, device, columns, rows)
+        with self._lock:
+            rs.expires = time.monotonic() + self.ttl_sec
+            self._entries[handle] = rs
+            self._rows += len(rows)
+            self._counts["stored"] += 1
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+                self._drop(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+        return handle
+
+    def get(self, handle: str) -> Optional[ResultSet]:
+        """핸들의 결과(읽을 때마다 만료 시각 연장). 없거나 만료면 None"""
+        now = time.monotonic()
+        with self._lock:
+            rs = self._entries.get(handle)
+            if rs is None:
+                self._counts["misses"] += 1
+                return None
+            if rs.expires <= now:
+                self._drop(handle)
+                self._counts["expired"] += 1
+                self._counts["misses"] += 1
+                return None
+            rs.expires = now + self.ttl_sec
+            self._entries.move_to_end(handle)
+            return rs
+
+    def page(self, handle: str, page: int = 1, size: int = RESULT_PAGE_SIZE, sort: str = "",
+             desc: bool = False, filters: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        한 페이지(1부터). 없거나 만료된 핸들이면 None, 모르는 컬럼이면 ValueError.
+        filters: {컬럼: 검색어} — 대소문자 무시 부분 일치, 여러 개면 모두 만족
+        """
+        rs = self.get(handle)
+        if rs is None:
+            return None
+        size = max(1, min(int(size), RESULT_PAGE_MAX_SIZE))
+        page = max(1, int(page))
+        for c in ([sort] if sort else []) + list(filters or {}):
+            if c not in rs.columns:
+                raise ValueError(f"알 수 없는 컬럼: {c} ({'|'.join(rs.columns)})")
+        flt: Filters = tuple(sorted((c, q.strip().lower()) for c, q in (filters or {}).items() if q.strip()))
+        rows = rs.view(sort, desc, flt)
+        with self._lock:
+            self._counts["pages"] += 1
+        start = (page - 1) * size
+        return {
+            "handle": rs.handle, "log_type": rs.log_type, "device": rs.device, "columns": rs.columns,
+            "total": len(rs.rows), "matched": len(rows),
+            "page": page, "size": size, "pages": max(1, -(-len(rows) // size)),
+            "sort": sort, "desc": desc, "filters": dict(flt),
+            "rows": [list(r) for r in rows[start:start + size]],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._counts, entries=len(self._entries), rows=self._rows,
+                        max_entries=self.max_entries, max_rows=self.max_rows, ttl_sec=self.ttl_sec)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+# 모듈 공용 인스턴스
+result_pages = ResultPages()
@@ -1,192 +1,387 @@
-import requests
+import logging
+import os
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-def get_secui_token(base_url, client_id, client_secret):
-    url = f"{base_url}/api/au/external/login"
+import http_pool
+import metrics
+from polling import poll_until, PollCancelled
+
+log = logging.getLogger(__name__)
+
+SECUI_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+    "User-Agent": "python-requests/2.31.0"
+}
+
+# 토큰 재사용 시간(초). 로그인 응답에 만료 정보가 있으면 그 값을 우선 사용
+TOKEN_TTL_SEC = 1800
+# 만료 직전 토큰은 쓰지 않고 미리 갱신
+TOKEN_REFRESH_MARGIN_SEC = 30
+# 로그인 시 force=1(같은 client 의 다른 세션을 끊고 로그인) 사용 여부. 토큰을 재사용하므로 기본은 끔
+LOGIN_FORCE = os.environ.get("SECUI_LOGIN_FORCE", "").lower() in ("1", "true", "yes")
+# 검색 상태(status) 폴링 최대 대기(초). 넘기면 검색을 종료(/end)하고 오류 반환
+SEARCH_MAX_WAIT_SEC = 60
+# 검색이 실패로 끝난 상태값. 이 상태면 마감까지 기다리지 않고 바로 오류
+SEARCH_FAILED_STATUSES = ("FAIL", "FAILED", "ERROR", "CANCEL", "CANCELED", "CANCELLED", "STOP", "STOPPED")
+# 결과 페이지 조회 기본값: 한 번에 가져올 행 수 / 기본 최대 행 수 / 동시에 받을 페이지 수
+PAGE_ROWS = 100
+MAX_ROWS = 100
+TOTAL_ROWS = 3
+PAGE_FETCH_WINDOW = 3
+# 요청마다 바꿀 수 있는 page_rows / total_rows 의 상한(어댑터/API 에서 범위 확인)
+PAGE_ROWS_MAX = 1000
+TOTAL_ROWS_MAX = 1000
+
+_PAGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="secui-page")
+
+class SecuiError(RuntimeError):
+    """검색 실패(메시지를 그대로 화면에 보여줌)."""
+
+def _login_payload(client_id, client_secret, force=None):
     payload = {
         "ext_clnt_id": client_id,
         "ext_clnt_secret": client_secret,
         "lang": "ko",
-        "force": 1
-    }
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "User-Agent": "python-requests/2.31.0"
     }
+    if LOGIN_FORCE if force is None else force:
+        payload["force"] = 1
+    return payload
+
+def _token_from_login(data):
+    """로그인 응답(json) → (token, 유효시간 초)"""
+    result = data.get("result", {})
+    token = result.get("api_token")  # ✅ 수정된 부분
+    ttl = TOKEN_TTL_SEC
+    for k in ("expires_in", "expire_in", "timeout"):
+        try:
+            if result.get(k):
+                ttl = min(ttl, float(result[k]))
+                break
+        except (TypeError, ValueError):
+            pass
+    return token, ttl
+
+def _login(base_url, client_id, client_secret, force=None):
+    """로그인 후 (token, 유효시간 초) 반환. 실패 시 (None, 0). force 생략 시 LOGIN_FORCE"""
+    url = f"{base_url}/api/au/external/login"
     try:
-        response = requests.post(url, json=payload, headers=headers, verify=False)
+        with metrics.span("login"):
+            response = http_pool.post(url, json=_login_payload(client_id, client_secret, force),
+                                      headers=SECUI_HEADERS)
+        metrics.BYTES_RECEIVED.inc(len(response.content))
         response.raise_for_status()
-        data = response.json()
-        token = data.get("result", {}).get("api_token")  # ✅ 수정된 부분
-        print("✅ Secui 토큰 발급 성공:", token)  # 디버깅용
-        return token
+        return _token_from_login(response.json())
     except Exception as e:
-        print("❌ Secui 토큰 발급 실패:", e)
+        log.warning("Secui 토큰 발급 실패: %s", e)
+        return None, 0
+
+def get_secui_token(base_url, client_id, client_secret, force=None):
+    """캐시를 거치지 않는 신규 로그인. force=True 면 다른 세션을 끊고 로그인"""
+    return _login(base_url, client_id, client_secret, force)[0]
+
+# ─────────────────────────────────────────────────────────────
+# 토큰 캐시: (base_url, client_id) 단위 재사용 + 동시 갱신 1회로 합치기
+# ─────────────────────────────────────────────────────────────
+class SecuiTokenCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}       # key → (token, expires_at)
+        self._key_locks = {}    # key → [Lock, 기다리거나 잡고 있는 스레드 수] (같은 키의 로그인은 한 번에 하나만)
+
+    @contextmanager
+    def _key_lock(self, key):
+        """key 별 로그인 잠금. 아무도 쓰지 않게 되면 항목을 지워 _key_locks 가 계속 늘지 않게 한다"""
+        with self._lock:
+            ent = self._key_locks.get(key)
+            if ent is None:
+                ent = self._key_locks[key] = [threading.Lock(), 0]
+            ent[1] += 1
+        try:
+            with ent[0]:
+                yield
+        finally:
+            with self._lock:
+                ent[1] -= 1
+                if not ent[1]:
+                    del self._key_locks[key]
+
+    def _valid(self, key):
+        ent = self._tokens.get(key)
+        if ent and ent[1] - TOKEN_REFRESH_MARGIN_SEC > time.monotonic():
+            return ent[0]
         return None
 
-def fetch_secui_system_logs(info, level):
-    base_url = info['base_url']
-    client_id = info['client_id']
-    client_secret = info['client_secret']
-    token = get_secui_token(base_url, client_id, client_secret)
-    if not token:
-        return "토큰 발급 실패"
-
-    url = f"{base_url}/api/lr/log/start"
-    headers = {
-        "Authorization": token,
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "User-Agent": "python-requests/2.31.0"
-    }
+    def peek(self, base_url, client_id):
+        """유효한 캐시 토큰(없으면 None). 로그인하지 않음."""
+        with self._lock:
+            return self._valid((base_url, client_id))
 
-    payload = {
-        "log_type": "alert",
-        "stime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - 60000)),
-        "etime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-        "total_rows": 3,
-        "page_rows": 100,
-        "order_by": "desc",
-        "columns": ["level", "time", "module_id", "mach_id", "message"],
-        "filters": [{
-            "key": "level",
-            "value": [level],
-            "is_not": False
-        }],
-#            "level" : "INFO",
- #           "time" : "2025-10-16 13:00:36",
-  #          "module_id": "System", 
-   #         "mach_id": "NGF_1510SE_M",
-    #        "message": "CPU usage(individual) is too high : CPU3(100.00%)" 
-
-     #   }
-      #  ],
-        #"items":[{
-        #    "key": "level",
-        #    "value": level,
-        #    "is_not": "false"
-        #}],
-        #"filters":[],
-        
-    }
+    def store(self, base_url, client_id, token, ttl):
+        with self._lock:
+            self._tokens[(base_url, client_id)] = (token, time.monotonic() + ttl)
+
+    def get(self, base_url, client_id, client_secret):
+        key = (base_url, client_id)
+        with self._lock:
+            token = self._valid(key)
+        if token:
+            return token
+        # 진행 중인 로그인이 있으면 그 결과를 같이 쓴다(single-flight)
+        with self._key_lock(key):
+            with self._lock:
+                token = self._valid(key)
+            if token:
+                return token
+            token, ttl = _login(base_url, client_id, client_secret)
+            if token:
+                self.store(base_url, client_id, token, ttl)
+            return token
+
+    def invalidate(self, base_url, client_id, token=None):
+        """token을 주면 그 토큰이 아직 캐시에 있을 때만 제거(이미 다른 스레드가 갱신했으면 유지)."""
+        key = (base_url, client_id)
+        with self._lock:
+            ent = self._tokens.get(key)
+            if ent and (token is None or ent[0] == token):
+                del self._tokens[key]
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+token_cache = SecuiTokenCache()
+
+def _secui_call(method, info, path, **kwargs):
+    """
+    캐시 토큰으로 Secui API 호출. 401이면 토큰을 버리고 재로그인 후 1회 재시도.
+    토큰을 얻지 못하면 None 반환.
+    """
+    base_url, client_id, client_secret = info['base_url'], info['client_id'], info['client_secret']
+    url = f"{base_url}{path}"
+    for attempt in range(2):
+        token = token_cache.get(base_url, client_id, client_secret)
+        if not token:
+            return None
+        headers = dict(SECUI_HEADERS, Authorization=token)
+        response = http_pool.request(method, url, headers=headers, **kwargs)
+        metrics.BYTES_RECEIVED.inc(len(response.content))
+        if response.status_code != 401 or attempt:
+            return response
+        log.warning("Secui 401 → 토큰 재발급 후 재시도: %s", path)
+        token_cache.invalidate(base_url, client_id, token)
+    return response
+
+# ─────────────────────────────────────────────────────────────
+# 검색 공통: start → status → page(여러 개) → end
+# ─────────────────────────────────────────────────────────────
+def _page_rows(res):
+    # rows: 기본 rows → 없으면 log 로 폴백
+    rows = res.get("rows")
+    if rows is None:
+        rows = res.get("log", [])
+    return rows
+
+def _columns_for(res, rows, log_type):
+    """columns: 응답에 없으면 "예상 스키마" 우선 적용 + 나머지 키들 뒤에 정렬 추가"""
+    columns = res.get("columns")
+    if columns:
+        return columns
+    key_union = set()
+    if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+        for r in rows:
+            key_union.update(r.keys())
+
+    # 요청 payload의 로그 타입 기준으로 기대 컬럼 템플릿 결정
+    if log_type == "alert":  # 시스템 로그
+        template = ["level", "time", "module_id", "mach_id", "message"]
+    else:  # 기본: 트래픽 세션
+        template = ["etime", "fa_rule_name", "src_ip", "dst_ip", "dst_port", "action", "reason"]
+
+    # 템플릿에 있는 키들 먼저, 나머지 키들은 알파벳 순으로 뒤에
+    return [c for c in template if c in key_union] + [c for c in sorted(key_union) if c not in template]
 
+def _iter_table_rows(rows, columns):
+    """각 행의 값을 컬럼 순서대로 정렬한 리스트로 yield"""
+    if not isinstance(rows, list):
+        # rows가 리스트가 아니면 그대로 한 셀로
+        yield [rows]
+        return
+    for r in rows:
+        if isinstance(r, dict):
+            yield [r.get(c, "") for c in columns]  # 컬럼 순서대로 값 매핑(누락은 빈칸)
+        elif isinstance(r, list):
+            # 리스트 길이가 컬럼 수와 다르면 패딩/자르기
+            yield (r + [""] * len(columns))[:len(columns)]
+        else:
+            yield [r]
+
+def _to_table(res, log_type):
+    """page 응답 result → [columns] + rows (2차원 배열)"""
+    rows = _page_rows(res)
+    columns = _columns_for(res, rows, log_type)
+    return [columns] + list(_iter_table_rows(rows, columns))
+
+def _search_status(data, request_id):
+    """status 응답(json) → 끝났으면(DONE) data, 진행 중이면 None, 실패면 SecuiError"""
+    if data.get("code") != "ok":
+        raise SecuiError(f"검색 상태 조회 실패: {data.get('message', 'An unknown error occurred')}")
+    status = str(data.get("result", {}).get("status") or "").upper()
+    if status == "DONE":
+        return data
+    if status in SEARCH_FAILED_STATUSES:
+        raise SecuiError(f"검색 실패({status}): {request_id}")
+    return None
+
+def _fetch_page(info, request_id, start, end):
+    with metrics.span("page_download"):
+        response = _secui_call("GET", info, f"/api/lr/log/{request_id}/page/{start}/to/{end}")
+    if response is None:
+        raise SecuiError("토큰 발급 실패")
+    response.raise_for_status()
+    with metrics.span("json_parse"):
+        return response.json().get("result", {})
+
+def _iter_pages(info, request_id, limit, page_rows, window):
+    """
+    [0, limit) 구간을 page_rows 단위로 나눠 최대 window개씩 동시에 받아오고,
+    순서대로 result를 yield.
+    """
+    ranges = [(a, min(a + page_rows, limit)) for a in range(0, limit, page_rows)]
+    pending = deque()
+    it = iter(ranges)
     try:
-        print("📤 시스템 로그 요청 payload:", payload)  # 디버깅용
-        response = requests.post(url, json=payload, headers=headers, verify=False)
-        print("전체 응답:",response.text)
+        for rng in it:
+            pending.append(_PAGE_POOL.submit(metrics.wrap(_fetch_page), info, request_id, *rng))
+            if len(pending) >= max(1, window):
+                break
+        while pending:
+            res = pending.popleft().result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(_PAGE_POOL.submit(metrics.wrap(_fetch_page), info, request_id, *nxt))
+            yield res
+    finally:
+        for f in pending:
+            f.cancel()
+
+def _iter_search(info, payload, max_rows, page_rows, window, max_wait_sec, cancel):
+    """
+    검색 1건을 스트림으로 실행: 첫 원소는 columns, 이후 각 행(list).
+    실패 시 SecuiError / PollTimeout 등 예외.
+    """
+    request_id = None
+    try:
+        with metrics.span("search_start"):
+            response = _secui_call("POST", info, "/api/lr/log/start", json=payload)
+        if response is None:
+            raise SecuiError("토큰 발급 실패")
         response.raise_for_status()
         data = response.json()
-        print("전체 응답:",response)
-        print("전체 응답:",data)
-        
+
         if data.get("code") != "ok":
-            return f"검색 시작 실패: {data.get('message', 'An unknown error occurred')}"
+            raise SecuiError(f"검색 시작 실패: {data.get('message', 'An unknown error occurred')}")
 
         request_id = data.get("result", {}).get("request_id")
         if not request_id:
-            return "요청 ID가 없습니다"
-
-        # 진행 상태 확인
-        status_url = f"{base_url}/api/lr/log/{request_id}/status"
-        while True:
-            status_response = requests.get(status_url, headers=headers, verify=False)
-            status_data = status_response.json()
-            if status_data.get("result", {}).get("status") == "DONE":
-                break
-            time.sleep(1)
-
-        # 결과 조회
-        page_rows = 100
-        searched_cnt = status_data.get("result", {}).get("searched_cnt", 0)
-        end = min(page_rows, searched_cnt)
-        
-        result_url = f"{base_url}/api/lr/log/{request_id}/page/0/to/{end}"
-        result_response = requests.get(result_url, headers=headers, verify=False)
-        result_data = result_response.json()
-        
-   #     res =  result_data.get()
-   #     rows = result_data.get("result", {}).get("rows", [])
-   #     columns = result_data.get("result", {}).get("columns", [])
-   #     output = [columns]
-        
-
-        res = result_data.get("result", {})
-
-        # 1) rows: 기본 rows → 없으면 log 로 폴백
-        rows = res.get("rows")
-        if rows is None:
-            rows = res.get("log", [])
-
-        # 2) columns: 응답에 없으면 "예상 스키마" 우선 적용 + 나머지 키들 뒤에 정렬 추가
-        columns = res.get("columns")
-        if not columns:
-            key_union = set()
-            if isinstance(rows, list) and rows and isinstance(rows[0], dict):
-                for r in rows:
-                    key_union.update(r.keys())
-
-            # 요청 payload의 로그 타입 기준으로 기대 컬럼 템플릿 결정
-            log_type = (payload.get("properties") or {}).get("log_type") or payload.get("log_type")
-            if log_type == "alert":  # 시스템 로그
-                template = ["level", "time", "module_id", "mach_id", "message"]
-            else:  # 기본: 트래픽 세션
-                template = ["etime", "fa_rule_name", "src_ip", "dst_ip", "dst_port", "action", "reason"]
-
-            # 템플릿에 있는 키들 먼저, 나머지 키들은 알파벳 순으로 뒤에
-            columns = [c for c in template if c in key_union] + [c for c in sorted(key_union) if c not in template]
-
-        # 3) 표 형태로 정렬된 2차원 배열 구성: [columns] + 각 행의 값(컬럼 순서대로)
-        output = [columns]
-        if isinstance(rows, list):
-            for r in rows:
-                if isinstance(r, dict):
-                    output.append([r.get(c, "") for c in columns])  # 컬럼 순서대로 값 매핑(누락은 빈칸)
-                elif isinstance(r, list):
-                    # 리스트 길이가 컬럼 수와 다르면 패딩/자르기
-                    row_fixed = (r + [""] * len(columns))[:len(columns)]
-                    output.append(row_fixed)
-                else:
-                    output.append([r])
-        else:
-            # rows가 리스트가 아니면 그대로 한 셀로
-            output.append([rows])
-        requests.delete(f"{base_url}/api/lr/log/{request_id}/end", headers=headers, verify=False)
-        return output
-        #for row in rows:
-        #    output.append(row)
-        #requests.delete(f"{base_url}/api/lr/log/{request_id}/end", headers=headers, verify=False)
-        #return output
-    except Exception as e:
-        requests.delete(f"{base_url}/api/lr/log/{request_id}/end", headers=headers, verify=False)
+            raise SecuiError("요청 ID가 없습니다")
+
+        # 진행 상태 확인 (빠른 첫 확인 + 백오프, 마감/취소 지원)
+        polls = [0]
+
+        def _check():
+            polls[0] += 1
+            metrics.POLLS.inc()
+            status_response = _secui_call("GET", info, f"/api/lr/log/{request_id}/status")
+            if status_response is None:
+                raise SecuiError("토큰 발급 실패")
+            if not status_response.ok:
+                raise SecuiError(f"검색 상태 조회 실패: HTTP {status_response.status_code}")
+            return _search_status(status_response.json(), request_id)
+
+        with metrics.span("poll"):
+            status_data = poll_until(_check, max_wait_sec, cancel=cancel, what=f"secui search {request_id}")
+        metrics.POLLS_PER_JOB.observe(polls[0])
 
+        # 결과 조회: 검색 건수와 max_rows 중 작은 쪽까지 전부
+        searched_cnt = int(status_data.get("result", {}).get("searched_cnt", 0) or 0)
+        limit = max(0, min(searched_cnt, max_rows))
+        columns = None
+        if limit == 0:
+            # 0건이어도 컬럼 구성은 page 응답으로 결정(기존 동작 유지)
+            res = _fetch_page(info, request_id, 0, 0)
+            yield _columns_for(res, _page_rows(res), payload.get("log_type"))
+            yield from _iter_table_rows(_page_rows(res), [])
+            return
+        got = 0
+        for res in _iter_pages(info, request_id, limit, page_rows, window):
+            rows = _page_rows(res)
+            if columns is None:
+                columns = _columns_for(res, rows, payload.get("log_type"))
+                yield columns
+            if isinstance(rows, list):
+                got += len(rows)
+                metrics.ROWS_PARSED.inc(len(rows), stage="page")
+            yield from _iter_table_rows(rows, columns)
+        metrics.ROWS_PER_QUERY.observe(got)
+    finally:
+        if request_id:
+            try:
+                with metrics.span("search_end"):
+                    _secui_call("DELETE", info, f"/api/lr/log/{request_id}/end")
+            except Exception as e:
+                log.warning("Secui 검색 종료 실패: %s", e)
+
+def _run_search(info, payload, max_rows=MAX_ROWS, page_rows=PAGE_ROWS, window=PAGE_FETCH_WINDOW,
+                max_wait_sec=SEARCH_MAX_WAIT_SEC, cancel=None):
+    """검색 1건 실행 → 2차원 배열([columns] + rows) 또는 오류 문자열"""
+    try:
+        return list(_iter_search(info, payload, max_rows, page_rows, window, max_wait_sec, cancel))
+    except SecuiError as e:
+        return str(e)
+    except PollCancelled:
+        raise   # 호출 측이 취소한 것은 오류 문자열로 바꾸지 않음
+    except Exception as e:
         return f"오류 발생: {str(e)}"
 
-def fetch_secui_traffic_logs(info, src_ip, dst_ip):
-    base_url = info['base_url']
-    client_id = info['client_id']
-    client_secret = info['client_secret']
-    token = get_secui_token(base_url, client_id, client_secret)
-    print("넘어온 SRC IP:",src_ip)
-    if not token:
-        requests.delete(f"{base_url}/api/lr/log/{request_id}/end", headers=headers, verify=False)
-
-        return "토큰 발급 실패"
-
-    url = f"{base_url}/api/lr/log/start"
-    headers = {
-        "Authorization": token,
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-        "User-Agent": "python-requests/2.31.0"
+# ─────────────────────────────────────────────────────────────
+# 시스템 / 트래픽
+# ─────────────────────────────────────────────────────────────
+def _system_payload(level, total_rows, page_rows, start=None, end=None):
+    # start/end(epoch 초)를 주지 않으면 최근 60000초
+    now = time.time()
+    start = now - 60000 if start is None else start
+    end = now if end is None else end
+    return {
+        "log_type": "alert",
+        "stime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start)),
+        "etime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(end)),
+        "total_rows": total_rows,
+        "page_rows": page_rows,
+        "order_by": "desc",
+        "columns": ["level", "time", "module_id", "mach_id", "message"],
+        "filters": [{
+            "key": "level",
+            "value": [level],
+            "is_not": False
+        }],
     }
 
-    payload = {
+def _traffic_payload(src_ip, dst_ip, total_rows, page_rows, start=None, end=None):
+    # start/end(epoch 초)를 주지 않으면 최근 30000초
+    now = time.time()
+    start = now - 30000 if start is None else start
+    end = now if end is None else end
+    return {
         "log_type": "traffic_session",
-        "stime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - 30000)),
-        "etime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-        "total_rows": 3,
-        "page_rows": 100,
+        "stime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start)),
+        "etime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(end)),
+        "total_rows": total_rows,
+        "page_rows": page_rows,
         "order_by": "desc",
         "filters": [{
             "key": "src_ip",
@@ -200,80 +395,30 @@ def fetch_secui_traffic_logs(info, src_ip, dst_ip):
         "print_object_name": "false"
     }
 
-    try:
-        print("📤 트래픽 로그 요청 payload:", payload)  # 디버깅용
-        response = requests.post(url, json=payload, headers=headers, verify=False)
-        response.raise_for_status()
-        data = response.json()
+def iter_secui_system_logs(info, level, max_rows=MAX_ROWS, page_rows=PAGE_ROWS, total_rows=TOTAL_ROWS,
+                           window=PAGE_FETCH_WINDOW, max_wait_sec=SEARCH_MAX_WAIT_SEC, cancel=None,
+                           start=None, end=None):
+    """시스템 로그 스트림: columns, row, row, ... (실패 시 예외). start/end(epoch 초)로 기간 지정"""
+    payload = _system_payload(level, total_rows, page_rows, start, end)
+    log.debug("시스템 로그 요청 payload: %s", payload)
+    return _iter_search(info, payload, max_rows, page_rows, window, max_wait_sec, cancel)
 
-        if data.get("code") != "ok":
-            return f"검색 시작 실패: {data.get('message', 'An unknown error occurred')}"
+def iter_secui_traffic_logs(info, src_ip, dst_ip, max_rows=MAX_ROWS, page_rows=PAGE_ROWS, total_rows=TOTAL_ROWS,
+                            window=PAGE_FETCH_WINDOW, max_wait_sec=SEARCH_MAX_WAIT_SEC, cancel=None,
+                            start=None, end=None):
+    """트래픽 로그 스트림: columns, row, row, ... (실패 시 예외). start/end(epoch 초)로 기간 지정"""
+    payload = _traffic_payload(src_ip, dst_ip, total_rows, page_rows, start, end)
+    log.debug("트래픽 로그 요청 payload: %s", payload)
+    return _iter_search(info, payload, max_rows, page_rows, window, max_wait_sec, cancel)
 
-        request_id = data.get("result", {}).get("request_id")
-        if not request_id:
-            return "요청 ID가 없습니다"
-
-        # 진행 상태 확인
-        status_url = f"{base_url}/api/lr/log/{request_id}/status"
-        while True:
-            status_response = requests.get(status_url, headers=headers, verify=False)
-            status_data = status_response.json()
-            if status_data.get("result", {}).get("status") == "DONE":
-                break
-            time.sleep(1)
-
-        # 페이지 정보 계산
-        page_rows = 100
-        searched_cnt = status_data.get("result", {}).get("searched_cnt", 0)
-        end = min(page_rows, searched_cnt)
-        result_url = f"{base_url}/api/lr/log/{request_id}/page/0/to/{end}"
-        result_response = requests.get(result_url, headers=headers, verify=False)
-        result_data = result_response.json()
-        res = result_data.get("result", {})
-        print("결과 : ",result_data)
-        rows = res.get("rows")
-        if rows is None:
-            rows = res.get("log", [])
-
-        # 2) columns: 응답에 없으면 "예상 스키마" 우선 적용 + 나머지 키들 뒤에 정렬 추가
-        columns = res.get("columns")
-        if not columns:
-            key_union = set()
-            if isinstance(rows, list) and rows and isinstance(rows[0], dict):
-                for r in rows:
-                    key_union.update(r.keys())
-
-            # 요청 payload의 로그 타입 기준으로 기대 컬럼 템플릿 결정
-            log_type = (payload.get("properties") or {}).get("log_type") or payload.get("log_type")
-            if log_type == "alert":  # 시스템 로그
-                template = ["level", "time", "module_id", "mach_id", "message"]
-            else:  # 기본: 트래픽 세션
-                template = ["etime", "fa_rule_name", "src_ip", "dst_ip", "dst_port", "action", "reason"]
-
-            # 템플릿에 있는 키들 먼저, 나머지 키들은 알파벳 순으로 뒤에
-            columns = [c for c in template if c in key_union] + [c for c in sorted(key_union) if c not in template]
-
-        # 3) 표 형태로 정렬된 2차원 배열 구성: [columns] + 각 행의 값(컬럼 순서대로)
-        output = [columns]
-        if isinstance(rows, list):
-            for r in rows:
-                if isinstance(r, dict):
-                    output.append([r.get(c, "") for c in columns])  # 컬럼 순서대로 값 매핑(누락은 빈칸)
-                elif isinstance(r, list):
-                    # 리스트 길이가 컬럼 수와 다르면 패딩/자르기
-                    row_fixed = (r + [""] * len(columns))[:len(columns)]
-                    output.append(row_fixed)
-                else:
-                    output.append([r])
-        else:
-            # rows가 리스트가 아니면 그대로 한 셀로
-            output.append([rows])
-        requests.delete(f"{base_url}/api/lr/log/{request_id}/end", headers=headers, verify=False)
-        return output
-        #for row in rows:
-        #    output.append(row)
-        #requests.delete(f"{base_url}/api/lr/log/{request_id}/end", headers=headers, verify=False)
-        #return output
-    except Exception as e:
-        requests.delete(f"{base_url}/api/lr/log/{request_id}/end", headers=headers, verify=False)
-        return f"오류 발생: {str(e)}"
\ No newline at end of file
+def fetch_secui_system_logs(info, level, max_rows=MAX_ROWS, page_rows=PAGE_ROWS, total_rows=TOTAL_ROWS,
+                            max_wait_sec=SEARCH_MAX_WAIT_SEC, cancel=None, start=None, end=None):
+    payload = _system_payload(level, total_rows, page_rows, start, end)
+    log.debug("시스템 로그 요청 payload: %s", payload)
+    return _run_search(info, payload, max_rows, page_rows, PAGE_FETCH_WINDOW, max_wait_sec, cancel)
+
+def fetch_secui_traffic_logs(info, src_ip, dst_ip, max_rows=MAX_ROWS, page_rows=PAGE_ROWS, total_rows=TOTAL_ROWS,
+                             max_wait_sec=SEARCH_MAX_WAIT_SEC, cancel=None, start=None, end=None):
+    payload = _traffic_payload(src_ip, dst_ip, total_rows, page_rows, start, end)
+    log.debug("트래픽 로그 요청 payload: %s", payload)
+    return _run_search(info, payload, max_rows, page_rows, PAGE_FETCH_WINDOW, max_wait_sec, cancel)
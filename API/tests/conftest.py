@@ -0,0 +1,55 @@
+# tests/conftest.py
+# API/ 모듈과 bench/standins.py 를 import 할 수 있게 경로 추가, 테스트마다 키/토큰 캐시 비우기.
+#
+#   cd API && python -m pytest -q tests
+
+import os
+import sys
+
+import pytest
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+sys.path.insert(0, os.path.join(API_DIR, "bench"))
+
+import secui_log_api  # noqa: E402
+from palo_key_cache import api_key_cache  # noqa: E402
+from standins import PaloStandin, SecuiStandin  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def _clear_auth_caches():
+    api_key_cache.clear()
+    secui_log_api.token_cache.clear()
+    yield
+    api_key_cache.clear()
+    secui_log_api.token_cache.clear()
+
+@pytest.fixture
+def palo_standin():
+    """PaloStandin 을 만들어 주는 팩토리. 테스트가 끝나면 모두 정지."""
+    made = []
+
+    def make(**kwargs):
+        made.append(PaloStandin(**kwargs).start())
+        return made[-1]
+    yield make
+    for s in made:
+        s.stop()
+
+@pytest.fixture
+def secui_standin():
+    """SecuiStandin 을 만들어 주는 팩토리. 테스트가 끝나면 모두 정지."""
+    made = []
+
+    def make(**kwargs):
+        made.append(SecuiStandin(**kwargs).start())
+        return made[-1]
+    yield make
+    for s in made:
+        s.stop()
+
+@pytest.fixture(autouse=True, scope="session")
+def _close_async_engine():
+    yield
+    if "async_engine" in sys.modules:
+        sys.modules["async_engine"].engine.close()
@@ -0,0 +1,138 @@
+# tests/test_async_engine.py
+# async_engine 을 로컬 스탠드인(bench/standins.py)에 붙여 동기 구현과 같은 결과/인증/취소 동작인지 확인.
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import async_engine  # noqa: E402
+import metrics  # noqa: E402
+import palo_inified  # noqa: E402
+import secui_log_api  # noqa: E402
+from polling import PollCancelled  # noqa: E402
+
+# ── 동기 구현과 같은 결과 ─────────────────────────────────────
+def test_palo_traffic_matches_sync(palo_standin):
+    palo = palo_standin(entries=300, job_sec=0.1)
+    a = palo_inified.palo_traffic_records(palo.url, "10.0.0.1", "", "admin", "pw", nlogs=300)
+    b = async_engine.palo_traffic_records(palo.url, "10.0.0.1", "", "admin", "pw", nlogs=300)
+    assert len(a) == 300
+    assert a == b
+
+def test_palo_system_matches_sync(palo_standin):
+    palo = palo_standin(entries=300, job_sec=0.1)
+    a = palo_inified.palo_system_records(palo.url, "CRITICAL", "admin", "pw", nlogs=300)
+    b = async_engine.palo_system_records(palo.url, "CRITICAL", "admin", "pw", nlogs=300)
+    assert len(a) == 300
+    assert a == b
+
+def test_secui_matches_sync(secui_standin):
+    info = secui_standin(rows=250, job_sec=0.1).info()
+    a = secui_log_api.fetch_secui_traffic_logs(info, "10.0.0.1", "8.8.8.8", max_rows=250)
+    b = async_engine.fetch_secui_traffic_logs(info, "10.0.0.1", "8.8.8.8", max_rows=250)
+    assert len(a) == 251   # 헤더 + 250행
+    assert a == b
+    assert (secui_log_api.fetch_secui_system_logs(info, "CRITICAL")
+            == async_engine.fetch_secui_system_logs(info, "CRITICAL"))
+
+# ── PALO_MAX_NLOGS 초과 시 skip 으로 나눠 조회 ──────────────────
+def _job_params(palo):
+    return [(p.get("nlogs"), p.get("skip")) for _, p in sorted(palo.jobs.values(), key=lambda j: j[0])]
+
+def test_palo_nlogs_split_with_skip(palo_standin, monkeypatch):
+    monkeypatch.setattr(palo_inified, "PALO_MAX_NLOGS", 100)
+    palo = palo_standin(entries=1000, job_sec=0.05)
+    recs = async_engine.palo_traffic_records(palo.url, "", "", "admin", "pw", nlogs=250)
+    assert len(recs) == 250
+    assert [r["src"] for r in recs[:2]] == ["10.0.0.0", "10.0.0.1"]
+    assert _job_params(palo) == [("100", None), ("100", "100"), ("50", "200")]
+    assert recs == palo_inified.palo_traffic_records(palo.url, "", "", "admin", "pw", nlogs=250)
+
+def test_palo_split_stops_when_logs_run_out(palo_standin, monkeypatch):
+    monkeypatch.setattr(palo_inified, "PALO_MAX_NLOGS", 100)
+    palo = palo_standin(entries=150, job_sec=0.05)
+    recs = async_engine.palo_system_records(palo.url, "CRITICAL", "admin", "pw", nlogs=400)
+    assert len(recs) == 150
+    assert _job_params(palo) == [("100", None), ("100", "100")]
+
+# ── 인증 ───────────────────────────────────────────────────
+def test_palo_keygen_single_flight_and_rekey(palo_standin):
+    palo = palo_standin(entries=5, job_sec=0.05)
+    eng = async_engine.engine
+    results = eng.run_all([eng.palo_traffic_records(palo.url, "", "", "admin", "pw") for _ in range(20)])
+    assert all(len(r) == 5 for r in results)
+    assert palo.count("keygen") == 1
+
+    palo.revoke_keys()
+    assert len(async_engine.palo_traffic_records(palo.url, "", "", "admin", "pw")) == 5
+    assert palo.count("keygen") == 2
+
+def test_secui_login_single_flight_and_relogin(secui_standin):
+    secui = secui_standin(rows=5, job_sec=0.05)
+    info = secui.info()
+    eng = async_engine.engine
+    payload = secui_log_api._system_payload("CRITICAL", 3, 100)
+    results = eng.run_all([eng.secui_search(info, payload) for _ in range(20)])
+    assert all(isinstance(r, list) for r in results)
+    assert secui.count("login") == 1
+
+    secui.revoke_tokens()
+    assert isinstance(async_engine.fetch_secui_system_logs(info, "CRITICAL"), list)
+    assert secui.count("login") == 2
+
+def test_secui_events_share_the_sync_logger(secui_standin, caplog):
+    # 401 재시도는 동기/비동기 모두 secui_log_api 로거로 남는다
+    secui = secui_standin(rows=5, job_sec=0.05)
+    info = secui.info()
+    assert isinstance(secui_log_api.fetch_secui_system_logs(info, "CRITICAL"), list)
+    secui.revoke_tokens()      # 캐시된 토큰이 이제 401
+    with caplog.at_level("WARNING", logger="secui_log_api"):
+        secui_log_api.fetch_secui_system_logs(info, "CRITICAL")
+        secui.revoke_tokens()
+        async_engine.fetch_secui_system_logs(info, "CRITICAL")
+    retries = [r for r in caplog.records if "401" in r.getMessage()]
+    assert [r.name for r in retries] == ["secui_log_api", "secui_log_api"]
+
+# ── 취소 ───────────────────────────────────────────────────
+def test_cancel_ends_secui_search(secui_standin):
+    secui = secui_standin(rows=5, job_sec=30)
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    t0 = time.monotonic()
+    with pytest.raises(PollCancelled):
+        async_engine.fetch_secui_traffic_logs(secui.info(), "1.1.1.1", "2.2.2.2", cancel=cancel)
+    assert time.monotonic() - t0 < 5
+    deadline = time.monotonic() + 2
+    while secui.count("end") == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert secui.count("end") == 1
+
+def test_secui_failed_status_raises(secui_standin):
+    secui = secui_standin()
+    secui.status_reply = (200, {"code": "ok", "result": {"status": "FAIL"}})
+    t0 = time.monotonic()
+    with pytest.raises(secui_log_api.SecuiError):
+        async_engine.engine.run(async_engine.engine._secui_search(
+            secui.info(), secui_log_api._system_payload("CRITICAL", 10, 10, None, None), 10, 10, 2, 10))
+    assert time.monotonic() - t0 < 5
+
+# ── metrics: VENDOR_IO=async 도 동기 구현과 같은 단계 지표 ──────────
+def test_async_records_same_stage_metrics(palo_standin, secui_standin):
+    metrics.reset()
+    palo = palo_standin(entries=20, job_sec=0.1)
+    secui = secui_standin(rows=5, job_sec=0.05)
+    with metrics.tags(device="fw-a", vendor="Paloalto"):
+        assert len(async_engine.palo_system_records(palo.url, "CRITICAL", "admin", "pw", nlogs=20)) == 20
+    with metrics.tags(device="fw-b", vendor="Secui Bluemax"):
+        assert isinstance(async_engine.fetch_secui_system_logs(secui.info(), "CRITICAL"), list)
+    for device, vendor, stages in (
+            ("fw-a", "Paloalto", ("keygen", "job_start", "poll", "download_parse")),
+            ("fw-b", "Secui Bluemax", ("login", "search_start", "poll", "page_download", "json_parse", "search_end"))):
+        for stage in stages:
+            assert metrics.STAGE_SECONDS.count(stage=stage, device=device, vendor=vendor) >= 1, stage
+        assert metrics.POLLS_PER_JOB.count(device=device, vendor=vendor) == 1
+    assert metrics.ROWS_PARSED.value(stage="download_parse", device="fw-a", vendor="Paloalto") == 20
+    assert metrics.BYTES_RECEIVED.value(device="fw-b", vendor="Secui Bluemax") > 0
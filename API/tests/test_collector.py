@@ -0,0 +1,96 @@
+# tests/test_collector.py
+# collector: 최신순 + 건수 상한 응답에서 cursor 까지 빠짐없이 받는지, 경계 중복 제거,
+# 수신 시각 기준 cursor(늦게 도착한 로그), 같은 초의 똑같은 행.
+
+import time
+
+import pytest
+
+import collector
+from log_store import parse_time
+from records import SystemRecord
+
+BASE = parse_time("2025/10/20 12:00:00")
+
+def _fmt(ts):
+    return time.strftime("%Y/%m/%d %H:%M:%S", time.localtime(ts))
+
+def _rec(ts, i, generated=None):
+    """ts = 수신 시각. generated 를 주면 발생 시각(표의 time)은 그 시각"""
+    return SystemRecord(_fmt(ts if generated is None else generated), "critical", f"message {i}", _fmt(ts))
+
+class FakeVendor:
+    """PAN-OS 처럼 수신 시각 [start, end] 를 최신순으로 limit 건까지 돌려주는 가짜 dispatch_iter"""
+
+    def __init__(self, logs):
+        self.logs = logs          # [(ts, SystemRecord)]
+        self.calls = []
+
+    def __call__(self, info, log_type, cancel=None, start=None, end=None, limit=None, **query):
+        self.calls.append((start, end))
+        rows = sorted((x for x in self.logs if start <= x[0] <= end), key=lambda x: -x[0])
+        return iter([r for _, r in rows[:limit]])
+
+@pytest.fixture
+def make(monkeypatch):
+    def _make(logs, max_rows=10, max_pages=10):
+        fake = FakeVendor(logs)
+        monkeypatch.setattr(collector, "dispatch_iter", fake)
+        monkeypatch.setattr(collector.inventory, "firewall_info_dict",
+                            lambda: {"fw": {"vendor": "Paloalto", "management_ip": "10.0.0.1"}})
+        c = collector.Collector(["fw"], ["CRITICAL"], backfill_sec=int(time.time()) - BASE + 10,
+                                max_rows=max_rows, max_pages=max_pages)
+        return c, fake
+    return _make
+
+def _messages(c):
+    return sorted(r["message"] for r in c.rows())
+
+def test_truncated_cycle_pages_back_to_cursor(make):
+    # 35건, 초마다 1건 → 상한 10건이면 최신부터 거슬러 올라가며 4번
+    logs = [(BASE + i, _rec(BASE + i, i)) for i in range(35)]
+    c, fake = make(logs)
+    assert c.run_once() == 35
+    assert _messages(c) == sorted(f"message {i}" for i in range(35))
+    assert c.stats()["cursors"][0]["truncated"] == 0
+    assert len(fake.calls) == 4
+
+def test_rows_sharing_the_cut_second_are_not_lost(make):
+    # 상한이 한 시각의 행들 가운데서 잘려도 그 시각은 다음 조회에서 통째로 받는다
+    logs = [(BASE + i // 3, _rec(BASE + i // 3, i)) for i in range(25)]
+    c, _ = make(logs, max_rows=10)
+    assert c.run_once() == 25
+    assert _messages(c) == sorted(f"message {i}" for i in range(25))
+
+def test_next_cycle_only_new_rows(make):
+    logs = [(BASE + i, _rec(BASE + i, i)) for i in range(15)]
+    c, fake = make(logs)
+    c.run_once()
+    fake.logs.extend((BASE + 20 + i, _rec(BASE + 20 + i, 100 + i)) for i in range(12))
+    assert c.run_once() == 12
+    assert len(c.rows()) == 27
+
+def test_page_budget_exhausted_is_truncated(make):
+    logs = [(BASE + i, _rec(BASE + i, i)) for i in range(50)]
+    c, _ = make(logs, max_rows=10, max_pages=2)
+    c.run_once()
+    assert c.stats()["cursors"][0]["truncated"] == 1
+
+def test_late_arriving_row_is_collected(make):
+    # 발생 시각은 cursor 보다 한참 전이지만 수신은 그 뒤 → 다음 주기에 받아야 함
+    logs = [(BASE + i, _rec(BASE + i, i)) for i in range(5)]
+    c, fake = make(logs)
+    c.run_once()
+    fake.logs.append((BASE + 10, _rec(BASE + 10, "late", generated=BASE - 600)))
+    assert c.run_once() == 1
+    assert "message late" in _messages(c)
+
+def test_identical_rows_in_same_second_are_kept(make):
+    logs = [(BASE + 1, _rec(BASE + 1, "dup")), (BASE + 1, _rec(BASE + 1, "dup")), (BASE, _rec(BASE, 0))]
+    c, fake = make(logs)
+    assert c.run_once() == 3
+    # 다시 물어도(start 포함) 이미 받은 두 건은 건너뛰고, 같은 초에 한 건 더 오면 그것만 추가
+    assert c.run_once() == 0
+    fake.logs.append((BASE + 1, _rec(BASE + 1, "dup")))
+    assert c.run_once() == 1
+    assert _messages(c).count("message dup") == 3
@@ -0,0 +1,58 @@
+# tests/test_fanout.py
+# fan_out: 장비별 타임아웃이 나면 그 작업의 cancel 이 걸려 워커가 풀려나는지, 상위 취소 전달,
+# 소비 측이 중간에 멈추면(close/break) 남은 작업 취소.
+
+import threading
+import time
+
+from fanout import fan_out
+
+def _on_error(item, e):
+    return type(e).__name__
+
+def test_timeout_sets_task_cancel():
+    stopped = {}
+
+    def fn(item, cancel):
+        if item == "slow":
+            stopped[item] = cancel.wait(5)     # 타임아웃 시 바로 풀려야 함
+            return "late"
+        return "ok"
+
+    t0 = time.monotonic()
+    out = dict(fan_out(["fast", "slow"], fn, on_error=_on_error, timeout=0.2))
+    assert out == {"fast": "ok", "slow": "TimeoutError"}
+    deadline = time.monotonic() + 2
+    while "slow" not in stopped and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stopped == {"slow": True}
+    assert time.monotonic() - t0 < 2
+
+def test_parent_cancel_reaches_running_tasks():
+    parent = threading.Event()
+
+    def fn(item, cancel):
+        parent.set()
+        return "cancelled" if cancel.wait(5) else "done"
+
+    out = [r for _, r in fan_out([1, 2], fn, on_error=_on_error, timeout=10, cancel=parent)]
+    assert out == ["cancelled", "cancelled"]
+
+def test_closing_early_cancels_pending_tasks():
+    events = {}
+
+    def fn(item, cancel):
+        events[item] = cancel
+        if item == "fast":
+            return "ok"
+        cancel.wait(5)
+        return "stopped"
+
+    gen = fan_out(["fast", "slow1", "slow2"], fn, on_error=_on_error, timeout=10, ordered=False)
+    assert next(gen) == ("fast", "ok")
+    deadline = time.monotonic() + 2
+    while len(events) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    gen.close()     # 스트리밍 연결이 끊긴 경우와 같음
+    assert events["slow1"].is_set() and events["slow2"].is_set()
+    assert not events["fast"].is_set()
@@ -0,0 +1,34 @@
+# tests/test_firewall_ip_check.py
+# find_target_firewall: 앱과 같은 인벤토리 파일(FIREWALL_INFO_FILE)을 읽고, 시트가 바뀔 때만 인덱스를 다시 만든다.
+
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+
+import firewall_ip_check_modi as fic  # noqa: E402
+import inventory  # noqa: E402
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=["name", "management_ip", "ip_range", "vendor"]).to_excel(path, index=False)
+
+@pytest.fixture
+def xlsx(tmp_path, monkeypatch):
+    path = str(tmp_path / "firewall_info.xlsx")
+    _write(path, [("fw-a", "10.0.0.1", "192.168.1.0/24", "Paloalto")])
+    monkeypatch.setattr(inventory, "FIREWALL_INFO_FILE", path)
+    monkeypatch.setattr(inventory, "CACHE_DIR", str(tmp_path / "cache"))
+    return path
+
+def test_router_reads_app_inventory_and_rebuilds_on_change(xlsx):
+    assert [fw["name"] for fw in fic.find_target_firewall("192.168.1.5", "192.168.1.6")] == ["fw-a"]
+    index = fic.get_firewall_index()
+    assert fic.get_firewall_index() is index               # 같은 Sheet → 인덱스 재사용
+    assert fic._index_sheet is inventory.load_sheet(xlsx)
+
+    _write(xlsx, [("fw-b", "10.0.0.2", "192.168.1.0/24", "Paloalto")])
+    st = os.stat(xlsx)
+    os.utime(xlsx, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert [fw["name"] for fw in fic.find_target_firewall("192.168.1.5", "192.168.1.6")] == ["fw-b"]
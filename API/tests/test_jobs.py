@@ -0,0 +1,87 @@
+# tests/test_jobs.py
+# JobManager: 장비별 done/error 상태, 장비 타임아웃, 취소.
+
+import threading
+import time
+
+import pytest
+
+from jobs import Job, JobManager
+
+TARGETS = [("fw-a", {"vendor": "Paloalto"}), ("fw-b", {"vendor": "Paloalto"})]
+
+@pytest.fixture
+def manager():
+    m = JobManager(max_workers=4, device_timeout_sec=5)
+    yield m
+    m._pool.shutdown(wait=False, cancel_futures=True)
+
+def _wait(job, sec=5.0):
+    deadline = time.monotonic() + sec
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.done
+
+def test_failed_device_is_error(manager):
+    def run_one(name, info, cancel):
+        if name == "fw-b":
+            raise RuntimeError("connection refused")
+        return "<table></table>"
+    job = manager.submit("traffic", TARGETS, run_one)
+    _wait(job)
+    a, b = job.devices
+    assert (a.status, a.result) == ("done", "<table></table>")
+    assert (b.status, b.error, b.result) == ("error", "connection refused", None)
+    assert job.status == "done"
+
+def test_all_devices_failed_is_job_error(manager):
+    def run_one(name, info, cancel):
+        raise RuntimeError("boom")
+    job = manager.submit("system", TARGETS, run_one)
+    _wait(job)
+    assert job.status == "error"
+
+def test_device_timeout_marks_error_and_cancels(manager):
+    stopped = threading.Event()
+
+    def run_one(name, info, cancel):
+        if name == "fw-b":
+            cancel.wait(10)   # 응답 없는 장비: cancel 이 걸릴 때까지 대기
+            stopped.set()
+            raise RuntimeError("cancelled")
+        return "ok"
+    t0 = time.monotonic()
+    job = manager.submit("traffic", TARGETS, run_one, timeout=0.2)
+    _wait(job)
+    assert time.monotonic() - t0 < 2
+    a, b = job.devices
+    assert a.status == "done"
+    assert b.status == "error" and "시간 초과" in b.error
+    assert stopped.wait(2)          # 워커는 cancel 을 받고 풀려남
+    assert b.status == "error"      # 늦게 끝난 워커가 상태를 덮어쓰지 않음
+    assert manager.stats()["timeouts"] == 1
+
+def test_cancel_stops_running_devices(manager):
+    started = threading.Barrier(3)
+
+    def run_one(name, info, cancel):
+        started.wait(2)
+        cancel.wait(10)
+        return "late"
+    job = manager.submit("traffic", TARGETS, run_one)
+    started.wait(2)
+    manager.cancel(job.id)
+    _wait(job)
+    assert job.status == "cancelled"
+    assert [d.status for d in job.devices] == ["cancelled", "cancelled"]
+
+def test_cancel_before_start_is_not_overwritten(manager):
+    # 취소가 제출과 워커 시작 사이에 들어온 경우: running 으로 되돌리지 않고 run_one 도 부르지 않음
+    calls = []
+    job = Job("traffic", TARGETS[:1])
+    task = job.devices[0]
+    job.cancel_event.set()
+    job._finish(task, "cancelled")
+    manager._run_device(job, task, lambda *a: calls.append(a), 5)
+    assert task.status == "cancelled" and task.started is None
+    assert calls == [] and job.status == "cancelled"
@@ -0,0 +1,34 @@
+# tests/test_palo_inified.py
+# palo_inified 동기 클라이언트: http_pool 타임아웃 설정 반영, nlogs 분할.
+
+import pytest
+import requests
+
+import http_pool
+import palo_inified
+
+@pytest.fixture
+def short_read_timeout():
+    saved = http_pool.default_timeout()
+    http_pool.configure(read_timeout=0.2)
+    yield
+    http_pool.configure(connect_timeout=saved[0], read_timeout=saved[1])
+
+def test_api_get_uses_http_pool_timeout(palo_standin, short_read_timeout):
+    palo = palo_standin(entries=5, job_sec=0.05, latency=0.5)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        palo_inified.palo_traffic_records(palo.url, "", "", "admin", "pw", nlogs=5)
+
+def test_explicit_timeout_overrides_http_pool(palo_standin, short_read_timeout):
+    palo = palo_standin(entries=5, job_sec=0.05, latency=0.3)
+    xml = palo_inified._api_get(palo_inified._api_base(palo.url), {"type": "keygen", "user": "a", "password": "b"},
+                                timeout=(1, 2))
+    assert "<key>" in xml
+
+def test_nlogs_split_with_skip(palo_standin, monkeypatch):
+    monkeypatch.setattr(palo_inified, "PALO_MAX_NLOGS", 100)
+    palo = palo_standin(entries=1000, job_sec=0.05)
+    recs = palo_inified.palo_system_records(palo.url, "CRITICAL", "admin", "pw", nlogs=230)
+    assert len(recs) == 230
+    assert [(p.get("nlogs"), p.get("skip")) for _, p in sorted(palo.jobs.values(), key=lambda j: j[0])] \
+        == [("100", None), ("100", "100"), ("30", "200")]
@@ -0,0 +1,70 @@
+# tests/test_secui_log_api.py
+# Secui 로그인: force 는 켠 경우에만 보냄, 토큰 캐시의 key 별 로그인 잠금은 쓰고 나면 정리.
+# 검색 상태 확인: 토큰 실패 / HTTP 오류 / 실패 상태 / code != ok 는 마감까지 기다리지 않고 바로 SecuiError.
+
+import threading
+import time
+
+import pytest
+
+import secui_log_api
+
+def _logins(secui):
+    return [c[1] for c in secui.calls if c[0] == "login"]
+
+def test_login_does_not_force_by_default(secui_standin, monkeypatch):
+    monkeypatch.setattr(secui_log_api, "LOGIN_FORCE", False)
+    secui = secui_standin()
+    assert secui_log_api.token_cache.get(secui.url, "standin", "x")
+    assert secui_log_api.get_secui_token(secui.url, "standin", "x")
+    assert _logins(secui) == [None, None]
+
+def test_login_force_opt_in(secui_standin, monkeypatch):
+    secui = secui_standin()
+    assert secui_log_api.get_secui_token(secui.url, "standin", "x", force=True)
+    monkeypatch.setattr(secui_log_api, "LOGIN_FORCE", True)
+    assert secui_log_api.token_cache.get(secui.url, "standin", "x")
+    assert _logins(secui) == [1, 1]
+
+def test_key_locks_pruned_after_concurrent_logins(secui_standin):
+    secui = secui_standin(latency=0.05)
+    cache = secui_log_api.SecuiTokenCache()
+    tokens = []
+    threads = [threading.Thread(target=lambda cid=cid: tokens.append(cache.get(secui.url, cid, "x")))
+               for cid in ("a", "a", "a", "b", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(tokens) and len(set(tokens)) == 2     # 같은 client_id 는 로그인 한 번
+    assert secui.count("login") == 2
+    assert cache._key_locks == {}
+
+# ── 검색 상태 확인 실패 ───────────────────────────────────────
+def _search_fails_fast(secui):
+    t0 = time.monotonic()
+    with pytest.raises(secui_log_api.SecuiError) as e:
+        list(secui_log_api.iter_secui_system_logs(secui.info(), "CRITICAL", max_wait_sec=10))
+    assert time.monotonic() - t0 < 5
+    assert secui.count("end") == 1       # 실패해도 검색은 종료
+    return str(e.value)
+
+@pytest.mark.parametrize("reply", [
+    (500, {"code": "ok"}),
+    (200, {"code": "ok", "result": {"status": "FAIL"}}),
+    (200, {"code": "ok", "result": {"status": "error"}}),
+    (200, {"code": "error", "message": "search not found"}),
+])
+def test_status_failure_raises_immediately(secui_standin, reply):
+    secui = secui_standin()
+    secui.status_reply = reply
+    _search_fails_fast(secui)
+
+def test_status_token_failure_raises_secui_error(secui_standin, monkeypatch):
+    secui = secui_standin()
+    call = secui_log_api._secui_call
+
+    def _no_token_for_status(method, info, path, **kwargs):
+        return None if path.endswith("/status") else call(method, info, path, **kwargs)
+    monkeypatch.setattr(secui_log_api, "_secui_call", _no_token_for_status)
+    assert _search_fails_fast(secui) == "토큰 발급 실패"
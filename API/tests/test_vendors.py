@@ -0,0 +1,96 @@
+# tests/test_vendors.py
+# vendors 어댑터/디스패처: 벤더 전용 옵션(Secui total_rows/page_rows), Secui 레코드 변환, 차례 대기 타임아웃.
+
+import time
+
+import pytest
+from flask import Flask
+
+import api_routes
+import inventory
+import secui_log_api
+import vendors
+from records import SystemRecord, TrafficRecord
+
+def _pages(secui):
+    return sorted((c[2], c[3]) for c in secui.calls if c[0] == "page")   # 페이지는 동시에 받음
+
+def test_secui_page_rows_and_total_rows_per_request(secui_standin):
+    secui = secui_standin(rows=90, job_sec=0.05)
+    recs = vendors.dispatch(secui.info(), "traffic", src_ip="1.1.1.1", dst_ip="2.2.2.2",
+                            limit=90, page_rows=40, total_rows=7)
+    assert len(recs) == 90
+    assert _pages(secui) == [(0, 40), (40, 80), (80, 90)]
+    payload = next(iter(secui.searches.values()))[1]
+    assert (payload["page_rows"], payload["total_rows"]) == (40, 7)
+
+def test_secui_options_default(secui_standin):
+    secui = secui_standin(rows=5, job_sec=0.05)
+    vendors.dispatch(secui.info(), "system", level="CRITICAL")
+    payload = next(iter(secui.searches.values()))[1]
+    assert (payload["page_rows"], payload["total_rows"]) == (secui_log_api.PAGE_ROWS, secui_log_api.TOTAL_ROWS)
+
+@pytest.mark.parametrize("options", [{"page_rows": 0}, {"page_rows": secui_log_api.PAGE_ROWS_MAX + 1},
+                                     {"total_rows": "many"}])
+def test_secui_options_out_of_range(options):
+    with pytest.raises(ValueError):
+        vendors.get_adapter("Secui Bluemax").check_options(options)
+
+def test_options_ignored_by_other_vendors():
+    assert vendors.get_adapter("Paloalto").check_options({"page_rows": 10**9}) == {}
+
+@pytest.fixture
+def api_client(secui_standin, monkeypatch):
+    secui = secui_standin(rows=30, job_sec=0.05)
+    monkeypatch.setattr(inventory, "firewall_info_dict", lambda: {"sec": secui.info()})
+    app = Flask(__name__)
+    app.register_blueprint(api_routes.api)
+    return app.test_client(), secui
+
+def test_api_passes_secui_options(api_client):
+    client, secui = api_client
+    r = client.get("/api/system?device=sec&limit=30&page_rows=10&total_rows=2&refresh=1")
+    assert r.status_code == 200
+    assert r.get_json()["devices"][0]["count"] == 30
+    assert _pages(secui) == [(0, 10), (10, 20), (20, 30)]
+
+@pytest.mark.parametrize("qs", ["page_rows=0", "page_rows=abc", f"total_rows={secui_log_api.TOTAL_ROWS_MAX + 1}"])
+def test_api_rejects_bad_options(api_client, qs):
+    client, _ = api_client
+    r = client.get(f"/api/system?device=sec&{qs}")
+    assert r.status_code == 400
+    assert "사이 정수" in r.get_json()["error"]
+
+def test_secui_rows_become_records(secui_standin):
+    info = secui_standin(rows=3, job_sec=0.05).info()
+    recs = vendors.dispatch(info, "traffic", src_ip="1.1.1.1", dst_ip="2.2.2.2")
+    assert recs[0] == TrafficRecord("etime-0", "src_ip-0", "dst_ip-0", "dst_port-0", "", "protocol-0",
+                                    "action-0", "fwrule_name-0")
+    recs = list(vendors.dispatch_iter(info, "system", level="CRITICAL"))
+    assert recs[1] == SystemRecord("time-1", "level-1", "message-1")
+
+def test_adapter_must_implement_traffic_and_system():
+    class Partial(vendors.VendorAdapter):
+        vendor = "partial"
+
+        def traffic(self, *args, **kwargs):
+            return []
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_slot_wait_uses_slot_timeout(monkeypatch):
+    adapter = vendors.get_adapter("Paloalto")
+    monkeypatch.setattr(adapter, "slot_timeout_sec", 0.1)
+    info = {"vendor": "Paloalto", "management_ip": "10.9.9.9"}
+    held = [adapter.slot(info) for _ in range(adapter.per_device)]
+    for cm in held:
+        cm.__enter__()
+    try:
+        t0 = time.monotonic()
+        with pytest.raises(vendors.VendorBusy):
+            with adapter.slot(info):
+                pass
+        assert time.monotonic() - t0 < adapter.device_timeout_sec / 10
+    finally:
+        for cm in held:
+            cm.__exit__(None, None, None)
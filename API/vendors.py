@@ -0,0 +1,347 @@
+# vendors.py
+# 벤더 어댑터 레지스트리.
+# 벤더마다 어댑터 하나가 트래픽/시스템 조회를 맡고, 결과는 항상 records(records.TrafficRecord / SystemRecord)로 돌려준다.
+# (Palo 는 파서가 바로 레코드를 만들고, Secui 2차원 배열은 컬럼을 레코드 필드로 옮김, 오류 문자열은 VendorError 예외로 변환)
+# 어댑터는 동시 job 상한(벤더 전체/장비당), 타임아웃, 한 번에 가져올 최대 건수를 선언하고,
+# dispatch()가 그 상한을 지키며 호출한다 → fan-out을 늘려도 한 벤더 관리 API에 몰리지 않음.
+# 벤더 전용 조회 옵션(예: Secui total_rows/page_rows)은 어댑터가 options 로 이름과 범위를 선언하고,
+# dispatch(..., 옵션=값)으로 넘기면 그 옵션을 선언한 어댑터만 받는다(다른 벤더 장비에는 무시).
+
+import abc
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import metrics
+import secui_log_api
+from fanout import DEVICE_TIMEOUT_SEC
+from records import SystemRecord, TrafficRecord
+
+# VENDOR_IO=async 이면 같은 이름의 asyncio 엔진 동기 래퍼 사용
+if os.environ.get("VENDOR_IO", "").lower() == "async":
+    from async_engine import (
+        palo_traffic_records,
+        palo_system_records,
+        fetch_secui_traffic_logs,
+        fetch_secui_system_logs,
+    )
+else:
+    from palo_inified import palo_traffic_records, palo_system_records
+    from secui_log_api import fetch_secui_traffic_logs, fetch_secui_system_logs
+
+# 스트리밍 조회(레코드를 파싱되는 대로 하나씩)는 동기 구현 사용
+from palo_inified import iter_palo_traffic_records, iter_palo_system_records
+from secui_log_api import iter_secui_traffic_logs, iter_secui_system_logs
+
+Record = Mapping[str, Any]
+
+class VendorError(RuntimeError):
+    """벤더 조회 실패(메시지를 그대로 화면에 보여줌)."""
+
+class UnsupportedVendor(VendorError):
+    """등록된 어댑터가 없는 벤더."""
+
+class VendorBusy(VendorError):
+    """동시 job 상한 때문에 시간 안에 차례가 오지 않음."""
+
+class VendorAdapter(abc.ABC):
+    """
+    어댑터 기본형. 하위 클래스가 vendor 와 traffic()/system() 을 채운다.
+    클래스 속성은 dispatch()가 지키는 한도/타임아웃 선언.
+    """
+    vendor = ""
+    max_concurrency = 8                      # 이 벤더 전체 동시 job 상한
+    per_device = 2                           # 장비(관리 API)당 동시 job 상한
+    job_timeout_sec = 20                     # 벤더 job 완료 대기(폴링 마감)
+    device_timeout_sec = DEVICE_TIMEOUT_SEC  # 장비 1대 처리 전체 상한(차례 대기 포함)
+    slot_timeout_sec = 10                    # 동시 job 상한 차례 대기 상한(넘으면 VendorBusy)
+    max_rows = 100                           # 한 번에 가져오는 최대 레코드 수(기본)
+    export_max_rows = 100_000                # limit 으로 늘려 받을 수 있는 상한(내보내기 등)
+    uses_account = False                     # 화면에서 입력한 계정으로 인증하는지
+    options: Dict[str, Tuple[int, int]] = {}  # 벤더 전용 조회 옵션: 이름 → (최소, 최대)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vendor_slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._device_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._active = 0
+        self._waiting = 0
+
+    def rows_for(self, limit: Optional[int] = None) -> int:
+        """요청한 limit → 실제로 가져올 건수 (없으면 max_rows, 최대 export_max_rows)."""
+        if not limit:
+            return self.max_rows
+        return max(1, min(int(limit), self.export_max_rows))
+
+    def check_options(self, options: Dict[str, Any]) -> Dict[str, int]:
+        """선언한 옵션만 골라 정수/범위 확인(벗어나면 ValueError). 선언하지 않은 옵션은 무시"""
+        out: Dict[str, int] = {}
+        for name, value in options.items():
+            bounds = self.options.get(name)
+            if bounds is None or value is None or value == "":
+                continue
+            try:
+                v = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} 은 정수여야 합니다: {value!r}")
+            if not bounds[0] <= v <= bounds[1]:
+                raise ValueError(f"{name} 은 {bounds[0]}~{bounds[1]} 사이여야 합니다: {v}")
+            out[name] = v
+        return out
+
+    def device_key(self, info: Dict[str, Any]) -> str:
+        return str(info.get("base_url") or info.get("management_ip") or "")
+
+    def _device_sem(self, key: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._device_slots.get(key)
+            if sem is None:
+                sem = self._device_slots[key] = threading.BoundedSemaphore(self.per_device)
+            return sem
+
+    @contextmanager
+    def slot(self, info: Dict[str, Any], timeout: Optional[float] = None) -> Iterator[None]:
+        """벤더 전체 + 장비당 차례를 얻은 동안만 실행. timeout(기본 slot_timeout_sec) 안에 못 얻으면 VendorBusy."""
+        timeout = self.slot_timeout_sec if timeout is None else timeout
+        device_sem = self._device_sem(self.device_key(info))
+        with self._lock:
+            self._waiting += 1
+        try:
+            # 장비 차례를 먼저 잡아, 한 장비에 몰린 요청이 벤더 전체 슬롯을 붙잡지 않게 함
+            if not device_sem.acquire(timeout=timeout):
+                raise VendorBusy(f"{self.vendor} 장비 동시 조회 한도({self.per_device}) 초과 - 잠시 후 다시 시도하세요.")
+            if not self._vendor_slots.acquire(timeout=timeout):
+                device_sem.release()
+                raise VendorBusy(f"{self.vendor} 동시 조회 한도({self.max_concurrency}) 초과 - 잠시 후 다시 시도하세요.")
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._vendor_slots.release()
+            device_sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"active": self._active, "waiting": self._waiting,
+                    "max_concurrency": self.max_concurrency, "per_device": self.per_device,
+                    "job_timeout_sec": self.job_timeout_sec, "device_timeout_sec": self.device_timeout_sec,
+                    "slot_timeout_sec": self.slot_timeout_sec,
+                    "max_rows": self.max_rows, "export_max_rows": self.export_max_rows,
+                    "options": {k: list(v) for k, v in self.options.items()}}
+
+    @abc.abstractmethod
+    def traffic(self, info: Dict[str, Any], src_ip: str, dst_ip: str,
+                account: str = "", password: str = "",
+                cancel: Optional[threading.Event] = None, limit: Optional[int] = None,
+                start: Optional[float] = None, end: Optional[float] = None, **options: Any) -> List[Record]:
+        """트래픽 로그 조회 → list[TrafficRecord] (실패는 예외)"""
+
+    @abc.abstractmethod
+    def system(self, info: Dict[str, Any], level: str,
+               account: str = "", password: str = "",
+               cancel: Optional[threading.Event] = None, limit: Optional[int] = None,
+               start: Optional[float] = None, end: Optional[float] = None, **options: Any) -> List[Record]:
+        """시스템 로그 조회 → list[SystemRecord] (실패는 예외)"""
+
+    # 스트리밍 버전: 기본은 전체 결과를 받은 뒤 하나씩(벤더가 지원하면 하위 클래스에서 교체)
+    def iter_traffic(self, info: Dict[str, Any], src_ip: str, dst_ip: str,
+                     account: str = "", password: str = "",
+                     cancel: Optional[threading.Event] = None, limit: Optional[int] = None,
+                     start: Optional[float] = None, end: Optional[float] = None, **options: Any) -> Iterator[Record]:
+        return iter(self.traffic(info, src_ip, dst_ip, account, password, cancel, limit, start, end, **options))
+
+    def iter_system(self, info: Dict[str, Any], level: str,
+                    account: str = "", password: str = "",
+                    cancel: Optional[threading.Event] = None, limit: Optional[int] = None,
+                    start: Optional[float] = None, end: Optional[float] = None, **options: Any) -> Iterator[Record]:
+        return iter(self.system(info, level, account, password, cancel, limit, start, end, **options))
+
+# ─────────────────────────────────────────────────────────────
+# Palo Alto: 화면 계정으로 API 키 발급, 결과는 이미 records
+# ─────────────────────────────────────────────────────────────
+class PaloAdapter(VendorAdapter):
+    vendor = "Paloalto"
+    max_concurrency = 8
+    per_device = 2          # 관리 플레인 로그 쿼리 job 동시 실행 수를 작게 유지
+    job_timeout_sec = 20
+    max_rows = 100          # nlogs (PALO_MAX_NLOGS 초과분은 skip 으로 이어서 조회)
+    uses_account = True
+
+    def traffic(self, info, src_ip, dst_ip, account="", password="", cancel=None, limit=None,
+                start=None, end=None, **options):
+        return palo_traffic_records(info.get("management_ip", ""), src_ip, dst_ip, account, password,
+                                    nlogs=self.rows_for(limit), max_wait_sec=self.job_timeout_sec, cancel=cancel,
+                                    start=start, end=end)
+
+    def system(self, info, level, account="", password="", cancel=None, limit=None, start=None, end=None,
+               **options):
+        return palo_system_records(info.get("management_ip", ""), level, account, password,
+                                   nlogs=self.rows_for(limit), max_wait_sec=self.job_timeout_sec, cancel=cancel,
+                                   start=start, end=end)
+
+    def iter_traffic(self, info, src_ip, dst_ip, account="", password="", cancel=None, limit=None,
+                     start=None, end=None, **options):
+        return iter_palo_traffic_records(info.get("management_ip", ""), src_ip, dst_ip, account, password,
+                                         nlogs=self.rows_for(limit), max_wait_sec=self.job_timeout_sec, cancel=cancel,
+                                         start=start, end=end)
+
+    def iter_system(self, info, level, account="", password="", cancel=None, limit=None, start=None, end=None,
+                    **options):
+        return iter_palo_system_records(info.get("management_ip", ""), level, account, password,
+                                        nlogs=self.rows_for(limit), max_wait_sec=self.job_timeout_sec, cancel=cancel,
+                                        start=start, end=end)
+
+# ─────────────────────────────────────────────────────────────
+# Secui Bluemax: 장비별 client_id/secret 사용, [columns] + rows → records
+# ─────────────────────────────────────────────────────────────
+def _cell(row: Dict[str, Any], *keys: str) -> str:
+    for k in keys:
+        v = row.get(k)
+        if v not in (None, ""):
+            return str(v)
+    return ""
+
+# 컬럼은 secui_log_api._traffic_payload / _system_payload 의 columns (app 은 Secui 응답에 없음)
+def _secui_traffic_record(row: Dict[str, Any]) -> TrafficRecord:
+    return TrafficRecord(_cell(row, "etime", "time"), _cell(row, "src_ip"), _cell(row, "dst_ip"),
+                         _cell(row, "dst_port"), _cell(row, "app"), _cell(row, "protocol"),
+                         _cell(row, "action"), _cell(row, "fwrule_name", "rule"))
+
+def _secui_system_record(row: Dict[str, Any]) -> SystemRecord:
+    return SystemRecord(_cell(row, "time", "etime"), _cell(row, "level"), _cell(row, "message"))
+
+_SECUI_RECORDS = {"traffic": _secui_traffic_record, "system": _secui_system_record}
+
+def _table_records(result: Any, log_type: str) -> List[Record]:
+    """secui fetch 결과(2차원 배열 또는 오류 문자열) → records"""
+    if isinstance(result, str):
+        raise VendorError(result)
+    if not result:
+        return []
+    convert = _SECUI_RECORDS[log_type]
+    columns = [str(c) for c in result[0]]
+    return [convert(dict(zip(columns, row))) for row in result[1:]]
+
+def _stream_records(stream: Iterator[Any], log_type: str) -> Iterator[Record]:
+    """secui iter 결과(columns, row, row, ...) → records. 실패는 VendorError"""
+    convert = _SECUI_RECORDS[log_type]
+    try:
+        columns = None
+        for item in stream:
+            if columns is None:
+                columns = [str(c) for c in item]
+                continue
+            yield convert(dict(zip(columns, item)))
+    except secui_log_api.SecuiError as e:
+        raise VendorError(str(e))
+
+class SecuiAdapter(VendorAdapter):
+    vendor = "Secui Bluemax"
+    max_concurrency = 8
+    per_device = 2
+    job_timeout_sec = 60    # secui_log_api.SEARCH_MAX_WAIT_SEC
+    max_rows = 100
+    options = {"total_rows": (1, secui_log_api.TOTAL_ROWS_MAX),   # 검색 요청의 total_rows
+               "page_rows": (1, secui_log_api.PAGE_ROWS_MAX)}     # 결과 페이지 1번에 받을 행 수
+
+    def traffic(self, info, src_ip, dst_ip, account="", password="", cancel=None, limit=None,
+                start=None, end=None, **options):
+        return _table_records(fetch_secui_traffic_logs(info, src_ip, dst_ip, max_rows=self.rows_for(limit),
+                                                       max_wait_sec=self.job_timeout_sec, cancel=cancel,
+                                                       start=start, end=end, **self.check_options(options)), "traffic")
+
+    def system(self, info, level, account="", password="", cancel=None, limit=None, start=None, end=None,
+               **options):
+        return _table_records(fetch_secui_system_logs(info, level, max_rows=self.rows_for(limit),
+                                                      max_wait_sec=self.job_timeout_sec, cancel=cancel,
+                                                      start=start, end=end, **self.check_options(options)), "system")
+
+    def iter_traffic(self, info, src_ip, dst_ip, account="", password="", cancel=None, limit=None,
+                     start=None, end=None, **options):
+        return _stream_records(iter_secui_traffic_logs(info, src_ip, dst_ip, max_rows=self.rows_for(limit),
+                                                       max_wait_sec=self.job_timeout_sec, cancel=cancel,
+                                                       start=start, end=end, **self.check_options(options)), "traffic")
+
+    def iter_system(self, info, level, account="", password="", cancel=None, limit=None, start=None, end=None,
+                    **options):
+        return _stream_records(iter_secui_system_logs(info, level, max_rows=self.rows_for(limit),
+                                                      max_wait_sec=self.job_timeout_sec, cancel=cancel,
+                                                      start=start, end=end, **self.check_options(options)), "system")
+
+# ─────────────────────────────────────────────────────────────
+# 레지스트리 / 디스패처
+# ─────────────────────────────────────────────────────────────
+_ADAPTERS: Dict[str, VendorAdapter] = {}
+
+def register(adapter: VendorAdapter) -> VendorAdapter:
+    _ADAPTERS[adapter.vendor] = adapter
+    return adapter
+
+def get_adapter(vendor: str) -> VendorAdapter:
+    adapter = _ADAPTERS.get(vendor or "")
+    if adapter is None:
+        raise UnsupportedVendor(f"{vendor}는 지원하지 않는 방화벽입니다.")
+    return adapter
+
+def device_timeout(infos: List[Dict[str, Any]]) -> float:
+    """여러 장비를 fan-out 할 때 쓸 장비별 타임아웃(해당 어댑터들 중 가장 긴 값)."""
+    return max((_ADAPTERS[i.get("vendor")].device_timeout_sec
+                for i in infos if i and i.get("vendor") in _ADAPTERS), default=DEVICE_TIMEOUT_SEC)
+
+def option_bounds() -> Dict[str, Tuple[int, int]]:
+    """등록된 어댑터들이 받는 벤더 전용 옵션(이름 → (최소, 최대))"""
+    out: Dict[str, Tuple[int, int]] = {}
+    for a in _ADAPTERS.values():
+        out.update(a.options)
+    return out
+
+def _metric_tags(info: Dict[str, Any], adapter: VendorAdapter, log_type: str) -> Dict[str, str]:
+    """지표 레이블: 호출 측이 장비명을 태그로 걸지 않았으면 관리 IP 로 구분"""
+    device = metrics.current_tags().get("device") or info.get("management_ip", "")
+    return {"device": device, "vendor": adapter.vendor, "log_type": log_type}
+
+def dispatch(info: Dict[str, Any], log_type: str, cancel: Optional[threading.Event] = None,
+             **query: Any) -> List[Record]:
+    """
+    장비 1대 조회. log_type: "traffic"(src_ip, dst_ip, 선택 start/end epoch 초) / "system"(level),
+    공통으로 account, password, limit(가져올 최대 건수, 생략 시 어댑터 max_rows),
+    그 밖의 키워드는 벤더 전용 옵션(어댑터 options 에 없는 것은 무시, 범위를 벗어나면 ValueError).
+    어댑터의 동시 job 상한 안에서 실행하고 records를 반환, 실패는 예외.
+    """
+    adapter = get_adapter((info or {}).get("vendor", ""))
+    with adapter.slot(info), metrics.tags(**_metric_tags(info, adapter, log_type)), metrics.span("fetch"):
+        if log_type == "traffic":
+            return adapter.traffic(info, cancel=cancel, **query)
+        if log_type == "system":
+            return adapter.system(info, cancel=cancel, **query)
+    raise ValueError(f"unknown log_type: {log_type}")
+
+def dispatch_iter(info: Dict[str, Any], log_type: str, cancel: Optional[threading.Event] = None,
+                  **query: Any) -> Iterator[Record]:
+    """
+    dispatch()의 스트리밍 버전. 레코드를 받는 대로 yield 하고, 다 읽거나 닫힐(close) 때까지 슬롯을 잡는다.
+    """
+    adapter = get_adapter((info or {}).get("vendor", ""))
+    if log_type not in ("traffic", "system"):
+        raise ValueError(f"unknown log_type: {log_type}")
+    labels = _metric_tags(info, adapter, log_type)
+    with adapter.slot(info):
+        if log_type == "traffic":
+            records = adapter.iter_traffic(info, cancel=cancel, **query)
+        else:
+            records = adapter.iter_system(info, cancel=cancel, **query)
+        # 태그는 한 건씩 꺼낼 때만(소비 측 컨텍스트에 남기지 않음), 시간은 벤더 쪽에서 보낸 만큼만
+        yield from metrics.tagged(metrics.timed_iter(records, "fetch", **labels), **labels)
+
+def stats() -> Dict[str, Any]:
+    return {vendor: a.stats() for vendor, a in _ADAPTERS.items()}
+
+register(PaloAdapter())
+register(SecuiAdapter())